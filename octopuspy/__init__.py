@@ -1,18 +1,35 @@
+import importlib
+
 from .exchange.base_restapi import (
-    BaseClient, NewOrder, OrderID, OrderStatus, Ticker, 
+    AmendOrder, BaseClient, NewOrder, OrderID, OrderStatus, Ticker, 
     AskBid, ORDER_STATE_CONSTANTS, ClientParams
 )
+from .exchange.registry import create_client, create_clients, register_client, load_client_class
+
+# exchange clients are imported on first access, importing octopuspy does not load the exchange SDKs
+_LAZY_CLIENTS = {
+    'OkxSpotClient': '.exchange.okx.spot_restapi',
+    'OkxFutureClient': '.exchange.okx.future_restapi',
+    'BnSpotClient': '.exchange.binance.spot_restapi',
+    'BnFutureClient': '.exchange.binance.future_restapi',
+    'BnUMFutureClient': '.exchange.binance.umfuture_restapi',
+    'BifuSpotClient': '.exchange.bifu.spot_restapi',
+    'BifuFutureClient': '.exchange.bifu.future_restapi',
+}
+
+def __getattr__(name: str):
+    if name in _LAZY_CLIENTS:
+        value = getattr(importlib.import_module(_LAZY_CLIENTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .exchange.okx.spot_restapi import OkxSpotClient 
-from .exchange.okx.future_restapi import OkxFutureClient
-from .exchange.binance.spot_restapi import BnSpotClient
-from .exchange.binance.future_restapi import BnFutureClient
-from .exchange.binance.umfuture_restapi import BnUMFutureClient
-from .exchange.bifu.spot_restapi import BifuSpotClient
-from .exchange.bifu.future_restapi import BifuFutureClient
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_CLIENTS))
 
 __all__ = ['BaseClient', 'ClientParams', 'AskBid', 'ORDER_STATE_CONSTANTS', 
-           'NewOrder', 'OrderID', 'OrderStatus', 'Ticker', 
+           'AmendOrder', 'NewOrder', 'OrderID', 'OrderStatus', 'Ticker', 
            'OkxSpotClient', 'OkxFutureClient',
            'BnSpotClient', 'BnFutureClient', 'BnUMFutureClient',
-           'BifuSpotClient', 'BifuFutureClient']
\ No newline at end of file
+           'BifuSpotClient', 'BifuFutureClient',
+           'create_client', 'create_clients', 'register_client', 'load_client_class']
@@ -0,0 +1,111 @@
+""" cache of account settings (position mode, leverage, margin mode ...)
+    Clients call the exchange only when the wanted value differs from the known one.
+    Known values are shared by all clients of the account in the process, and with
+    persist=True kept in redis (db_util hash) so restarted workers skip them as well.
+
+    Usage:
+        config = AccountConfigCache("okx", api_key, persist=True)
+        config.ensure("posMode", "net_mode", apply=set_mode, read=get_mode)
+"""
+import hashlib
+import logging
+import threading
+from logging import Logger
+
+KEY_PREFIX = "octopuspy:account_config"
+
+_known = {}     # (exchange, account) -> {setting: value}
+_lock = threading.Lock()
+
+def account_id(api_key: str) -> str:
+    """ stable account id that does not expose the api key
+    """
+    return hashlib.sha1(str(api_key).encode('utf-8')).hexdigest()[:16]
+
+
+class AccountConfigCache:
+    """ known settings of one account on one exchange, values are kept as str
+    """
+    def __init__(self, exchange: str, api_key: str, persist: bool = False,
+                 logger: Logger = logging.getLogger(__file__)):
+        self.exchange = exchange
+        self.account = account_id(api_key)
+        self.persist = persist
+        self.logger = logger
+        with _lock:
+            self._settings = _known.setdefault((exchange, self.account), {})
+        if persist:
+            self._load()
+
+    @property
+    def redis_key(self) -> str:
+        return f"{KEY_PREFIX}:{self.exchange}:{self.account}"
+
+    def _load(self):
+        try:
+            from ..utils import db_util
+            stored = db_util.hget_dict(self.redis_key)
+        except Exception as e:
+            self.logger.error("load account config %s error: %s", self.redis_key, e)
+            return
+        with _lock:
+            for setting, value in (stored or {}).items():
+                self._settings.setdefault(setting, value)
+
+    def get(self, setting: str) -> str:
+        """ known value, None if unknown
+        """
+        return self._settings.get(setting)
+
+    def set(self, setting: str, value):
+        value = str(value)
+        with _lock:
+            self._settings[setting] = value
+        if self.persist:
+            try:
+                from ..utils import db_util
+                db_util.hset_dict(self.redis_key, {setting: value})
+            except Exception as e:
+                self.logger.error("save account config %s error: %s", self.redis_key, e)
+
+    def forget(self, setting: str = None):
+        """ drop one (or all) known settings, e.g. after they were changed outside octopuspy
+        """
+        with _lock:
+            if setting is None:
+                self._settings.clear()
+            else:
+                self._settings.pop(setting, None)
+        if self.persist:
+            try:
+                from ..utils import db_util
+                if setting is None:
+                    db_util.RDB().delete(self.redis_key)
+                else:
+                    db_util.RDB().hdel(self.redis_key, setting)
+            except Exception as e:
+                self.logger.error("forget account config %s error: %s", self.redis_key, e)
+
+    def ensure(self, setting: str, value, apply, read=None) -> bool:
+        """ make setting equal to value
+            read(): current value on the exchange or None, only called when the value is unknown
+            apply(value): change it on the exchange, returns True on success
+            returns True when apply was called and succeeded
+        """
+        value = str(value)
+        known = self.get(setting)
+        if known is None and read is not None:
+            try:
+                current = read()
+            except Exception as e:
+                self.logger.error("read account config %s error: %s", setting, e)
+                current = None
+            if current is not None:
+                known = str(current)
+                self.set(setting, known)
+        if known == value:
+            return False
+        if apply(value):
+            self.set(setting, value)
+            return True
+        return False
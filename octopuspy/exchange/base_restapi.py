@@ -5,6 +5,7 @@ import time
 import logging
 from logging import Logger
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 # parameters for create a new restful client
 ClientParams = namedtuple('ClientParams', ['base_url', 'api_key', 'secret', 'passphrase'])
@@ -20,6 +21,34 @@ OrderStatus = namedtuple('OrderStatus', ['order_id', 'client_id', 'side', 'price
 Ticker = namedtuple('Ticker', ['s', 'p', 'q']) # s for symbol, p for price, q for quantity
 # ap for ask price, aq for ask quantity, bp for bid price, bq for bid quantity
 AskBid = namedtuple('AskBid', ['ap', 'aq', 'bp', 'bq'])
+# parameters for modifying a resting order: new price and quantity of order_id,
+# client_id is kept (or given to the replacing order), type and tif are used by cancel-replace
+AmendOrder = namedtuple('AmendOrder', ['order_id', 'client_id', 'side', 'price', 'quantity', 'type', 'tif'])
+# result of open_orders_since: orders (open ones, and closed ones when incremental), cursor of the next
+# call (opaque, exchange specific), full: orders is a complete snapshot of the open orders
+OrderChanges = namedtuple('OrderChanges', ['orders', 'cursor', 'full'])
+
+CANCEL_ALL_CHUNK = 20      # order ids per batch_cancel of the cancel_all fallback
+CANCEL_ALL_WORKERS = 8     # concurrent cancel requests of cancel_all
+QUERY_WORKERS = 8          # concurrent order_status requests of orders_status
+
+def partition_orders(items, symbols: list = None, norm=None) -> dict:
+    """ (exchange symbol, OrderStatus) of an account wide query -> symbol -> list[OrderStatus]
+        symbols None: keyed by exchange symbol; otherwise keyed by the given symbols, every one present,
+        norm(symbol) is the exchange symbol of a given symbol
+    """
+    if symbols is None:
+        res = {}
+        for key, status in items:
+            res.setdefault(key, []).append(status)
+        return res
+    wanted = {(norm(symbol) if norm else symbol): symbol for symbol in symbols}
+    res = {symbol: [] for symbol in symbols}
+    for key, status in items:
+        symbol = wanted.get(key)
+        if symbol is not None:
+            res[symbol].append(status)
+    return res
 
 class ORDER_STATE_CONSTANTS:
     UNKNOWN = -1
@@ -100,7 +129,7 @@ class BaseClient:
         pass
 
     def open_orders(self, symbol: str) -> list[OrderStatus]:
-        """ List open orders
+        """ List open orders, None on error ([] means there are none)
         """
         # unified for mock test
         if self.mock:
@@ -160,3 +189,150 @@ class BaseClient:
                     OrderStatus(order_id="mock_order_001", client_id="mock_clorder_id_001",side='SELL',
                                 price=1.0, state=ORDER_STATE_CONSTANTS.NEW, origQty=1.0),]
         pass
+
+    def amend_orders(self, amends: list[AmendOrder], symbol: str = '') -> list[OrderID]:
+        """ modify resting orders, returns the ids of the amended (or replacing) orders
+            Emulated by batch_cancel and batch_make_orders, clients with a native amend override it.
+        """
+        # unified for mock test
+        if self.mock:
+            time.sleep(0.1)
+            return [OrderID(order_id="mock_order_001", client_id="mock_clorder_id_001"),
+                    OrderID(order_id="mock_order_002", client_id="mock_clorder_id_002")]
+        if not amends:
+            return []
+        cancelled = {str(item.order_id) for item in self.batch_cancel([item.order_id for item in amends], symbol) or []}
+        # replace only the orders which are really cancelled (not filled in the meantime)
+        orders = [NewOrder(symbol=symbol, client_id=item.client_id, side=item.side, type=item.type,
+                           quantity=item.quantity, price=item.price, biz_type='', tif=item.tif,
+                           position_side='')
+                  for item in amends if str(item.order_id) in cancelled]
+        if not orders:
+            return []
+        return self.batch_make_orders(orders, symbol) or []
+
+    def iter_open_orders(self, symbol: str):
+        """ open orders of symbol as they arrive, page by page on clients with paginated queries,
+            so callers can start before the last page and keep memory bounded; raises RuntimeError
+            on error, after the orders of the pages already received
+        """
+        if self.mock:
+            yield from BaseClient.open_orders(self, symbol)
+            return
+        orders = self.open_orders(symbol)
+        if orders is None:
+            raise RuntimeError(f"open orders of {symbol} failed")
+        yield from orders
+
+    def open_orders_since(self, symbol: str, cursor=None) -> OrderChanges:
+        """ open orders changed since cursor, a full snapshot when cursor is None, None on error
+            Clients without change queries always return a full snapshot (cursor None).
+        """
+        orders = self.open_orders(symbol)
+        if orders is None:
+            return None
+        return OrderChanges(orders=list(orders), cursor=None, full=True)
+
+    def open_orders_many(self, symbols: list[str] = None) -> dict:
+        """ open orders of many symbols (of the whole account when None), symbol -> list[OrderStatus],
+            None on error (also when the query of one symbol fails: {} means there are none)
+            Fallback of clients without an account wide query: concurrent open_orders per symbol.
+        """
+        if symbols is None and not self.mock:
+            self.logger.error("%s: open_orders_many needs the symbols", type(self).__name__)
+            return None
+        symbols = list(symbols or [])
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(len(symbols), QUERY_WORKERS)) as pool:
+            res = dict(zip(symbols, pool.map(self.open_orders, symbols)))
+        failed = [symbol for symbol, orders in res.items() if orders is None]
+        if failed:
+            self.logger.error("open orders of %s fail", failed)
+            return None
+        return res
+
+    def orders_status(self, order_ids: list[str], symbol: str = '') -> dict:
+        """ status of many orders, order id -> OrderStatus, None on error; unknown ids are left out
+            Fallback of clients without a multi-id query: one open_orders snapshot,
+            then concurrent order_status of the ids which are not open any more.
+        """
+        order_ids = [str(order_id) for order_id in order_ids]
+        # unified for mock test
+        if self.mock:
+            time.sleep(0.1)
+            return {order_id: OrderStatus(order_id=order_id, client_id="mock_clorder_id_001", side='BUY',
+                                          price=1.0, state=ORDER_STATE_CONSTANTS.NEW, origQty=1.0)
+                    for order_id in order_ids}
+        if not order_ids:
+            return {}
+        wanted = set(order_ids)
+        open_orders = self.open_orders(symbol)
+        if open_orders is None:
+            return None
+        res = {str(item.order_id): item for item in open_orders if str(item.order_id) in wanted}
+        missing = [order_id for order_id in order_ids if order_id not in res]
+        if missing:
+            try:
+                with ThreadPoolExecutor(max_workers=min(len(missing), QUERY_WORKERS)) as pool:
+                    for order_id, items in zip(missing, pool.map(lambda oid: self.order_status(oid, symbol), missing)):
+                        for item in items or []:
+                            if str(item.order_id) == order_id:
+                                res[order_id] = item
+            except Exception as e:
+                self.logger.error("[%s] order status fail: %s", symbol, e)
+                return None
+        return res
+
+    def orders_status_requests(self, count: int, closed: int = 0) -> int:
+        """ requests orders_status sends for count ids of which closed are not open any more,
+            for request budgets; the fallback sends one open_orders and one order_status per closed id
+        """
+        return 1 + closed if count else 0
+
+    def cancel_all(self, symbol: str = None) -> bool:
+        """ cancel every open order of symbol, of all symbols when symbol is None
+            returns True when all cancels were accepted
+            Fallback of clients without a mass cancel: open_orders, then batch_cancel in concurrent chunks.
+        """
+        # unified for mock test
+        if self.mock:
+            time.sleep(0.1)
+            return True
+        if symbol is None:
+            self.logger.error("%s: cancel_all needs a symbol", type(self).__name__)
+            return False
+        orders = self.open_orders(symbol)
+        if orders is None:
+            return False
+        return self._cancel_chunks([order.order_id for order in orders], symbol)
+
+    def _cancel_chunks(self, order_ids: list, symbol: str) -> bool:
+        """ batch_cancel of order_ids in chunks sent concurrently
+        """
+        chunks = [order_ids[i: i+CANCEL_ALL_CHUNK] for i in range(0, len(order_ids), CANCEL_ALL_CHUNK)]
+        if not chunks:
+            return True
+
+        def cancel(ids):
+            try:
+                return self.batch_cancel(ids, symbol)
+            except Exception as e:
+                self.logger.error("[%s] cancel_all of %s orders fail: %s", symbol, len(ids), e)
+                return []
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), CANCEL_ALL_WORKERS)) as pool:
+            cancelled = sum(len(res or []) for res in pool.map(cancel, chunks))
+        if cancelled < len(order_ids):
+            self.logger.error("[%s] cancel_all: %s / %s orders canceled", symbol, cancelled, len(order_ids))
+            return False
+        return True
+
+    def _cancel_symbols(self, symbols) -> bool:
+        """ cancel_all of each symbol concurrently
+        """
+        symbols = sorted(set(symbols))
+        if not symbols:
+            return True
+        with ThreadPoolExecutor(max_workers=min(len(symbols), CANCEL_ALL_WORKERS)) as pool:
+            return all(list(pool.map(self.cancel_all, symbols)))
@@ -4,6 +4,8 @@ import json
 from logging import Logger
 from typing import Dict, List, Optional, Callable
 
+from ...utils import metrics_util
+
 class BifuPublicWSClient:
     """ WebSocket Client for Public Data of BiFu
     """
@@ -50,6 +52,7 @@ class BifuPublicWSClient:
         if self.logger:
             self.logger.info(f"Attempting to reconnect in {self.reconnect_interval} seconds...")
         await asyncio.sleep(self.reconnect_interval)
+        metrics_util.WS_RECONNECTS.inc("bifu")
         await self.connect()
     
     async def _heartbeat(self):
@@ -80,6 +83,22 @@ class BifuPublicWSClient:
                     self.logger.error(f"Message handling error: {e}")
                 break
     
+    @staticmethod
+    def _event_ms(data: dict) -> int:
+        """ exchange time of a message in ms (ts of the message or of its data), 0 if absent
+        """
+        payload = data.get("data")
+        if isinstance(payload, list):
+            payload = payload[0] if payload else None
+        for item in (data, payload if isinstance(payload, dict) else {}):
+            for key in ("ts", "timestamp", "time", "t"):
+                try:
+                    value = int(item[key])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                return value * 1000 if value < 10 ** 11 else value  # seconds on some channels
+        return 0
+
     async def _process_message(self, message: str):
         """ Process incoming message
         
@@ -98,6 +117,7 @@ class BifuPublicWSClient:
             # Handle subscription messages
             if "channel" in data:
                 channel = data["channel"]
+                metrics_util.observe_ws_message("bifu", channel, self._event_ms(data))
                 if channel in self.message_handlers:
                     for handler in self.message_handlers[channel]:
                         await handler(data)
@@ -2,11 +2,13 @@ import time
 import json
 import hmac
 import hashlib
-import requests
 from logging import Logger
 
 from ..base_restapi import ORDER_STATE_CONSTANTS, AskBid, BaseClient, NewOrder, OrderID, OrderStatus, Ticker, ClientParams
-BATCH_SIZE = 20
+from .. import conn_pool
+from ..instrument import get_registry, bifu_instruments
+from ..account_config import AccountConfigCache
+from .orders import BATCH_SIZE, BIFU_ORDER_STATE_CONSTANTS, BifuOrdersMixin
 
 TIF_MAP = {
     'GTC': 'GOOD_TIL_CANCEL',
@@ -15,38 +17,25 @@ TIF_MAP = {
     'IOC': 'IMMEDIATE_OR_CANCEL'
 }
 
-class BIFU_ORDER_STATE_CONSTANTS(ORDER_STATE_CONSTANTS):
-    """ UNKNOWN_ORDER_STATUS, PENDING, OPEN, FILLED, CANCELING, CANCELED, UNTRIGGERED, UNRECOGNIZED
-    """
-    @classmethod
-    def parse(cls, state: str) -> int:
-        """ parse state to int
-        """
-        if state == 'OPEN':
-            return cls.NEW
-        elif state == 'PARTIALLY_FILLED':
-            return cls.PARTIALLY_FILLED
-        elif state == 'FILLED':
-            return cls.FILLED
-        elif state == 'CANCELED':
-            return cls.CANCELED
-        elif state == 'REJECTED':
-            return cls.REJECTED
-        elif state == 'EXPIRED':
-            return cls.EXPIRED
-        return cls.UNKNOWN
-
 BIFU_BASE_URL = "https://api.bifu.co"
 BIFU_TEST_URL = "http://api.bifu.internal"
 
-class BifuFutureClient(BaseClient):
+class BifuFutureClient(BifuOrdersMixin, BaseClient):
     """ Restful API Client for Spot Trading of BiFu
     """
-    def __init__(self, params: ClientParams, logger: Logger):
-        """ https://api.bifu.co """
+    ORDER_PATH = '/api/v1/private/contract/order'
+
+    def __init__(self, params: ClientParams, logger: Logger, persist_config: bool = False):
+        """ https://api.bifu.co
+            persist_config: keep the known account settings in redis, restarts skip unchanged ones
+        """
         super().__init__(params, logger)
         if not self.base_url:
             self.base_url = BIFU_TEST_URL # default
+        # per account session on the connection pool shared by all clients of the host
+        self.session = conn_pool.session(self.base_url)
+        self.instruments = get_registry(("bifu", self.base_url, "future"), self._load_instruments)
+        self.account_config = AccountConfigCache("bifu", self.api_key, persist=persist_config, logger=logger)
             
     def _sign(self, path):
         ts = int(1000 * time.time())
@@ -62,13 +51,13 @@ class BifuFutureClient(BaseClient):
 
     def _get(self, path, headers: dict = None):
         if headers:
-            return requests.get(url=f'{self.base_url}{path}', headers=headers, timeout=5)
-        return requests.get(f'{self.base_url}{path}', timeout=5)
+            return self.session.get(url=f'{self.base_url}{path}', headers=headers, timeout=5)
+        return self.session.get(f'{self.base_url}{path}', timeout=5)
 
     def _post(self, path, payload: dict, headers: dict = None):
         if headers:
-            return requests.post(url=f'{self.base_url}{path}', json=payload, headers=headers, timeout=5)
-        return requests.post(f'{self.base_url}{path}', json=payload, timeout=5)
+            return self.session.post(url=f'{self.base_url}{path}', json=payload, headers=headers, timeout=5)
+        return self.session.post(f'{self.base_url}{path}', json=payload, timeout=5)
 
     def top_askbid(self, symbol: str) -> list[AskBid]:
         """ limit must be 15 or 200"""
@@ -142,7 +131,7 @@ class BifuFutureClient(BaseClient):
         if self.mock:
             return super().ticker(symbol)   # call mock function if self.mock
         path = f'/api/v1/public/quote/getTicker?instrumentId={symbol}'
-        res = requests.get(url=f'{self.base_url}{path}', timeout=5).json()
+        res = self.session.get(url=f'{self.base_url}{path}', timeout=5).json()
         if res.get('code') == 'SUCCESS' and res.get('data'):
             return [Ticker(s=symbol, p=res['data'][0]['lastPrice'], q=res['data'][0]['size'])]
         return []
@@ -197,6 +186,15 @@ class BifuFutureClient(BaseClient):
         res = self._get(path)
         return res.json()
 
+    def _load_instruments(self) -> list:
+        """ all instruments of getMetaData for self.instruments
+        """
+        try:
+            return bifu_instruments(self.symbol_info(), contract=True)
+        except Exception as e:
+            self.logger.error("load instruments error: %s", e)
+            return []
+
     def balance(self) -> dict:
         """ Response
         """
@@ -232,6 +230,36 @@ class BifuFutureClient(BaseClient):
         res = self._post(path, payload, header)
         return res.json()
 
+    def ensure_leverage(self, symbol: str, margin_mode: str, leverage: int) -> bool:
+        """ set_leverage only if it differs from the known setting, returns True if it was changed
+        """
+        def apply(value):
+            try:
+                res = self.set_leverage(symbol, margin_mode, int(value))
+            except Exception as e:
+                self.logger.error("set_leverage %s error: %s", symbol, e)
+                return False
+            if res.get('code') != 'SUCCESS':
+                self.logger.error("set_leverage %s error: %s", symbol, res)
+                return False
+            return True
+        return self.account_config.ensure(f"leverage:{symbol}:{margin_mode}", leverage, apply)
+
+    def ensure_account(self, symbol: str, margin_mode: str, separated_mode: str, position_mode: str) -> bool:
+        """ set_account only if the modes differ from the known setting, returns True if it was changed
+        """
+        def apply(value):
+            try:
+                res = self.set_account(symbol, margin_mode, separated_mode, position_mode)
+            except Exception as e:
+                self.logger.error("set_account %s error: %s", symbol, e)
+                return False
+            if res.get('code') != 'SUCCESS':
+                self.logger.error("set_account %s error: %s", symbol, res)
+                return False
+            return True
+        return self.account_config.ensure(f"account:{symbol}", f"{margin_mode}|{separated_mode}|{position_mode}", apply)
+
     def open_orders(self, symbol: str) -> list[OrderStatus]:
         """ get open orders
             Response:
@@ -307,31 +335,12 @@ class BifuFutureClient(BaseClient):
         """
         if self.mock:
             return super().open_orders(symbol)   # call mock function if self.mock
-        path = '/api/v1/private/contract/order/getActiveOrderPage2'
-        headers = self._sign(path=path)
-        open_orders = []
-        page_no = 0
-        while 1:
-            params = {
-                'filterSymbolIdList': [symbol],
-                'pageNo': page_no,
-                'pageSize': 100,
-            }
-            res = requests.get(
-                url=f'{self.base_url}{path}', params=params, headers=headers, timeout=5)
-            page = res.json()
-            if page.get('data') and page['data'].get('dataList'):
-                open_orders.extend([OrderStatus(order_id=str(order['id']),
-                    client_id=order['clientOrderId'],
-                    side=order['orderSide'],
-                    price=order['price'],
-                    state=BIFU_ORDER_STATE_CONSTANTS.parse(order['status']),
-                    origQty=order['size']) for order in page['data']['dataList'] if order['status'] != 'CANCELING'])
-                page_no += 1
-                if page['data']['nextFlag']:
-                    continue
-            break
-        return open_orders
+        try:
+            return list(self.iter_open_orders(symbol))
+        except Exception as e:
+            # never a partial list: the orders of the pages after the error would look closed
+            self.logger.error("[%s] open orders fail: %s", symbol, e)
+            return None
 
     def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
         """ Response:
@@ -377,7 +386,7 @@ class BifuFutureClient(BaseClient):
                 } for order in orders]
             }
             headers = self._sign(path=path)
-            res = requests.post(url=f'{self.base_url}{path}', json=body,
+            res = self.session.post(url=f'{self.base_url}{path}', json=body,
                 headers=headers, timeout=5).json()
             sub_orders = []
             if res and res['data'] and res['data']['list']:
@@ -420,7 +429,7 @@ class BifuFutureClient(BaseClient):
             }
 
             headers = self._sign(path=path)
-            res = requests.post(url=f'{self.base_url}{path}', json=body,
+            res = self.session.post(url=f'{self.base_url}{path}', json=body,
                 headers=headers, timeout=5).json()
             if res and res['data'] and res['data']['list']:
                 for item in res['data']['list']:
@@ -453,7 +462,7 @@ class BifuFutureClient(BaseClient):
         if len(order_ids) <= BATCH_SIZE:
             body = {'orderIdList': order_ids}
             headers = self._sign(path=path)
-            res = requests.post(url=f'{self.base_url}{path}', json=body,
+            res = self.session.post(url=f'{self.base_url}{path}', json=body,
                 headers=headers, timeout=5).json()
             results = []
             if res.get('code') == 'SUCCESS' and res.get('data') and res.get('data').get('cancelResultMap'):
@@ -465,7 +474,7 @@ class BifuFutureClient(BaseClient):
         for start in range(0, len(order_ids), BATCH_SIZE):
             body = {'orderIdList': order_ids[start: start+BATCH_SIZE]}
             headers = self._sign(path=path)
-            res = requests.post(url=f'{self.base_url}{path}', json=body,
+            res = self.session.post(url=f'{self.base_url}{path}', json=body,
                 headers=headers, timeout=5).json()
             if res.get('code') == 'SUCCESS' and res.get('data') and res.get('data').get('cancelResultMap'):
                 for cancel_id in res['data']['cancelResultMap']:
@@ -556,7 +565,7 @@ class BifuFutureClient(BaseClient):
         path = '/api/v1/private/contract/order/getOrderById'
         query = f"orderIdList={order_id}"
         headers = self._sign(path=path)
-        res = requests.get(url=f'{self.base_url}{path}', params=query, headers=headers, timeout=5).json()
+        res = self.session.get(url=f'{self.base_url}{path}', params=query, headers=headers, timeout=5).json()
         if res.get('code') == 'SUCCESS' and res.get('data'):
             return [OrderStatus(order_id=order['id'],
                     client_id=order['clientOrderId'],
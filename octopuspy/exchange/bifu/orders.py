@@ -0,0 +1,149 @@
+""" order queries and mass cancel shared by the Bifu spot and contract clients
+    Both APIs have the same order endpoints under a different prefix (ORDER_PATH of the client)
+    and the same order objects, only the symbol field differs (contractId / symbolId).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from ..base_restapi import ORDER_STATE_CONSTANTS, OrderStatus, QUERY_WORKERS, partition_orders
+BATCH_SIZE = 20
+
+class BIFU_ORDER_STATE_CONSTANTS(ORDER_STATE_CONSTANTS):
+    """ UNKNOWN_ORDER_STATUS, PENDING, OPEN, FILLED, CANCELING, CANCELED, UNTRIGGERED, UNRECOGNIZED
+    """
+    @classmethod
+    def parse(cls, state: str) -> int:
+        """ parse state to int
+        """
+        if state == 'OPEN':
+            return cls.NEW
+        elif state == 'PARTIALLY_FILLED':
+            return cls.PARTIALLY_FILLED
+        elif state == 'FILLED':
+            return cls.FILLED
+        elif state == 'CANCELED':
+            return cls.CANCELED
+        elif state == 'REJECTED':
+            return cls.REJECTED
+        elif state == 'EXPIRED':
+            return cls.EXPIRED
+        return cls.UNKNOWN
+
+class BifuOrdersMixin:
+    """ needs self.session, self.base_url, self._sign and self.logger of a Bifu client,
+        placed before BaseClient in the bases
+    """
+    ORDER_PATH = ''         # e.g. '/api/v1/private/spot/order'
+
+    @staticmethod
+    def _order_symbol(order: dict) -> str:
+        return str(order.get('contractId') or order.get('symbolId'))
+
+    def _active_orders(self, symbol_ids: list = None):
+        """ active orders of symbol_ids (all when None) page by page, each page request signed anew
+        """
+        path = f'{self.ORDER_PATH}/getActiveOrderPage2'
+        page_no = 0
+        while True:
+            params = {'pageNo': page_no, 'pageSize': 100}
+            if symbol_ids:
+                params['filterSymbolIdList'] = ','.join(str(symbol_id) for symbol_id in symbol_ids)
+            page = self.session.get(url=f'{self.base_url}{path}', params=params,
+                headers=self._sign(path=path), timeout=5).json()
+            if page.get('code') != 'SUCCESS':
+                raise RuntimeError(f"active orders error: {page}")
+            data = page.get('data') or {}
+            yield data.get('dataList') or []
+            if not data.get('nextFlag') or not data.get('dataList'):
+                return
+            page_no += 1
+
+    def _to_status(self, order: dict) -> OrderStatus:
+        return OrderStatus(order_id=str(order['id']),
+            client_id=order['clientOrderId'],
+            side=order['orderSide'],
+            price=order['price'],
+            state=BIFU_ORDER_STATE_CONSTANTS.parse(order['status']),
+            origQty=order['size'])
+
+    def iter_open_orders(self, symbol: str):
+        """ open orders of symbol as each page of getActiveOrderPage2 arrives,
+            raises RuntimeError when a page fails
+        """
+        if self.mock:
+            yield from super().iter_open_orders(symbol)   # call mock function if self.mock
+            return
+        for page in self._active_orders([symbol]):
+            yield from (self._to_status(order) for order in page if order['status'] != 'CANCELING')
+
+    def open_orders_many(self, symbols: list = None) -> dict:
+        """ open orders of many symbols (of the account when None), symbol -> list[OrderStatus],
+            None on error ({} means there are none)
+            one paged getActiveOrderPage2 query with all symbols in filterSymbolIdList
+        """
+        if self.mock:
+            return super().open_orders_many(symbols)   # call mock function if self.mock
+        try:
+            items = [(self._order_symbol(order), self._to_status(order))
+                     for page in self._active_orders(symbols) for order in page if order['status'] != 'CANCELING']
+        except Exception as e:
+            self.logger.error("open orders of %s fail: %s", symbols, e)
+            return None
+        return partition_orders(items, symbols, str)
+
+    def orders_status_requests(self, count: int, closed: int = 0) -> int:
+        """ one getOrderById request per BATCH_SIZE ids
+        """
+        return -(-count // BATCH_SIZE)
+
+    def orders_status(self, order_ids: list, symbol: str = '') -> dict:
+        """ status of many orders, one getOrderById (orderIdList) request per BATCH_SIZE ids,
+            the requests are sent concurrently; None when one of them fails
+        """
+        if self.mock:
+            return super().orders_status(order_ids, symbol)   # call mock function if self.mock
+        path = f'{self.ORDER_PATH}/getOrderById'
+        order_ids = [str(order_id) for order_id in order_ids]
+        chunks = [order_ids[start: start+BATCH_SIZE] for start in range(0, len(order_ids), BATCH_SIZE)]
+
+        def query(chunk):
+            try:
+                return self.session.get(url=f'{self.base_url}{path}', params=f"orderIdList={','.join(chunk)}",
+                    headers=self._sign(path=path), timeout=5).json()
+            except Exception as e:
+                self.logger.error("[%s] orders status of %s fail: %s", symbol, chunk, e)
+                return {}
+
+        results = {}
+        if not chunks:
+            return results
+        with ThreadPoolExecutor(max_workers=min(len(chunks), QUERY_WORKERS)) as pool:
+            for res in pool.map(query, chunks):
+                if res.get('code') != 'SUCCESS':
+                    self.logger.error("[%s] orders status error: %s", symbol, res)
+                    return None
+                for order in res.get('data') or []:
+                    status = self._to_status(order)
+                    results[status.order_id] = status
+        return results
+
+    def cancel_all(self, symbol: str = None) -> bool:
+        """ cancel all active orders of symbol (of all symbols when None) in one request
+            Response:
+            {'code': 'SUCCESS', 'data': {}, 'msg': None, ...}
+            on failure the active orders are cancelled by id (paged open_orders, concurrent chunks)
+        """
+        if self.mock:
+            return super().cancel_all(symbol)   # call mock function if self.mock
+        path = f'{self.ORDER_PATH}/cancelAllOrder'
+        body = {'filterSymbolIdList': [symbol] if symbol else []}
+        try:
+            res = self.session.post(url=f'{self.base_url}{path}', json=body,
+                headers=self._sign(path=path), timeout=5).json()
+            if res.get('code') == 'SUCCESS':
+                return True
+            self.logger.error("[%s] cancel all orders error: %s", symbol, res)
+        except Exception as e:
+            self.logger.error("[%s] cancel all orders fail: %s", symbol, e)
+        if symbol is None:
+            return False
+        return super().cancel_all(symbol)
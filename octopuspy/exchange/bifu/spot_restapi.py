@@ -5,7 +5,9 @@ import requests
 from logging import Logger
 
 from ..base_restapi import ORDER_STATE_CONSTANTS, AskBid, BaseClient, NewOrder, OrderID, OrderStatus, Ticker, ClientParams
-BATCH_SIZE = 20
+from .. import conn_pool
+from ..instrument import get_registry, bifu_instruments
+from .orders import BATCH_SIZE, BIFU_ORDER_STATE_CONSTANTS, BifuOrdersMixin
 
 TIF_MAP = {
     'GTC': 'GOOD_TIL_CANCEL',
@@ -14,38 +16,22 @@ TIF_MAP = {
     'IOC': 'IMMEDIATE_OR_CANCEL'
 }
 
-class BIFU_ORDER_STATE_CONSTANTS(ORDER_STATE_CONSTANTS):
-    """ UNKNOWN_ORDER_STATUS, PENDING, OPEN, FILLED, CANCELING, CANCELED, UNTRIGGERED, UNRECOGNIZED
-    """
-    @classmethod
-    def parse(cls, state: str) -> int:
-        """ parse state to int
-        """
-        if state == 'OPEN':
-            return cls.NEW
-        elif state == 'PARTIALLY_FILLED':
-            return cls.PARTIALLY_FILLED
-        elif state == 'FILLED':
-            return cls.FILLED
-        elif state == 'CANCELED':
-            return cls.CANCELED
-        elif state == 'REJECTED':
-            return cls.REJECTED
-        elif state == 'EXPIRED':
-            return cls.EXPIRED
-        return cls.UNKNOWN
-
 BIFU_BASE_URL = "https://api.bifu.co"
 BIFU_TEST_URL = "http://api.bifu.internal"
 
-class BifuSpotClient(BaseClient):
+class BifuSpotClient(BifuOrdersMixin, BaseClient):
     """ Restful API Client for Spot Trading of BiFu
     """
+    ORDER_PATH = '/api/v1/private/spot/order'
+
     def __init__(self, params: ClientParams, logger: Logger):
         """ https://api.bifu.co """
         super().__init__(params, logger)
         if not self.base_url:
             self.base_url = BIFU_TEST_URL # default
+        # per account session on the connection pool shared by all clients of the host
+        self.session = conn_pool.session(self.base_url)
+        self.instruments = get_registry(("bifu", self.base_url, "spot"), self._load_instruments)
     
     def _sign(self, path):
         ts = int(1000 * time.time())
@@ -61,8 +47,8 @@ class BifuSpotClient(BaseClient):
 
     def _get(self, path, headers: dict = None):
         if headers:
-            return requests.get(url=f'{self.base_url}{path}', headers=headers, timeout=5)
-        return requests.get(f'{self.base_url}{path}', timeout=5)
+            return self.session.get(url=f'{self.base_url}{path}', headers=headers, timeout=5)
+        return self.session.get(f'{self.base_url}{path}', timeout=5)
 
     def top_askbid(self, symbol: str) -> list[AskBid]:
         """ limit must be 15 or 200"""
@@ -141,7 +127,7 @@ class BifuSpotClient(BaseClient):
             return super().ticker(symbol)   # call mock function if self.mock
         path = f'/api/v1/public/quote/getTicker?instrumentId={symbol}'
         try:
-            res = requests.get(url=f'{self.base_url}{path}', timeout=5).json()
+            res = self.session.get(url=f'{self.base_url}{path}', timeout=5).json()
         except requests.exceptions.RequestException:
             self.logger.error('ticker request %s failed', path)
             return []
@@ -199,6 +185,15 @@ class BifuSpotClient(BaseClient):
         res = self._get(path)
         return res.json()
 
+    def _load_instruments(self) -> list:
+        """ all instruments of getMetaData for self.instruments
+        """
+        try:
+            return bifu_instruments(self.symbol_info(), contract=False)
+        except Exception as e:
+            self.logger.error("load instruments error: %s", e)
+            return []
+
     def balance(self) -> dict:
         """ Response
         """
@@ -258,31 +253,12 @@ class BifuSpotClient(BaseClient):
         """
         if self.mock:
             return super().open_orders(symbol)   # call mock function if self.mock
-        path = '/api/v1/private/spot/order/getActiveOrderPage2'
-        headers = self._sign(path=path)
-        open_orders = []
-        page_no = 0
-        while 1:
-            params = {
-                'filterSymbolIdList': [symbol],
-                'pageNo': page_no,
-                'pageSize': 100,
-            }
-            res = requests.get(
-                url=f'{self.base_url}{path}', params=params, headers=headers, timeout=5)
-            page = res.json()
-            if page.get('data') and page['data'].get('dataList'):
-                open_orders.extend([OrderStatus(order_id=str(order['id']),
-                    client_id=order['clientOrderId'],
-                    side=order['orderSide'],
-                    price=order['price'],
-                    state=BIFU_ORDER_STATE_CONSTANTS.parse(order['status']),
-                    origQty=order['size']) for order in page['data']['dataList'] if order['status'] != 'CANCELING'])
-                page_no += 1
-                if page['data']['nextFlag']:
-                    continue
-            break
-        return open_orders
+        try:
+            return list(self.iter_open_orders(symbol))
+        except Exception as e:
+            # never a partial list: the orders of the pages after the error would look closed
+            self.logger.error("[%s] open orders fail: %s", symbol, e)
+            return None
 
     def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
         """ Response:
@@ -325,7 +301,7 @@ class BifuSpotClient(BaseClient):
 
             headers = self._sign(path=path)
             try:
-                res = requests.post(url=f'{self.base_url}{path}', json=body,
+                res = self.session.post(url=f'{self.base_url}{path}', json=body,
                     headers=headers, timeout=5).json()
                 self.logger.debug("Client batch_make_orders response: %s", res)
             except requests.exceptions.RequestException as e:
@@ -367,7 +343,7 @@ class BifuSpotClient(BaseClient):
 
             headers = self._sign(path=path)
             try:
-                res = requests.post(url=f'{self.base_url}{path}', json=body,
+                res = self.session.post(url=f'{self.base_url}{path}', json=body,
                     headers=headers, timeout=5).json()
             except requests.exceptions.RequestException as e:
                 self.logger.error(f"Request failed: {e}")
@@ -403,7 +379,7 @@ class BifuSpotClient(BaseClient):
         if len(order_ids) <= BATCH_SIZE:
             body = {'orderIdList': order_ids}
             headers = self._sign(path=path)
-            res = requests.post(url=f'{self.base_url}{path}', json=body,
+            res = self.session.post(url=f'{self.base_url}{path}', json=body,
                 headers=headers, timeout=5).json()
             results = []
             if res.get('code') == 'SUCCESS' and res.get('data') and res.get('data').get('cancelResultMap'):
@@ -415,7 +391,7 @@ class BifuSpotClient(BaseClient):
         for start in range(0, len(order_ids), BATCH_SIZE):
             body = {'orderIdList': order_ids[start: start+BATCH_SIZE]}
             headers = self._sign(path=path)
-            res = requests.post(url=f'{self.base_url}{path}', json=body,
+            res = self.session.post(url=f'{self.base_url}{path}', json=body,
                 headers=headers, timeout=5).json()
             if res.get('code') == 'SUCCESS' and res.get('data') and res.get('data').get('cancelResultMap'):
                 for cancel_id in res['data']['cancelResultMap']:
@@ -506,7 +482,7 @@ class BifuSpotClient(BaseClient):
         path = '/api/v1/private/spot/order/getOrderById'
         query = f"orderIdList={order_id}"
         headers = self._sign(path=path)
-        res = requests.get(url=f'{self.base_url}{path}', params=query, headers=headers, timeout=5).json()
+        res = self.session.get(url=f'{self.base_url}{path}', params=query, headers=headers, timeout=5).json()
         if res.get('code') == 'SUCCESS' and res.get('data'):
             return [OrderStatus(order_id=order['id'],
                     client_id=order['clientOrderId'],
@@ -22,8 +22,12 @@ if PKG_DIR not in sys.path:
     sys.path.insert(0, PKG_DIR)
 
 from ..base_restapi import (
-    AskBid, BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, Ticker, ORDER_STATE_CONSTANTS
+    AmendOrder, AskBid, BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, Ticker, ORDER_STATE_CONSTANTS,
+    partition_orders
 )
+from .. import conn_pool
+from ..instrument import get_registry, binance_instruments
+from ..quantizer import wire_orders, wire_price_qty
 
 """ Map bn status to am status:
 document: https://developers.binance.com/docs/binance-spot-api-docs/enums
@@ -63,6 +67,7 @@ FOK:    Fill or Kill
 
 BATCH_MAKE_SIZE = 5
 BATCH_CANCEL_SIZE = 10
+OPEN_ORDERS_WEIGHT = (1, 40)   # openOrders with / without symbol
 
 class BnFutureClient(BaseClient):
     """ https://papi.binance.com """
@@ -73,6 +78,9 @@ class BnFutureClient(BaseClient):
         super().__init__(params, logger=logger)
         self.future_client = Client(key=params.api_key, secret=params.secret)
         self.api = API(api_key=params.api_key, api_secret=params.secret, base_url="https://papi.binance.com")
+        conn_pool.mount_shared(self.future_client.session, self.future_client.base_url)
+        self.instruments = get_registry(("binance", self.future_client.base_url, "FUTURE"), self._load_instruments)
+        conn_pool.mount_shared(self.api.session, self.api.base_url)
 
     def tif_map(self, order_type:str, tif:str):
         if order_type == "LIMIT_MAKER":
@@ -87,6 +95,15 @@ class BnFutureClient(BaseClient):
     def norm_symbol(self, symbol:str) -> str:
         return symbol.replace("_", "").replace("-", "").upper()
     
+    def _load_instruments(self) -> list:
+        """ all USD-M symbols of exchangeInfo for self.instruments
+        """
+        try:
+            return binance_instruments(self.future_client.exchange_info(), "FUTURE")
+        except Exception as e:
+            self.logger.error("load instruments error: %s", e)
+            return []
+
     def balance(self, asset:str=None) -> dict:
         try:
             params = {"timestamp" : int(time.time()*1000)}
@@ -146,6 +163,17 @@ class BnFutureClient(BaseClient):
             self.logger.error("ticker error: %s", e)
             return []
     
+    def _to_status(self, item: dict) -> OrderStatus:
+        state = BN_STATUS_MAP.get(item["status"], ORDER_STATE_CONSTANTS.UNKNOWN)
+        if state == ORDER_STATE_CONSTANTS.UNKNOWN:
+            self.logger.debug("order status unknown: %s", item["status"])
+        return OrderStatus(order_id=str(item["orderId"]),
+                           client_id=item["clientOrderId"],
+                           side=item["side"],
+                           price=item["price"],
+                           state=state,
+                           origQty=item["origQty"])
+
     def open_orders(self, symbol: str) -> list[OrderStatus]:
         """ Portfolio get open orders
         ## Request:
@@ -186,21 +214,29 @@ class BnFutureClient(BaseClient):
         try:
             payload = {"symbol" : norm_symbol, "timestamp" : int(time.time()*1000)}
             res = self.api.sign_request("GET", "/papi/v1/um/openOrder", payload=payload)
-            _total_res = []
-            for item in res:
-                state = BN_STATUS_MAP.get(item["status"], ORDER_STATE_CONSTANTS.UNKNOWN)
-                if state == ORDER_STATE_CONSTANTS.UNKNOWN:
-                    self.logger.debug("order status unknown: %s", item["status"])
-                _total_res.append(OrderStatus(order_id=str(item["orderId"]),
-                                              client_id=item["clientOrderId"],
-                                              side=item["side"],
-                                              price=item["price"],
-                                              state=state,
-                                              origQty=item["origQty"]))
-            return _total_res
+            return [self._to_status(item) for item in res]
         except Exception as e:
             self.logger.error("open_orders fail: %s", e)
-            return []
+            return None     # [] would read as no open orders
+
+    def open_orders_many(self, symbols: list[str] = None) -> dict:
+        """ open orders of many symbols (of the account when None), symbol -> list[OrderStatus],
+        None on error ({} means there are none)
+        One /papi/v1/um/openOrders request without symbol partitioned locally; it weighs
+        OPEN_ORDERS_WEIGHT[1], so a few symbols are queried one by one (concurrently) instead.
+        """
+        if self.mock:
+            return super().open_orders_many(symbols)   # call mock function if self.mock
+        if symbols is not None and len(symbols) * OPEN_ORDERS_WEIGHT[0] <= OPEN_ORDERS_WEIGHT[1]:
+            return super().open_orders_many(symbols)
+        try:
+            res = self.api.sign_request("GET", "/papi/v1/um/openOrders",
+                                   payload={"timestamp" : int(time.time()*1000)})
+        except Exception as e:
+            self.logger.error("open_orders of the account fail: %s", e)
+            return None
+        return partition_orders(((item["symbol"], self._to_status(item)) for item in res),
+                                symbols, self.norm_symbol)
 
     def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
         """ Portfolio make batch orders
@@ -226,17 +262,18 @@ class BnFutureClient(BaseClient):
             return super().batch_make_orders(orders, symbol)   # call mock function if self.mock
         norm_symbol = self.norm_symbol(symbol)
         total_results = []
-        for order in orders:
+        for order, price, quantity in wire_orders(self.instruments.get(norm_symbol), orders, self.logger):
             _type, _tif = self.type_map(order.type, order.tif)
             _bn_order = {
                 "symbol" : norm_symbol,
                 "side" : order.side,
                 "type" : _type,
-                "quantity" : float(order.quantity),
-                "price" : float(order.price),
+                "quantity" : quantity,
                 "newClientOrderId" : order.client_id,
                 "positionSide" : "BOTH",    # One-way Mode
             }
+            if price:
+                _bn_order["price"] = price
             if _tif:
                 _bn_order["timeInForce"] = _tif
             try:
@@ -282,6 +319,51 @@ class BnFutureClient(BaseClient):
             self.logger.error("portfolio cancel um order [%s] fail: %s", order_id, e)
             return None
 
+    def cancel_all(self, symbol: str = None) -> bool:
+        """ Portfolio cancel all um open orders of a symbol: DELETE /papi/v1/um/allOpenOrders
+        symbol None: the symbols of all um open orders (GET /papi/v1/um/openOrders without symbol)
+        """
+        if self.mock:
+            return super().cancel_all(symbol)   # call mock function if self.mock
+        try:
+            if symbol is None:
+                res = self.api.sign_request("GET", "/papi/v1/um/openOrders",
+                                            payload={"timestamp" : int(time.time()*1000)})
+                return self._cancel_symbols(item["symbol"] for item in res)
+            _params = {"symbol" : self.norm_symbol(symbol), "timestamp" : int(time.time()*1000)}
+            res = self.api.sign_request("DELETE", "/papi/v1/um/allOpenOrders", payload=_params)
+            return res.get("code") == 200
+        except Exception as e:
+            self.logger.error("[%s] portfolio cancel all um orders fail: %s", symbol, e)
+            return False
+
+    def amend_orders(self, amends: list[AmendOrder], symbol: str = '') -> list[OrderID]:
+        """ Portfolio modify um LIMIT orders in place: PUT /papi/v1/um/order
+        Request:
+        Name	Type	Mandatory	Description
+        symbol	STRING	YES
+        orderId	LONG	NO
+        side	ENUM	YES
+        quantity	DECIMAL	YES
+        price	DECIMAL	YES
+        timestamp	LONG	YES
+        """
+        if self.mock:
+            return super().amend_orders(amends, symbol)   # call mock function if self.mock
+        norm_symbol = self.norm_symbol(symbol)
+        info = self.instruments.get(norm_symbol)
+        total_results = []
+        for amend in amends:
+            price, quantity = wire_price_qty(info, amend.side, amend.price, amend.quantity)
+            _params = {"symbol" : norm_symbol, "orderId" : int(amend.order_id), "side" : amend.side,
+                       "quantity" : quantity, "price" : price, "timestamp" : int(time.time()*1000)}
+            try:
+                res = self.api.sign_request("PUT", "/papi/v1/um/order", payload=_params)
+                total_results.append(OrderID(order_id=str(res["orderId"]), client_id=res["clientOrderId"]))
+            except Exception as e:
+                self.logger.error("portfolio amend um order %s fail: %s", amend, e)
+        return total_results
+
     def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
         """ Portfolio get um order status
         ## Request:
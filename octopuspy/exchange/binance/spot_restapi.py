@@ -6,8 +6,12 @@ import requests
 from logging import Logger
 
 from binance.spot import Spot as Client
+from .. import conn_pool
+from ..instrument import get_registry, binance_instruments
+from ..quantizer import wire_orders, wire_price_qty
 from ..base_restapi import (
-    AskBid, BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, Ticker, ORDER_STATE_CONSTANTS
+    AmendOrder, AskBid, BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, Ticker, ORDER_STATE_CONSTANTS,
+    partition_orders
 )
 
 """ Map bn status to am status:
@@ -46,6 +50,8 @@ FOK:    Fill or Kill
         An order will expire if the full order cannot be filled upon execution.
 """    
 
+OPEN_ORDERS_WEIGHT = (6, 80)   # openOrders with / without symbol
+
 class BnSpotClient(BaseClient):
     """ https://api.binance.com """
     def __init__(
@@ -55,6 +61,8 @@ class BnSpotClient(BaseClient):
         super().__init__(params, logger=logger)
         self.spot_client = Client(api_key=params.api_key, api_secret=params.secret,
                                   base_url = "https://testnet.binance.vision/api")  # use test_net
+        conn_pool.mount_shared(self.spot_client.session, self.spot_client.base_url)
+        self.instruments = get_registry(("binance", self.spot_client.base_url, "SPOT"), self._load_instruments)
         # self.spot_client = Client(api_key=params.api_key, api_secret=params.secret)
 
     def tif_map(self, order_type:str, tif:str):
@@ -67,6 +75,15 @@ class BnSpotClient(BaseClient):
             return "LIMIT_MAKER", ""
         return order_type.upper(), tif.upper()
         
+    def _load_instruments(self) -> list:
+        """ all symbols of exchangeInfo for self.instruments
+        """
+        try:
+            return binance_instruments(self.spot_client.exchange_info(), "SPOT")
+        except Exception as e:
+            self.logger.error("load instruments error: %s", e)
+            return []
+
     def balance(self, symbol:str=None):
         _params = {"timestamp" : int(time.time()*1000)}
         return self.spot_client.balance(**_params)
@@ -136,6 +153,17 @@ class BnSpotClient(BaseClient):
             self.logger.error("account error: %s", e)
             return {}
 
+    def _to_status(self, item: dict) -> OrderStatus:
+        state = BN_STATUS_MAP.get(item["status"], ORDER_STATE_CONSTANTS.UNKNOWN)
+        if state == ORDER_STATE_CONSTANTS.UNKNOWN:
+            self.logger.debug("order status unknown: %s", item["status"])
+        return OrderStatus(order_id=str(item["orderId"]),
+                           client_id=item["clientOrderId"],
+                           side=item["side"],
+                           price=item["price"],
+                           state=state,
+                           origQty=item["origQty"])
+
     def open_orders(self, symbol: str) -> list[OrderStatus]:
         """ get open orders
             Response:
@@ -148,25 +176,32 @@ class BnSpotClient(BaseClient):
             return super().open_orders(symbol)  # call mock function if self.mock
         try:
             res = self.spot_client.get_open_orders(symbol)
-            _total_res = []
-            for item in res:
-                state = BN_STATUS_MAP.get(item["status"], ORDER_STATE_CONSTANTS.UNKNOWN)
-                if state == ORDER_STATE_CONSTANTS.UNKNOWN:
-                    self.logger.debug("order status unknown: %s", item["status"])
-                _total_res.append(OrderStatus(order_id=str(item["orderId"]),
-                                              client_id=item["clientOrderId"],
-                                              side=item["side"],
-                                              price=item["price"],
-                                              state=state,
-                                              origQty=item["origQty"]))
-            return _total_res
+            return [self._to_status(item) for item in res]
         except Exception as e:
             self.logger.error("open_orders fail: %s", e)
-            return []
+            return None     # [] would read as no open orders
     
     def norm_symbol(self, symbol:str) -> str:
         return symbol.replace("_", "").replace("-", "").upper()
 
+    def open_orders_many(self, symbols: list[str] = None) -> dict:
+        """ open orders of many symbols (of the account when None), symbol -> list[OrderStatus],
+        None on error ({} means there are none)
+        One /api/v3/openOrders request without symbol partitioned locally; it weighs
+        OPEN_ORDERS_WEIGHT[1], so a few symbols are queried one by one (concurrently) instead.
+        """
+        if self.mock:
+            return super().open_orders_many(symbols)    # call mock function if self.mock
+        if symbols is not None and len(symbols) * OPEN_ORDERS_WEIGHT[0] <= OPEN_ORDERS_WEIGHT[1]:
+            return super().open_orders_many(symbols)
+        try:
+            res = self.spot_client.get_open_orders()
+        except Exception as e:
+            self.logger.error("open_orders of the account fail: %s", e)
+            return None
+        return partition_orders(((item["symbol"], self._to_status(item)) for item in res),
+                                symbols, self.norm_symbol)
+
     def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
         """ make batch orders by single order api
         """
@@ -174,13 +209,14 @@ class BnSpotClient(BaseClient):
             return super().batch_make_orders(orders, symbol)  # call mock function if self.mock
         norm_symbol = self.norm_symbol(symbol)
         total_results = []
-        for order in orders:
+        for order, price, quantity in wire_orders(self.instruments.get(norm_symbol), orders, self.logger):
             _params = {
-                "quantity" : float(order.quantity),
-                "price" : float(order.price),
+                "quantity" : quantity,
                 "newClientOrderId" : order.client_id,
                 "timestamp" : int(time.time()*1000)
             }
+            if price:
+                _params["price"] = price
             _type, _tif = self.type_map(order.type, order.tif)
             if _tif:
                 _params["timeInForce"] = _tif
@@ -231,6 +267,69 @@ class BnSpotClient(BaseClient):
             self.logger.error("cancel order [%s] fail: %s", order_id, e)
             return None
 
+    def cancel_all(self, symbol: str = None) -> bool:
+        """ cancel all open orders of a symbol in one request: DELETE /api/v3/openOrders
+        symbol None: the symbols of all open orders (GET /api/v3/openOrders without symbol)
+        """
+        if self.mock:
+            return super().cancel_all(symbol)  # call mock function if self.mock
+        if symbol is None:
+            try:
+                return self._cancel_symbols(item["symbol"] for item in self.spot_client.get_open_orders())
+            except Exception as e:
+                self.logger.error("cancel all open orders fail: %s", e)
+                return False
+        try:
+            self.spot_client.cancel_open_orders(self.norm_symbol(symbol), timestamp=int(time.time()*1000))
+            return True
+        except Exception as e:
+            # -2011 Unknown order sent: no open orders
+            if getattr(e, "error_code", None) == -2011:
+                return True
+            self.logger.error("[%s] cancel all orders fail: %s", symbol, e)
+            return False
+
+    def amend_orders(self, amends: list[AmendOrder], symbol: str = '') -> list[OrderID]:
+        """ cancel and replace each order in one request: POST /api/v3/order/cancelReplace
+        cancelReplaceMode STOP_ON_FAILURE: no new order if the cancel fails (e.g. already filled)
+        Response:
+        {
+            "cancelResult": "SUCCESS",
+            "newOrderResult": "SUCCESS",
+            "cancelResponse": {"symbol": "BTCUSDT", "orderId": 9, ...},
+            "newOrderResponse": {"symbol": "BTCUSDT", "orderId": 10, "clientOrderId": "...", ...}
+        }
+        """
+        if self.mock:
+            return super().amend_orders(amends, symbol)  # call mock function if self.mock
+        norm_symbol = self.norm_symbol(symbol)
+        info = self.instruments.get(norm_symbol)
+        total_results = []
+        for amend in amends:
+            price, quantity = wire_price_qty(info, amend.side, amend.price, amend.quantity)
+            _type, _tif = self.type_map(amend.type, amend.tif)
+            _params = {
+                "cancelOrderId" : int(amend.order_id),
+                "quantity" : quantity,
+                "price" : price,
+                "timestamp" : int(time.time()*1000)
+            }
+            if amend.client_id:
+                _params["newClientOrderId"] = amend.client_id
+            if _tif:
+                _params["timeInForce"] = _tif
+            try:
+                res = self.spot_client.cancel_and_replace(norm_symbol, amend.side, _type, "STOP_ON_FAILURE", **_params)
+                new_order = res.get("newOrderResponse") or {}
+                if res.get("newOrderResult") == "SUCCESS" and new_order.get("orderId"):
+                    total_results.append(OrderID(order_id=str(new_order["orderId"]),
+                                                 client_id=new_order["clientOrderId"]))
+                else:
+                    self.logger.error("bn amend order %s fail: %s", amend, res)
+            except Exception as e:
+                self.logger.error("bn amend order %s error: %s", amend, e)
+        return total_results
+
     def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
         """ order status
         """
@@ -18,8 +18,12 @@ if PKG_DIR not in sys.path:
     sys.path.insert(0, PKG_DIR)
 
 from binance.um_futures import UMFutures as Client
+from .. import conn_pool
+from ..instrument import get_registry, binance_instruments
+from ..quantizer import wire_orders, wire_price_qty
 from ..base_restapi import (
-    AskBid, BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, Ticker, ORDER_STATE_CONSTANTS
+    AmendOrder, AskBid, BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, Ticker, ORDER_STATE_CONSTANTS,
+    partition_orders
 )
 
 """ Map bn status to am status:
@@ -60,6 +64,7 @@ FOK:    Fill or Kill
 
 BATCH_MAKE_SIZE = 5
 BATCH_CANCEL_SIZE = 10
+OPEN_ORDERS_WEIGHT = (1, 40)   # openOrders with / without symbol
 
 class BnUMFutureClient(BaseClient):
     """ https://fapi.binance.com """
@@ -69,6 +74,8 @@ class BnUMFutureClient(BaseClient):
             logger: Logger=logging.getLogger(__file__)):
         super().__init__(params, logger=logger)
         self.future_client = Client(key=params.api_key, secret=params.secret)
+        conn_pool.mount_shared(self.future_client.session, self.future_client.base_url)
+        self.instruments = get_registry(("binance", self.future_client.base_url, "FUTURE"), self._load_instruments)
 
     def tif_map(self, order_type:str, tif:str):
         if order_type == "LIMIT_MAKER":
@@ -83,6 +90,15 @@ class BnUMFutureClient(BaseClient):
     def norm_symbol(self, symbol:str) -> str:
         return symbol.replace("_", "").replace("-", "").upper()
     
+    def _load_instruments(self) -> list:
+        """ all USD-M symbols of exchangeInfo for self.instruments
+        """
+        try:
+            return binance_instruments(self.future_client.exchange_info(), "FUTURE")
+        except Exception as e:
+            self.logger.error("load instruments error: %s", e)
+            return []
+
     def balance(self):
         try:
             params = {"timestamp" : int(time.time()*1000)}
@@ -132,6 +148,17 @@ class BnUMFutureClient(BaseClient):
             self.logger.error("ticker error: %s", e)
             return []
     
+    def _to_status(self, item: dict) -> OrderStatus:
+        state = BN_STATUS_MAP.get(item["status"], ORDER_STATE_CONSTANTS.UNKNOWN)
+        if state == ORDER_STATE_CONSTANTS.UNKNOWN:
+            self.logger.debug("order status unknown: %s", item["status"])
+        return OrderStatus(order_id=str(item["orderId"]),
+                           client_id=item["clientOrderId"],
+                           side=item["side"],
+                           price=item["price"],
+                           state=state,
+                           origQty=item["origQty"])
+
     def open_orders(self, symbol: str) -> list[OrderStatus]:
         """ Portfolio get open orders
             Response:
@@ -168,22 +195,29 @@ class BnUMFutureClient(BaseClient):
             return super().open_orders(symbol)   # call mock function if self.mock
         try:
             res = self.future_client.get_open_orders(symbol)
-            _total_res = []
-            for item in res:
-                state = BN_STATUS_MAP.get(item["status"], ORDER_STATE_CONSTANTS.UNKNOWN)
-                if state == ORDER_STATE_CONSTANTS.UNKNOWN:
-                    self.logger.debug("order status unknown: %s", item["status"])
-                _total_res.append(OrderStatus(order_id=str(item["orderId"]),
-                                              client_id=item["clientOrderId"],
-                                              side=item["side"],
-                                              price=item["price"],
-                                              state=state,
-                                              origQty=item["origQty"]))
-            return _total_res
+            return [self._to_status(item) for item in res]
         except Exception as e:
             self.logger.error("open_orders fail: %s", e)
-            return []
+            return None     # [] would read as no open orders
             
+    def open_orders_many(self, symbols: list[str] = None) -> dict:
+        """ open orders of many symbols (of the account when None), symbol -> list[OrderStatus],
+        None on error ({} means there are none)
+        One /fapi/v1/openOrders request without symbol partitioned locally; it weighs
+        OPEN_ORDERS_WEIGHT[1], so a few symbols are queried one by one (concurrently) instead.
+        """
+        if self.mock:
+            return super().open_orders_many(symbols)   # call mock function if self.mock
+        if symbols is not None and len(symbols) * OPEN_ORDERS_WEIGHT[0] <= OPEN_ORDERS_WEIGHT[1]:
+            return super().open_orders_many(symbols)
+        try:
+            res = self.future_client.get_orders()
+        except Exception as e:
+            self.logger.error("open_orders of the account fail: %s", e)
+            return None
+        return partition_orders(((item["symbol"], self._to_status(item)) for item in res),
+                                symbols, self.norm_symbol)
+
     def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
         """ make batch orders
         Name	Type	Mandatory	Description
@@ -205,30 +239,36 @@ class BnUMFutureClient(BaseClient):
             return super().batch_make_orders(orders, symbol)   # call mock function if self.mock
         norm_symbol = self.norm_symbol(symbol)
         total_results = []
-        for i in range(0, len(orders), BATCH_MAKE_SIZE):
-            _sub_orders = orders[i : i+BATCH_MAKE_SIZE]
+        wired = wire_orders(self.instruments.get(norm_symbol), orders, self.logger)
+        for i in range(0, len(wired), BATCH_MAKE_SIZE):
+            _sub_orders = wired[i : i+BATCH_MAKE_SIZE]
             _bn_list = []
-            for order in _sub_orders:
+            for order, price, quantity in _sub_orders:
                 _type, _tif = self.type_map(order.type, order.tif)
                 _bn_order = {
                     "symbol" : norm_symbol,
                     "side" : order.side,
                     "type" : _type,
-                    "quantity" : float(order.quantity),
-                    "price" : float(order.price),
+                    "quantity" : quantity,
                     "newClientOrderId" : order.client_id,
                     "positionSide" : "BOTH",    # One-way Mode
                 }
+                if price:
+                    _bn_order["price"] = price
                 if _tif:
                     _bn_order["timeInForce"] = _tif
                 _bn_list.append(_bn_order)
-                try:
-                    res = self.future_client.new_batch_order(_bn_list)
-                    for item in res:
+            # one request per sub batch
+            try:
+                res = self.future_client.new_batch_order(_bn_list)
+                for item in res:
+                    if item.get("orderId"):
                         total_results.append(OrderID(order_id=str(item["orderId"]),
                                             client_id=item["clientOrderId"]))
-                except Exception as e:
-                    self.logger.error("bn make order %s error: %s", order, e)
+                    else:
+                        self.logger.error("bn make order error: %s", item)
+            except Exception as e:
+                self.logger.error("bn make orders %s error: %s", _bn_list, e)
         return total_results
 
     def batch_cancel(self, order_ids: list, symbol: str = '') -> list[OrderID]:
@@ -254,11 +294,13 @@ class BnUMFutureClient(BaseClient):
             _bn_list = [int(id) for id in _sub_ids]
             try:
                 res = self.future_client.cancel_batch_order(norm_symbol, _bn_list, [])
-                total_res = total_res.extend(
-                    [OrderID(order_id=str(item["orderId"]), client_id=item["origClientOrderId"]) for item in res]
-                )
+                for item in res:
+                    if item.get("orderId"):
+                        total_res.append(OrderID(order_id=str(item["orderId"]), client_id=item["origClientOrderId"]))
+                    else:
+                        self.logger.error("bn cancel order error: %s", item)
             except Exception as e:
-                self.logger.error("cancel order [%s] fail: %s", id, e)
+                self.logger.error("cancel orders %s fail: %s", _sub_ids, e)
         return total_res
 
     def cancel_order(self, order_id: str, symbol: str = '') -> OrderID:
@@ -275,6 +317,57 @@ class BnUMFutureClient(BaseClient):
             self.logger.error("cancel order [%s] fail: %s", order_id, e)
             return None
 
+    def cancel_all(self, symbol: str = None) -> bool:
+        """ cancel all open orders of a symbol in one request: DELETE /fapi/v1/allOpenOrders
+        symbol None: the symbols of all open orders (GET /fapi/v1/openOrders without symbol)
+        """
+        if self.mock:
+            return super().cancel_all(symbol)   # call mock function if self.mock
+        try:
+            if symbol is None:
+                return self._cancel_symbols(item["symbol"] for item in self.future_client.get_orders())
+            res = self.future_client.cancel_open_orders(self.norm_symbol(symbol))
+            return res.get("code") == 200
+        except Exception as e:
+            self.logger.error("[%s] cancel all orders fail: %s", symbol, e)
+            return False
+
+    def amend_orders(self, amends: list[AmendOrder], symbol: str = '') -> list[OrderID]:
+        """ modify LIMIT orders in place, up to 5 per request: PUT /fapi/v1/batchOrders
+        (one order: PUT /fapi/v1/order), the orders keep their ids
+        """
+        if self.mock:
+            return super().amend_orders(amends, symbol)   # call mock function if self.mock
+        norm_symbol = self.norm_symbol(symbol)
+        info = self.instruments.get(norm_symbol)
+        total_results = []
+        for i in range(0, len(amends), BATCH_MAKE_SIZE):
+            _bn_list = []
+            for amend in amends[i : i+BATCH_MAKE_SIZE]:
+                price, quantity = wire_price_qty(info, amend.side, amend.price, amend.quantity)
+                _bn_list.append({
+                    "symbol" : norm_symbol,
+                    "orderId" : int(amend.order_id),
+                    "side" : amend.side,
+                    "quantity" : quantity,
+                    "price" : price,
+                })
+            try:
+                if len(_bn_list) == 1:
+                    res = [self.future_client.modify_order(**_bn_list[0])]
+                else:
+                    res = self.future_client.sign_request("PUT", "/fapi/v1/batchOrders",
+                                                          {"batchOrders": _bn_list}, True)
+                for item in res:
+                    if item.get("orderId"):
+                        total_results.append(OrderID(order_id=str(item["orderId"]),
+                                                     client_id=item["clientOrderId"]))
+                    else:
+                        self.logger.error("bn amend order error: %s", item)
+            except Exception as e:
+                self.logger.error("bn amend orders %s error: %s", _bn_list, e)
+        return total_results
+
     def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
         """ order status
         """
@@ -0,0 +1,88 @@
+""" connection pools shared by all clients (accounts) of the same host
+    Credentials and signing stay per client: requests based clients keep their own Session
+    (headers such as X-MBX-APIKEY live there) with a shared HTTPAdapter mounted, and the
+    httpx based OKX SDK objects keep their keys but use a shared transport.
+    Sockets per host are bounded by the pool size, not by the number of accounts.
+
+    A shared transport must not be closed by one client, do not call close() on the SDK objects,
+    use conn_pool.close() at shutdown.
+"""
+import threading
+from urllib.parse import urlsplit
+
+POOL_CONNECTIONS = 4    # urllib3 pools kept per adapter
+POOL_MAXSIZE = 32       # connections kept per host
+HTTPX_MAX_CONNECTIONS = 32
+
+_lock = threading.Lock()
+_adapters = {}      # host prefix -> requests HTTPAdapter
+_transports = {}    # host prefix -> httpx HTTPTransport
+
+def _prefix(base_url: str) -> str:
+    """ scheme://netloc/ of base_url, the mount prefix of a session
+    """
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+def http_adapter(base_url: str):
+    """ shared requests HTTPAdapter of the host of base_url
+    """
+    prefix = _prefix(base_url)
+    with _lock:
+        adapter = _adapters.get(prefix)
+        if adapter is None:
+            from requests.adapters import HTTPAdapter
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            _adapters[prefix] = adapter
+        return adapter
+
+def mount_shared(session, base_url: str):
+    """ route the requests of session to base_url through the shared adapter
+    """
+    session.mount(_prefix(base_url), http_adapter(base_url))
+    return session
+
+def session(base_url: str):
+    """ new requests Session of one client on the shared adapter of base_url
+    """
+    import requests
+    return mount_shared(requests.Session(), base_url)
+
+def httpx_transport(base_url: str, http2: bool = True):
+    """ shared httpx transport of the host of base_url
+    """
+    prefix = _prefix(base_url)
+    with _lock:
+        transport = _transports.get(prefix)
+        if transport is None:
+            import httpx
+            transport = httpx.HTTPTransport(
+                http2=http2, limits=httpx.Limits(max_connections=HTTPX_MAX_CONNECTIONS))
+            _transports[prefix] = transport
+        return transport
+
+def share_transport(client, base_url: str):
+    """ replace the own transport of a httpx.Client (e.g. an okx SDK API object) by the shared one
+    """
+    own = client._transport
+    client._transport = httpx_transport(base_url)
+    own.close()     # never used, release its pool
+    return client
+
+def stats() -> dict:
+    """ number of shared pools by kind
+    """
+    with _lock:
+        return {'requests': len(_adapters), 'httpx': len(_transports)}
+
+def close():
+    """ close all shared pools, clients created afterwards get new ones
+    """
+    with _lock:
+        adapters, transports = list(_adapters.values()), list(_transports.values())
+        _adapters.clear()
+        _transports.clear()
+    for adapter in adapters:
+        adapter.close()
+    for transport in transports:
+        transport.close()
@@ -3,6 +3,7 @@ import time
 from logging import Logger
 
 from ..base_restapi import ORDER_STATE_CONSTANTS, AskBid, BaseClient, NewOrder, OrderID, OrderStatus, Ticker, ClientParams
+from .. import conn_pool
 
 DOLPHIN_BASE_URL = "http://localhost:8763"
 DOLPHIN_TEST_URL = "http://localhost:8763"
@@ -36,10 +37,12 @@ class DolphinFutureClient(BaseClient):
         super().__init__(params, logger)
         if not self.base_url:
             self.base_url = DOLPHIN_TEST_URL # default
+        # per account session on the connection pool shared by all clients of the host
+        self.session = conn_pool.session(self.base_url)
     
     def _get(self, path, params: dict = None):
         try:
-            response = requests.get(f'{self.base_url}{path}', params=params, timeout=5)
+            response = self.session.get(f'{self.base_url}{path}', params=params, timeout=5)
             return response.json()
         except requests.exceptions.RequestException:
             self.logger.error('GET request %s failed', path)
@@ -47,7 +50,7 @@ class DolphinFutureClient(BaseClient):
     
     def _post(self, path, data: dict = None):
         try:
-            response = requests.post(f'{self.base_url}{path}', json=data, timeout=5)
+            response = self.session.post(f'{self.base_url}{path}', json=data, timeout=5)
             return response.json()
         except requests.exceptions.RequestException:
             self.logger.error('POST request %s failed', path)
@@ -55,7 +58,7 @@ class DolphinFutureClient(BaseClient):
     
     def _delete(self, path, params: dict = None):
         try:
-            response = requests.delete(f'{self.base_url}{path}', params=params, timeout=5)
+            response = self.session.delete(f'{self.base_url}{path}', params=params, timeout=5)
             return response.json()
         except requests.exceptions.RequestException:
             self.logger.error('DELETE request %s failed', path)
@@ -107,14 +110,15 @@ class DolphinFutureClient(BaseClient):
         path = '/fapi/v1/openOrders'
         params = {"symbol": symbol}
         res = self._get(path, params)
-        if res.get('code') == 200 and res.get('data'):
+        if res.get('code') == 200:
             return [OrderStatus(order_id=str(order['orderId']),
                     client_id=order.get('clientOrderId', ''),
                     side=order['side'],
                     price=order['price'],
                     state=DOLPHIN_ORDER_STATE_CONSTANTS.parse(order['status']),
-                    origQty=order['origQty']) for order in res['data']]
-        return []
+                    origQty=order['origQty']) for order in res.get('data') or []]
+        self.logger.error('open_orders response %s', res)
+        return None     # [] would read as no open orders
     
     def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
         """ Make batch orders """
@@ -172,13 +176,41 @@ class DolphinFutureClient(BaseClient):
             return res[0]
         return OrderID(order_id='', client_id='')
     
+    def orders_status_requests(self, count: int, closed: int = 0) -> int:
+        """ one open orders snapshot, whatever the ids
+        """
+        return 1 if count else 0
+
+    def orders_status(self, order_ids: list, symbol: str = '') -> dict:
+        """ Get status of many orders from one open orders snapshot, None on error;
+            only open orders can be queried (see order_status), the closed ones are left out """
+        if self.mock:
+            return super().orders_status(order_ids, symbol)   # call mock function if self.mock
+        wanted = {str(order_id) for order_id in order_ids}
+        open_orders = self.open_orders(symbol)
+        if open_orders is None:
+            return None
+        return {order.order_id: order for order in open_orders if order.order_id in wanted}
+    
+    def cancel_all(self, symbol: str = None) -> bool:
+        """ Cancel all open orders of a symbol in one request """
+        if self.mock:
+            return super().cancel_all(symbol)   # call mock function if self.mock
+        if symbol is None:
+            return super().cancel_all(symbol)
+        res = self._delete('/fapi/v1/allOpenOrders', {"symbol": symbol})
+        if res.get('code') == 200:
+            return True
+        self.logger.error('cancel_all response %s', res)
+        return super().cancel_all(symbol)
+    
     def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
         """ Get order status """
         if self.mock:
             return super().order_status(order_id, symbol)   # call mock function if self.mock
         # Dolphin API doesn't have a direct order status endpoint
         # We'll use open_orders and filter by order_id
-        open_orders = self.open_orders(symbol)
+        open_orders = self.open_orders(symbol) or []
         return [order for order in open_orders if order.order_id == order_id]
     
     def self_trade(self, symbol: str, side: str, price: str, qty: str, amt: str = '') -> list[OrderID]:
@@ -4,6 +4,8 @@ import json
 from logging import Logger
 from typing import Dict, List, Optional, Callable
 
+from ...utils import metrics_util
+
 class DolphinPublicWSClient:
     """ WebSocket Client for Public Data of Dolphin
     """
@@ -57,6 +59,7 @@ class DolphinPublicWSClient:
         if self.logger:
             self.logger.info(f"Attempting to reconnect in {self.reconnect_interval} seconds...")
         await asyncio.sleep(self.reconnect_interval)
+        metrics_util.WS_RECONNECTS.inc("dolphin")
         await self.connect(self.path)
     
     async def _heartbeat(self):
@@ -98,6 +101,7 @@ class DolphinPublicWSClient:
             # Handle subscription messages
             if "e" in data:
                 event_type = data["e"]
+                metrics_util.observe_ws_message("dolphin", event_type, data.get("E", 0))
                 if event_type in self.message_handlers:
                     for handler in self.message_handlers[event_type]:
                         await handler(data)
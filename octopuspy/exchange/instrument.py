@@ -0,0 +1,164 @@
+""" instrument metadata registry
+    All instruments of an exchange are loaded in one call, in the background as soon as the
+    registry is created (with the first client of the host) or by load(), refreshed in the
+    background after ttl, and indexed by exchange symbol, normalized symbol (BTC-USDT, BTC_USDT,
+    BTC/USDT -> BTCUSDT) and exchange id (e.g. Bifu symbolId). Lookups only wait for the first
+    load; reloads after a failure, an expired ttl or an unknown symbol never block them.
+    Registries are shared by all clients of the same exchange host, so they hold no account data:
+    fee rates depend on the account tier and are not indexed.
+
+    Usage:
+        registry = get_registry(("bifu", base_url, "spot"), lambda: bifu_instruments(client.symbol_info()))
+        info = registry.get("BTC-USDT")     # or registry.get("90000001")
+"""
+import time
+import threading
+from collections import namedtuple
+
+# sizes are kept as exchange strings, ct_val is '1' for spot
+InstrumentInfo = namedtuple('InstrumentInfo', ['symbol', 'exchange_id', 'biz_type', 'tick_size', 'step_size',
+                                               'min_size', 'max_size', 'ct_val'])
+
+DEFAULT_TTL = 3600.0
+MISS_RELOAD_INTERVAL = 60.0     # an unknown symbol reloads at most once per interval
+RETRY_INTERVAL = 5.0            # after a failed load
+FIRST_LOAD_WAIT = 10.0          # seconds a lookup waits for the first load
+
+def norm_symbol(symbol: str) -> str:
+    return str(symbol).replace("-", "").replace("_", "").replace("/", "").upper()
+
+
+class InstrumentRegistry:
+    """ instruments of one exchange (and business type), loaded in bulk
+    """
+    def __init__(self, loader, ttl: float = DEFAULT_TTL):
+        """ loader(): list[InstrumentInfo], one exchange request
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._by_symbol = {}
+        self._by_id = {}
+        self._loaded_at = 0.0       # last successful load
+        self._tried_at = 0.0        # last load attempt
+        self._first = threading.Event()     # set when the first load attempt ended
+        self._loading = None        # background load thread
+        self._loading_lock = threading.Lock()
+
+    def load(self) -> int:
+        """ (re)load all instruments, returns their number; on failure the previous ones are kept
+        """
+        with self._lock:
+            self._tried_at = time.monotonic()
+            try:
+                instruments = self.loader()
+                if not instruments:
+                    return 0
+                by_symbol, by_id = {}, {}
+                for info in instruments:
+                    by_symbol[info.symbol] = info
+                    by_symbol.setdefault(norm_symbol(info.symbol), info)
+                    if info.exchange_id:
+                        by_id[str(info.exchange_id)] = info
+                self._by_symbol, self._by_id = by_symbol, by_id
+                self._loaded_at = self._tried_at
+                return len(instruments)
+            finally:
+                self._first.set()
+
+    def refresh(self) -> threading.Thread:
+        """ load in a background thread, unless a load is running already
+        """
+        with self._loading_lock:
+            if self._loading is None or not self._loading.is_alive():
+                self._tried_at = time.monotonic()
+                self._loading = threading.Thread(target=self.load, name="instrument_load", daemon=True)
+                self._loading.start()
+            return self._loading
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if (not self._loaded_at or now - self._loaded_at > self.ttl) and now - self._tried_at > RETRY_INTERVAL:
+            self.refresh()
+        if not self._first.is_set():
+            self._first.wait(FIRST_LOAD_WAIT)
+
+    def _lookup(self, key: str) -> InstrumentInfo:
+        key = str(key)
+        return self._by_symbol.get(key) or self._by_id.get(key) or self._by_symbol.get(norm_symbol(key))
+
+    def get(self, key: str) -> InstrumentInfo:
+        """ instrument by exchange symbol, normalized symbol or exchange id, None if unknown
+        """
+        self._ensure_fresh()
+        info = self._lookup(key)
+        if info is None and time.monotonic() - self._tried_at > MISS_RELOAD_INTERVAL:
+            # may be listed after the last load: known to the next lookups
+            self.refresh()
+        return info
+
+    def by_id(self, exchange_id: str) -> InstrumentInfo:
+        self._ensure_fresh()
+        return self._by_id.get(str(exchange_id))
+
+    def symbols(self) -> list:
+        self._ensure_fresh()
+        return sorted({info.symbol for info in self._by_symbol.values()})
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(key: tuple, loader, ttl: float = DEFAULT_TTL) -> InstrumentRegistry:
+    """ shared registry of key, e.g. ("okx", base_url, "SWAP"); loader is used when it is created,
+        the first load starts at once in the background
+    """
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = InstrumentRegistry(loader, ttl)
+            registry.refresh()
+        return registry
+
+
+# loaders: exchange response -> list[InstrumentInfo]
+def okx_instruments(res: dict) -> list:
+    """ GET /api/v5/public/instruments
+    """
+    if res.get("code") != "0":
+        return []
+    return [InstrumentInfo(symbol=item["instId"], exchange_id=item.get("instIdCode", ""),
+                           biz_type=item.get("instType", ""), tick_size=item.get("tickSz", ""),
+                           step_size=item.get("lotSz", ""), min_size=item.get("minSz", ""),
+                           max_size=item.get("maxLmtSz", ""), ct_val=item.get("ctVal") or "1")
+            for item in res.get("data", [])]
+
+def bifu_instruments(res: dict, contract: bool = False) -> list:
+    """ getMetaData, symbolList for spot, contractList for future
+    """
+    if res.get("code") != "SUCCESS":
+        return []
+    data = res.get("data") or {}
+    items = data.get("contractList" if contract else "symbolList") or []
+    return [InstrumentInfo(symbol=item["contractName" if contract else "symbolName"],
+                           exchange_id=item["contractId" if contract else "symbolId"],
+                           biz_type="FUTURE" if contract else "SPOT",
+                           tick_size=item.get("tickSize", ""), step_size=item.get("stepSize", ""),
+                           min_size=item.get("minOrderSize", ""), max_size=item.get("maxOrderSize", ""),
+                           ct_val="1")
+            for item in items]
+
+def binance_instruments(res: dict, biz_type: str = "SPOT") -> list:
+    """ GET /api/v3/exchangeInfo or /fapi/v1/exchangeInfo
+    """
+    instruments = []
+    for item in res.get("symbols", []):
+        filters = {flt["filterType"]: flt for flt in item.get("filters", [])}
+        price_filter = filters.get("PRICE_FILTER", {})
+        lot_size = filters.get("LOT_SIZE", {})
+        instruments.append(InstrumentInfo(
+            symbol=item["symbol"], exchange_id="", biz_type=biz_type,
+            tick_size=price_filter.get("tickSize", ""), step_size=lot_size.get("stepSize", ""),
+            min_size=lot_size.get("minQty", ""), max_size=lot_size.get("maxQty", ""),
+            ct_val="1"))
+    return instruments
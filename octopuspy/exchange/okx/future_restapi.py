@@ -4,7 +4,6 @@
 
 import os
 import sys
-import math
 from logging import Logger
 from collections import namedtuple
 from okx import PublicData
@@ -13,8 +12,12 @@ PROJ_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJ_PATH not in sys.path:
     sys.path.insert(0, PROJ_PATH)
     
-from ..base_restapi import AskBid, ClientParams, NewOrder, OrderID, OrderStatus, Ticker
+from ..base_restapi import AmendOrder, AskBid, ClientParams, NewOrder, OrderID, OrderStatus, Ticker
 from .spot_restapi import OkxSpotClient
+from .. import conn_pool
+from ..account_config import AccountConfigCache
+from ..instrument import get_registry, okx_instruments
+from ..quantizer import wire_orders, wire_price_qty
 
 # parameters for contract instrument
 ContractInfo = namedtuple('ContractInfo', ['symbol', 'biz_type', 'group_id', 'ct_val', 'lever', 'lot_size', 'tick_size'])
@@ -38,8 +41,12 @@ lotSz   String  Order quantity precision, in lots
 BATCH_SIZE = 20
 
 class OkxFutureClient(OkxSpotClient):
-    def __init__(self, params: ClientParams, logger: Logger):
-        """ https://www.okx.com """
+    def __init__(self, params: ClientParams, logger: Logger, persist_config: bool = False, leverage: str = "1"):
+        """ https://www.okx.com
+            persist_config: keep the known account settings in redis, restarts skip unchanged ones
+            leverage: isolated leverage of every instrument, set before its first order if it differs
+                      (OKX sets leverage per instId), None leaves the account as it is
+        """
         super().__init__(params, logger)
         if not self.base_url:
             self.base_url = "https://www.okx.com" # default
@@ -49,10 +56,13 @@ class OkxFutureClient(OkxSpotClient):
                                                use_server_time=False,
                                                flag=self.demo_trading,
                                                domain = self.base_url)
+        conn_pool.share_transport(self.public_api, self.base_url)
+        self.inst_type = "SWAP"
+        self.account_config = AccountConfigCache("okx", self.api_key, persist=persist_config, logger=logger)
         # Set position mode: long_short_mode - Open/Close mode, net_mode - Buy/Sell mode
-        self.account_api.set_position_mode(posMode="net_mode")
-        self.account_api.set_leverage(lever="1", mgnMode="isolated")
-        self.contract_config={}
+        self.ensure_position_mode("net_mode")
+        self.leverage = leverage
+        self.instruments = get_registry(("okx", self.base_url, "SWAP"), self._load_instruments)
         self.mock = False   # use mock functions for test
         
     def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
@@ -82,26 +92,28 @@ class OkxFutureClient(OkxSpotClient):
             return super().batch_make_orders(orders, symbol)    # mock for test
 
         norm_symbol = self._norm_symbol(symbol)
-        if not self.contract_config.get(norm_symbol):
-            _info = self.instrument_info(norm_symbol)
-            self.contract_config[norm_symbol] = _info
-        ct_val = float(self.contract_config[norm_symbol].ct_val)    # Contract face value
-        lot_size = float(self.contract_config[norm_symbol].lot_size)    # Quantity precision
-        # tick_size = float(self.contract_config[norm_symbol].tick_size)  # Contract unit, not used for now
+        info = self.instruments.get(norm_symbol)
+        if info is None:
+            self.logger.error("[%s] unknown instrument", symbol)
+            return []
+        if self.leverage:
+            self.ensure_leverage(self.leverage, "isolated", norm_symbol)
+        # sz in contracts: quantity / ctVal in whole lots, px in whole ticks
+        wired = wire_orders(info, orders, self.logger)
         okx_orders = []
-        for item in orders:
+        for item, price, quantity in wired:
             okx_order = {
                 "instId":norm_symbol,
                 "tdMode":"isolated",
                 "clOrdId":self._norm_client_id(item.client_id),
                 "side":item.side.lower(),
                 "ordType":self._norm_type(item),
-                "px":item.price,
-                "sz":str(round(item.quantity/ct_val, int(-math.log10(lot_size)))),
+                "px":price,
+                "sz":quantity,
                 "posSide": "net",  # Buy/Sell mode
             }
             okx_orders.append(okx_order)
-            self.logger.debug("okx_orders: %s", okx_orders)
+        self.logger.debug("okx_orders: %s", okx_orders)
 
         am_res = []
         for i in range(0, len(okx_orders), BATCH_SIZE):
@@ -137,6 +149,16 @@ class OkxFutureClient(OkxSpotClient):
             return super().cancel_order(order_id, symbol)  # mock for test
         return super().cancel_order(order_id, symbol)
     
+    def _amend_request(self, amend: AmendOrder, norm_symbol: str) -> dict:
+        """ newSz in contracts and newPx in ticks, as batch_make_orders
+        """
+        info = self.instruments.get(norm_symbol)
+        if info is None:
+            self.logger.error("[%s] unknown instrument, amend of %s skipped", norm_symbol, amend.order_id)
+            return None
+        price, quantity = wire_price_qty(info, amend.side, amend.price, amend.quantity)
+        return {"instId": norm_symbol, "ordId": amend.order_id, "newPx": price, "newSz": quantity}
+
     def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
         """
         * symbol like: "BTC-USD-SWAP"
@@ -166,25 +188,59 @@ class OkxFutureClient(OkxSpotClient):
         """
         if self.mock:
             return super().open_orders(symbol)  # mock for test
-        okx_res = self.trade_api.get_order_list(instType='SWAP', instId=self._norm_symbol(symbol))
-        if okx_res["code"] =='0'and okx_res.get("data"):
-            return [OrderStatus(
-                order_id=item["ordId"],
-                client_id=self._recover_client_id(item["clOrdId"]),
-                side=item["side"],
-                price=item["px"],
-                state=self._norm_state(item),
-                origQty=item["sz"]
-            ) for item in okx_res["data"]]
-        self.logger.error("[%s] open orders error!: %s", symbol, okx_res)
-        return []
+        return super().open_orders(symbol)     # all pages of instType SWAP
     
+    def ensure_position_mode(self, pos_mode: str) -> bool:
+        """ set position mode only if the account is not in it, returns True if it was changed
+        """
+        def read():
+            res = self.account_api.get_account_config()
+            if res.get("code") == "0" and res.get("data"):
+                return res["data"][0].get("posMode")
+            return None
+
+        def apply(value):
+            res = self.account_api.set_position_mode(posMode=value)
+            if res.get("code") != "0":
+                self.logger.error("set_position_mode %s error: %s", value, res)
+                return False
+            return True
+        return self.account_config.ensure("posMode", pos_mode, apply, read)
+
+    def ensure_leverage(self, lever: str, mgn_mode: str, inst_id: str) -> bool:
+        """ set leverage of inst_id only if it differs from the known (or current) one
+        """
+        inst_id = self._norm_symbol(inst_id)
+
+        def read():
+            res = self.account_api.get_leverage(mgnMode=mgn_mode, instId=inst_id)
+            if res.get("code") == "0" and res.get("data"):
+                return res["data"][0].get("lever")
+            return None
+
+        def apply(value):
+            res = self.account_api.set_leverage(lever=value, mgnMode=mgn_mode, instId=inst_id)
+            if res.get("code") != "0":
+                self.logger.error("set_leverage %s %s %s error: %s", inst_id, mgn_mode, value, res)
+                return False
+            return True
+        return self.account_config.ensure(f"lever:{mgn_mode}:{inst_id}", lever, apply, read)
+
     def get_positions(self):
         """
         GET /api/v5/account/positions
         """
         return self.account_api.get_positions()
     
+    def _load_instruments(self) -> list:
+        """ all SWAP instruments in one request, for self.instruments
+        """
+        try:
+            return okx_instruments(self.public_api.get_instruments(instType="SWAP"))
+        except Exception as e:
+            self.logger.error("load instruments error: %s", e)
+            return []
+
     def instrument_info(self, symbol:str) -> ContractInfo:
         """
         GET /api/v5/public/instruments
@@ -3,7 +3,9 @@
 """
 import os
 import sys
+import time
 from logging import Logger, getLogger
+from concurrent.futures import ThreadPoolExecutor
 from okx import MarketData
 from okx import Account
 from okx import Trade
@@ -13,12 +15,16 @@ if PROJ_DIR not in sys.path:
     sys.path.insert(0, PROJ_DIR)
     
 from octopuspy.exchange.base_restapi import (
-    BaseClient, ClientParams, NewOrder, OrderID, Ticker, AskBid,
-    OrderStatus, ORDER_STATE_CONSTANTS as order_state
+    BaseClient, ClientParams, NewOrder, OrderID, Ticker, AskBid, AmendOrder,
+    OrderStatus, ORDER_STATE_CONSTANTS as order_state, CANCEL_ALL_WORKERS, partition_orders, OrderChanges
 )
+from octopuspy.exchange import conn_pool
 
 BATCH_ORDER_SIZE = 20
 BATCH_CANCEL_SIZE = 20
+OPEN_ORDERS_PAGE_SIZE = 100
+SYNC_OVERLAP_MS = 2000     # closed orders are queried again for this overlap, against clock skew
+SYNC_HISTORY_PAGES = 5     # orders-history pages of an incremental sync, a full snapshot is taken beyond
 
 OKX_TYPE_MAP = {
     'GTC': 'limit',
@@ -34,6 +40,7 @@ class OkxSpotClient(BaseClient):
         if not self.base_url:
             self.base_url = "https://www.okx.com" # default
         self.demo_trading = "0"  # live trading: 0, demo trading: 1
+        self.inst_type = "SPOT"  # instType of the pending orders of cancel_all
         self.market_data_api = MarketData.MarketAPI(api_key=self.api_key,
                                                     api_secret_key=self.secret,
                                                     passphrase=self.passphrase,
@@ -52,6 +59,9 @@ class OkxSpotClient(BaseClient):
                                         use_server_time=False,
                                         flag=self.demo_trading,
                                         domain=self.base_url)
+        # the three SDK objects of every account use one connection pool per host
+        for api in (self.market_data_api, self.account_api, self.trade_api):
+            conn_pool.share_transport(api, self.base_url)
 
     def _norm_symbol(self, symbol:str) -> str:
         return symbol.replace("_","-").upper()
@@ -242,18 +252,12 @@ class OkxSpotClient(BaseClient):
             "msg": ""
         }
         """
-        okx_res = self.trade_api.get_order_list(instType='SPOT', instId=self._norm_symbol(symbol))
-        if okx_res["code"] =='0'and okx_res.get("data"):
-            return [OrderStatus(
-                order_id=item["ordId"],
-                client_id=self._recover_client_id(item["clOrdId"]),
-                side=item["side"],
-                price=item["px"],
-                state=self._norm_state(item),
-                origQty=item["sz"]
-            ) for item in okx_res["data"]]
-        self.logger.error("[%s] open orders error!: %s", symbol, okx_res)
-        return []
+        try:
+            return list(self.iter_open_orders(symbol))
+        except Exception as e:
+            # never a partial list: the orders of the pages after the error would look closed
+            self.logger.error("[%s] open orders error!: %s", symbol, e)
+            return None
 
     def batch_cancel(self, order_ids: list[str], symbol: str) -> list[OrderID]:
         """ batch cancel orders
@@ -336,6 +340,205 @@ class OkxSpotClient(BaseClient):
         self.logger.error("[%s] cancel_order error!: %s", symbol, okx_res)           
         return None
 
+    def _amend_request(self, amend: AmendOrder, norm_symbol: str) -> dict:
+        """ amend request of one order, None to skip it
+        """
+        return {"instId": norm_symbol, "ordId": amend.order_id,
+                "newPx": str(amend.price), "newSz": str(amend.quantity)}
+
+    def amend_orders(self, amends: list[AmendOrder], symbol: str = '') -> list[OrderID]:
+        """ amend multiple orders in place, the orders keep their ids
+        Okx params:
+        instId String Yes Product ID
+        ordId String Optional Order ID, either ordId or clOrdId is required
+        newSz String Optional New quantity after amendment, including the executed quantity
+        newPx String Optional New price after amendment
+
+        Okx response:
+        {
+            "code":"0",
+            "msg":"",
+            "data":[
+                {
+                    "clOrdId":"",
+                    "ordId":"12344",
+                    "ts":"1695190491421",
+                    "reqId":"b12344",
+                    "sCode":"0",
+                    "sMsg":""
+                }
+            ]
+        }
+        """
+        if self.mock:
+            return super().amend_orders(amends, symbol)   # mock for test
+        norm_symbol = self._norm_symbol(symbol)
+        okx_amends = [req for req in (self._amend_request(item, norm_symbol) for item in amends) if req]
+        am_res = []
+        for i in range(0, len(okx_amends), BATCH_ORDER_SIZE):
+            okx_res = self.trade_api.amend_multiple_orders(okx_amends[i:i+BATCH_ORDER_SIZE])
+            for item in okx_res.get("data") or []:
+                if item.get("ordId") and item.get("sCode") == '0':
+                    am_res.append(OrderID(order_id=item["ordId"],
+                                          client_id=self._recover_client_id(item.get("clOrdId", ""))))
+                else:
+                    self.logger.error("[%s] failed to amend order: %s", symbol, item)
+            if not okx_res.get("data"):
+                self.logger.error("[%s] amend_orders error: %s", symbol, okx_res)
+        return am_res
+
+    def _pending_pages(self, inst_id: str = ''):
+        """ pending orders of inst_id (of self.inst_type when empty) page by page, 100 per page,
+        older pages by the after cursor; raises RuntimeError on an error response
+        """
+        after = ''
+        while True:
+            okx_res = self.trade_api.get_order_list(instType=self.inst_type, instId=inst_id, after=after)
+            if okx_res.get("code") != '0':
+                raise RuntimeError(f"pending orders error: {okx_res}")
+            page = okx_res.get("data") or []
+            yield page
+            if len(page) < OPEN_ORDERS_PAGE_SIZE:
+                return
+            after = page[-1]["ordId"]
+
+    def _pending_orders(self, inst_id: str = '') -> list[dict]:
+        """ all pending orders of inst_id, None on error
+        """
+        try:
+            return [item for page in self._pending_pages(inst_id) for item in page]
+        except Exception as e:
+            self.logger.error("[%s] pending orders error!: %s", inst_id, e)
+            return None
+
+    def _to_status(self, item: dict) -> OrderStatus:
+        return OrderStatus(order_id=item["ordId"],
+                           client_id=self._recover_client_id(item["clOrdId"]),
+                           side=item["side"],
+                           price=item["px"],
+                           state=self._norm_state(item),
+                           origQty=item["sz"])
+
+    def iter_open_orders(self, symbol: str):
+        """ open orders of symbol as each page of orders-pending arrives, all pages;
+        raises RuntimeError when a page fails
+        """
+        if self.mock:
+            yield from super().iter_open_orders(symbol)   # mock for test
+            return
+        for page in self._pending_pages(self._norm_symbol(symbol)):
+            yield from (self._to_status(item) for item in page)
+
+    def _closed_since(self, inst_id: str, oldest: str, ts: int) -> list[dict]:
+        """ orders of inst_id closed (uTime) since ts, from orders-history newest ordId first; stops at
+        the first order older than oldest, the oldest order which may still be open.
+        None when that takes more than SYNC_HISTORY_PAGES pages
+        """
+        closed, after = [], ''
+        for _ in range(SYNC_HISTORY_PAGES):
+            okx_res = self.trade_api.get_orders_history(instType=self.inst_type, instId=inst_id, after=after)
+            if okx_res.get("code") != '0':
+                raise RuntimeError(f"orders history error: {okx_res}")
+            page = okx_res.get("data") or []
+            for item in page:
+                if int(item["ordId"]) < int(oldest):
+                    return closed
+                # begin / end of orders-history filter on cTime, a resting order closes long after it
+                if int(item.get("uTime") or 0) >= ts:
+                    closed.append(item)
+            if len(page) < OPEN_ORDERS_PAGE_SIZE:
+                return closed
+            after = page[-1]["ordId"]
+        return None
+
+    def open_orders_since(self, symbol: str, cursor=None) -> OrderChanges:
+        """ orders of symbol changed since cursor {"ord_id": newest known ordId, "oldest": oldest ordId
+        which may be open, "ts": ms}: new pending orders (orders-pending before ord_id) and orders closed
+        since ts (orders-history back to oldest); all pending orders when cursor is None or the history
+        is too long; None on error
+        """
+        if self.mock:
+            return super().open_orders_since(symbol, cursor)   # mock for test
+        inst_id = self._norm_symbol(symbol)
+        now_ms = int(time.time() * 1000)
+        try:
+            if cursor is None:
+                orders = [item for page in self._pending_pages(inst_id) for item in page]
+                ord_ids = [item["ordId"] for item in orders]
+                return OrderChanges(orders=[self._to_status(item) for item in orders],
+                                    cursor={"ord_id": max(ord_ids, key=int, default=''),
+                                            "oldest": min(ord_ids, key=int, default=''),
+                                            "ts": now_ms - SYNC_OVERLAP_MS}, full=True)
+            changed, ord_id = [], cursor["ord_id"]
+            while True:
+                okx_res = self.trade_api.get_order_list(instType=self.inst_type, instId=inst_id, before=ord_id)
+                if okx_res.get("code") != '0':
+                    raise RuntimeError(f"pending orders error: {okx_res}")
+                page = okx_res.get("data") or []
+                changed.extend(page)
+                if page:
+                    ord_id = max((item["ordId"] for item in page), key=int)
+                if len(page) < OPEN_ORDERS_PAGE_SIZE or not ord_id:
+                    break
+            oldest = cursor["oldest"]
+            if oldest:
+                closed = self._closed_since(inst_id, oldest, cursor["ts"])
+                if closed is None:
+                    return self.open_orders_since(symbol)
+                changed.extend(closed)
+            else:
+                # nothing was open before this call, nothing can have closed
+                oldest = min((item["ordId"] for item in changed), key=int, default='')
+        except Exception as e:
+            self.logger.error("[%s] open orders since %s error!: %s", symbol, cursor, e)
+            return None
+        return OrderChanges(orders=[self._to_status(item) for item in changed],
+                            cursor={"ord_id": ord_id, "oldest": oldest, "ts": now_ms - SYNC_OVERLAP_MS},
+                            full=False)
+
+    def open_orders_many(self, symbols: list[str] = None) -> dict:
+        """ open orders of many symbols (all of self.inst_type when None), symbol -> list[OrderStatus],
+        None on error ({} means there are none)
+        one orders-pending query without instId, all pages, partitioned locally
+        """
+        if self.mock:
+            return super().open_orders_many(symbols)   # mock for test
+        pending = self._pending_orders()
+        if pending is None:
+            return None
+        return partition_orders(((item["instId"], self._to_status(item)) for item in pending),
+                                symbols, self._norm_symbol)
+
+    def cancel_all(self, symbol: str = None) -> bool:
+        """ cancel all pending orders of symbol (of all symbols of self.inst_type when None)
+        OKX mass-cancel is only for options: the pending orders are cancelled by cancel-batch-orders,
+        BATCH_CANCEL_SIZE orders per request and the requests are sent concurrently
+        """
+        if self.mock:
+            return super().cancel_all(symbol)   # mock for test
+        pending = self._pending_orders(self._norm_symbol(symbol) if symbol else '')
+        if pending is None:
+            return False
+        okx_list = [{"instId": item["instId"], "ordId": item["ordId"]} for item in pending]
+        chunks = [okx_list[i: i+BATCH_CANCEL_SIZE] for i in range(0, len(okx_list), BATCH_CANCEL_SIZE)]
+        if not chunks:
+            return True
+
+        def cancel(chunk):
+            try:
+                return self.trade_api.cancel_multiple_orders(chunk)
+            except Exception as e:
+                self.logger.error("[%s] cancel_all of %s orders fail: %s", symbol, len(chunk), e)
+                return {}
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), CANCEL_ALL_WORKERS)) as pool:
+            results = list(pool.map(cancel, chunks))
+        cancelled = sum(1 for okx_res in results for item in okx_res.get("data") or [] if item.get("sCode") == '0')
+        if cancelled < len(okx_list):
+            self.logger.error("[%s] cancel_all: %s / %s orders canceled", symbol, cancelled, len(okx_list))
+            return False
+        return True
+
     def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
         """ get order status
         Okx response: same as open_orders
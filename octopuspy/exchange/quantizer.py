@@ -0,0 +1,162 @@
+""" exact tick/lot quantization of order prices and quantities
+    Prices are integer ticks and quantities integer lots, built from instrument metadata;
+    wire strings are formatted from the integers, so no float noise reaches the exchange.
+    Rounding is passive: BUY prices round down, SELL prices round up, quantities round down.
+    Orders outside the size limits of the instrument are never resized: wire_orders drops them
+    and logs each one, so the caller sees that they were not sent.
+
+    Usage:
+        quantizer = quantizer_for(client.instruments.get("BTC-USDT-SWAP"))
+        for order, price, quantity in quantizer.wire_orders(orders):
+            ...
+"""
+import functools
+from logging import Logger
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_EVEN
+
+from .base_restapi import NewOrder
+from .instrument import InstrumentInfo
+
+def _decimal(value) -> Decimal:
+    """ exact Decimal of a str / int / float (shortest repr of the float)
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        # float() first: numpy 2 repr of np.float64 (a float subclass) is 'np.float64(0.1)'
+        return Decimal(repr(float(value)))
+    return Decimal(str(value))
+
+def _places(step: Decimal) -> int:
+    """ decimal places of a tick or lot size, 0.010 -> 2
+    """
+    return max(0, -step.normalize().as_tuple().exponent)
+
+
+class Quantizer:
+    """ price ticks and quantity lots of one instrument
+    """
+    def __init__(self, tick_size: str, step_size: str, ct_val: str = "1",
+                 min_size: str = "", max_size: str = ""):
+        """ step_size, min_size and max_size are in exchange units (contracts when ct_val != 1),
+            quantities given to qty_lots / qty are in base asset units
+        """
+        self.tick = _decimal(tick_size or "1")
+        self.step = _decimal(step_size or "1")
+        self.ct_val = _decimal(ct_val or "1")
+        self.price_places = _places(self.tick)
+        self.qty_places = _places(self.step)
+        # tick and lot as integers at the wire scale, strings are built from integers only
+        self._tick_units = int(self.tick.scaleb(self.price_places))
+        self._step_units = int(self.step.scaleb(self.qty_places))
+        self.min_lots = int((_decimal(min_size) / self.step).to_integral_value(ROUND_CEILING)) if min_size else 1
+        self.max_lots = int((_decimal(max_size) / self.step).to_integral_value(ROUND_FLOOR)) if max_size else 0
+
+    @classmethod
+    def from_instrument(cls, info: InstrumentInfo):
+        return cls(info.tick_size, info.step_size, info.ct_val, info.min_size, info.max_size)
+
+    def price_ticks(self, price, side: str = "") -> int:
+        """ price as integer ticks, BUY rounds down, SELL rounds up, no side rounds to nearest
+        """
+        side = side.upper()
+        rounding = ROUND_FLOOR if side == "BUY" else ROUND_CEILING if side == "SELL" else ROUND_HALF_EVEN
+        return int((_decimal(price) / self.tick).to_integral_value(rounding))
+
+    def qty_lots(self, quantity) -> int:
+        """ base asset quantity as integer lots of contracts, rounded down (not checked against
+            the size limits, see fits)
+        """
+        return int((_decimal(quantity) / self.ct_val / self.step).to_integral_value(ROUND_FLOOR))
+
+    def fits(self, lots: int) -> bool:
+        """ lots within the minimum and maximum size of the instrument
+        """
+        return lots >= self.min_lots and not (self.max_lots and lots > self.max_lots)
+
+    @staticmethod
+    def _format(units: int, places: int) -> str:
+        if not places:
+            return str(units)
+        sign = "-" if units < 0 else ""
+        digits = str(abs(units)).rjust(places + 1, "0")
+        return f"{sign}{digits[:-places]}.{digits[-places:]}"
+
+    def price_str(self, ticks: int) -> str:
+        return self._format(ticks * self._tick_units, self.price_places)
+
+    def qty_str(self, lots: int) -> str:
+        return self._format(lots * self._step_units, self.qty_places)
+
+    def price(self, price, side: str = "") -> str:
+        """ wire string of a price, '' for market orders without price
+        """
+        if price in (None, "", 0, "0"):
+            return ""
+        return self.price_str(self.price_ticks(price, side))
+
+    def qty(self, quantity) -> str:
+        return self.qty_str(self.qty_lots(quantity))
+
+    def wire_orders(self, orders: list[NewOrder], dropped: list = None) -> list[tuple]:
+        """ (order, price, quantity) wire strings of a whole ladder in one call,
+            orders below the minimum or above the maximum size are dropped (and appended to dropped)
+        """
+        tick, divisor = self.tick, self.ct_val * self.step
+        tick_units, step_units = self._tick_units, self._step_units
+        price_places, qty_places = self.price_places, self.qty_places
+        min_lots, max_lots = self.min_lots, self.max_lots
+        res = []
+        for order in orders:
+            lots = int((_decimal(order.quantity) / divisor).to_integral_value(ROUND_FLOOR))
+            if lots < min_lots or (max_lots and lots > max_lots):
+                if dropped is not None:
+                    dropped.append(order)
+                continue
+            if order.price in (None, "", 0, "0"):
+                price = ""
+            else:
+                side = order.side.upper()
+                rounding = ROUND_FLOOR if side == "BUY" else ROUND_CEILING if side == "SELL" else ROUND_HALF_EVEN
+                ticks = int((_decimal(order.price) / tick).to_integral_value(rounding))
+                price = self._format(ticks * tick_units, price_places)
+            res.append((order, price, self._format(lots * step_units, qty_places)))
+        return res
+
+    def quantize_orders(self, orders: list[NewOrder]) -> list[NewOrder]:
+        """ orders with price and quantity replaced by their wire strings
+        """
+        return [order._replace(price=price, quantity=quantity)
+                for order, price, quantity in self.wire_orders(orders)]
+
+
+@functools.lru_cache(maxsize=4096)
+def quantizer_for(info: InstrumentInfo) -> Quantizer:
+    """ cached quantizer of an instrument, rebuilt when its metadata changes
+    """
+    return Quantizer.from_instrument(info)
+
+def wire_price_qty(info: InstrumentInfo, side: str, price, quantity) -> tuple:
+    """ (price, quantity) of one order, as wire_orders
+    """
+    if info is None:
+        return float(price), float(quantity)
+    quantizer = quantizer_for(info)
+    return quantizer.price(price, side), quantizer.qty(quantity)
+
+def wire_orders(info: InstrumentInfo, orders: list[NewOrder], logger: Logger = None) -> list[tuple]:
+    """ quantized (order, price, quantity) when the instrument is known,
+        float price and quantity as before when it is not (metadata not loaded);
+        the orders dropped by the size limits are logged on logger
+    """
+    if info is None:
+        return [(order, float(order.price), float(order.quantity)) for order in orders]
+    quantizer = quantizer_for(info)
+    dropped = []
+    res = quantizer.wire_orders(orders, dropped)
+    if dropped and logger is not None:
+        for order in dropped:
+            logger.error("[%s] order %s %s dropped: quantity %s outside the size limits (%s-%s lots of %s)",
+                         info.symbol, order.client_id, order.side, order.quantity, quantizer.min_lots,
+                         quantizer.max_lots or "-", quantizer.step * quantizer.ct_val)
+    return res
@@ -0,0 +1,54 @@
+""" registry of exchange clients by name
+    Client modules are imported on first use, so a process only pays for the
+    exchange SDKs it trades on.
+
+    Usage:
+        client = create_client("bifu_spot", ClientParams(base_url, api_key, secret, passphrase), logger)
+"""
+import logging
+import importlib
+from logging import Logger
+
+from .base_restapi import BaseClient, ClientParams
+
+# name -> (module, class name)
+CLIENTS = {
+    "okx_spot": ("octopuspy.exchange.okx.spot_restapi", "OkxSpotClient"),
+    "okx_future": ("octopuspy.exchange.okx.future_restapi", "OkxFutureClient"),
+    "binance_spot": ("octopuspy.exchange.binance.spot_restapi", "BnSpotClient"),
+    "binance_future": ("octopuspy.exchange.binance.future_restapi", "BnFutureClient"),
+    "binance_umfuture": ("octopuspy.exchange.binance.umfuture_restapi", "BnUMFutureClient"),
+    "bifu_spot": ("octopuspy.exchange.bifu.spot_restapi", "BifuSpotClient"),
+    "bifu_future": ("octopuspy.exchange.bifu.future_restapi", "BifuFutureClient"),
+    "dolphin_spot": ("octopuspy.exchange.dolphin.spot_restapi", "DolphinClient"),
+    "dolphin_future": ("octopuspy.exchange.dolphin.future_restapi", "DolphinFutureClient"),
+}
+
+def register_client(name: str, module: str, class_name: str):
+    """ add or replace a client, e.g. an extension outside octopuspy
+    """
+    CLIENTS[name] = (module, class_name)
+
+def client_names() -> list:
+    return sorted(CLIENTS)
+
+def load_client_class(name: str) -> type:
+    """ import the module of a registered client and return its class
+    """
+    if name not in CLIENTS:
+        raise ValueError(f"unknown client: {name}, expected one of {client_names()}")
+    module, class_name = CLIENTS[name]
+    return getattr(importlib.import_module(module), class_name)
+
+def create_client(name: str, params: ClientParams,
+                  logger: Logger = logging.getLogger(__file__), **kwargs) -> BaseClient:
+    """ create a client by registered name, kwargs are passed to the client constructor
+    """
+    return load_client_class(name)(params, logger, **kwargs)
+
+def create_clients(name: str, params_list: list,
+                   logger: Logger = logging.getLogger(__file__), **kwargs) -> list:
+    """ one client per account, all clients of a host share its connection pool (conn_pool)
+    """
+    cls = load_client_class(name)
+    return [cls(params, logger, **kwargs) for params in params_list]
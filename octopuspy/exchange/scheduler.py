@@ -0,0 +1,182 @@
+""" priority scheduling of outbound requests under a rate limit
+    A token bucket per exchange account (or host) shared by all clients using it. Requests wait
+    by priority class: cancels / kill first, then amends, new orders, private reads and public
+    reads last. Reads cannot spend the reserved tokens and are shed (not sent, RequestShed is
+    raised) when they would wait longer than their max wait, so cancels never queue behind
+    market data polling.
+    Requests made inside a scheduled call (e.g. open_orders of cancel_all) keep its priority.
+
+    Usage:
+        scheduler = get_scheduler(("binance", api_key), rate=20, burst=40, reserve=5)
+        client = schedule_client(BnSpotClient(params), scheduler)
+"""
+import time
+import heapq
+import itertools
+import threading
+from functools import wraps
+
+# priority classes, lower is more urgent
+KILL = 0
+AMEND = 1
+PLACE = 2
+PRIVATE_READ = 3
+PUBLIC_READ = 4
+PRIORITY_NAMES = ('kill', 'amend', 'place', 'private_read', 'public_read')
+
+METHOD_PRIORITY = {
+    'cancel_all': KILL, 'batch_cancel': KILL, 'cancel_order': KILL,
+    'amend_orders': AMEND,
+    'batch_make_orders': PLACE, 'self_trade': PLACE,
+    'open_orders': PRIVATE_READ, 'open_orders_many': PRIVATE_READ, 'open_orders_since': PRIVATE_READ,
+    'order_status': PRIVATE_READ, 'orders_status': PRIVATE_READ,
+    'balance': PRIVATE_READ,
+    'ticker': PUBLIC_READ, 'top_askbid': PUBLIC_READ, 'order_book': PUBLIC_READ,
+}
+
+# seconds a request may wait for a token before it is shed, None: never shed
+DEFAULT_MAX_WAIT = (None, None, 5.0, 1.0, 0.2)
+
+_local = threading.local()
+
+
+class RequestShed(Exception):
+    """ the request was not sent: it would have waited for a token longer than its max wait
+        Raised instead of an empty result, which callers would take for "no orders".
+    """
+
+
+class RequestScheduler:
+    """ token bucket with strict priority between the waiting requests
+    """
+    def __init__(self, rate: float, burst: float = None, reserve: float = 0.0,
+                 max_wait: tuple = DEFAULT_MAX_WAIT):
+        """ rate: tokens (requests) per second, burst: bucket size (default rate)
+            reserve: tokens reads cannot use, kept for cancels, amends and new orders
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self.reserve = float(reserve)
+        self.max_wait = tuple(max_wait)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []      # heap of (priority, seq, weight)
+        self._seq = itertools.count()
+        self.granted = [0] * len(PRIORITY_NAMES)
+        self.shed = [0] * len(PRIORITY_NAMES)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _floor(self, priority: int) -> float:
+        return self.reserve if priority >= PRIVATE_READ else 0.0
+
+    def _shed(self, entry: tuple) -> bool:
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self.shed[entry[0]] += 1
+        self._cond.notify_all()
+        return False
+
+    def acquire(self, priority: int, weight: float = 1.0) -> bool:
+        """ wait for weight tokens, False when the request is shed
+        """
+        max_wait = self.max_wait[priority]
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            entry = (priority, next(self._seq), weight)
+            heapq.heappush(self._waiters, entry)
+            if max_wait is not None:
+                # shed at once when the requests before it already need longer than max_wait
+                ahead = sum(item[2] for item in self._waiters if item < entry)
+                needed = ahead + weight + self._floor(priority) - self._tokens
+                if needed / self.rate > max_wait or weight + self._floor(priority) > self.burst:
+                    return self._shed(entry)
+            deadline = None if max_wait is None else now + max_wait
+            while True:
+                needed = weight + self._floor(priority) - self._tokens
+                if self._waiters[0] is entry and needed <= 0:
+                    heapq.heappop(self._waiters)
+                    self._tokens -= weight
+                    self.granted[priority] += 1
+                    self._cond.notify_all()
+                    return True
+                timeout = max(needed, 0.0) / self.rate if self._waiters[0] is entry else None
+                if deadline is not None:
+                    left = deadline - now
+                    if left <= 0:
+                        return self._shed(entry)
+                    timeout = left if timeout is None else min(timeout, left)
+                self._cond.wait(timeout)
+                now = time.monotonic()
+                self._refill(now)
+
+    def available(self, priority: int) -> float:
+        """ tokens a request of priority could take now without waiting
+        """
+        with self._cond:
+            self._refill(time.monotonic())
+            if any(item[0] <= priority for item in self._waiters):
+                return 0.0
+            return max(0.0, self._tokens - self._floor(priority))
+
+    def charge(self, weight: float):
+        """ take weight tokens without waiting, for requests known only after they were sent;
+            the bucket may go below zero, the next requests wait for it
+        """
+        with self._cond:
+            self._refill(time.monotonic())
+            self._tokens -= weight
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {'tokens': self._tokens, 'waiting': len(self._waiters),
+                    'granted': dict(zip(PRIORITY_NAMES, self.granted)),
+                    'shed': dict(zip(PRIORITY_NAMES, self.shed))}
+
+
+def schedule_client(client, scheduler: RequestScheduler, priorities: dict = METHOD_PRIORITY, weights: dict = None):
+    """ wrap the methods of a BaseClient instance, each call takes a token of scheduler first.
+        weights: method -> tokens per call (default 1), e.g. for exchanges weighting batch requests
+    """
+    weights = weights or {}
+    for method, priority in priorities.items():
+        func = getattr(client, method, None)
+        if func is None or getattr(func, "__scheduled__", False):
+            continue
+
+        def _wrap(func, method, priority):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                outer = getattr(_local, "priority", None)
+                effective = priority if outer is None else min(priority, outer)
+                if not scheduler.acquire(effective, weights.get(method, 1.0)):
+                    client.logger.warning("%s shed by the request scheduler", method)
+                    raise RequestShed(f"{method} shed by the request scheduler")
+                _local.priority = effective
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _local.priority = outer
+            wrapper.__scheduled__ = True
+            return wrapper
+        setattr(client, method, _wrap(func, method, priority))
+    return client
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(key: tuple, rate: float, burst: float = None, reserve: float = 0.0,
+                  max_wait: tuple = DEFAULT_MAX_WAIT) -> RequestScheduler:
+    """ shared scheduler of key, e.g. ("binance", api_key); the limits are used when it is created
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = RequestScheduler(rate, burst, reserve, max_wait)
+        return scheduler
@@ -0,0 +1,409 @@
+""" market data bus on redis, one ingest process serves many strategy processes
+    MarketDataPublisher normalizes AskBid / Ticker / depth updates of a WS or REST feed
+    and publishes them by redis pub/sub or Streams; the latest value of every
+    (kind, symbol) is also kept under md:last:{kind}:{symbol} for late joiners.
+    MarketDataSubscriber yields them as MarketData, by generator or async iterator.
+
+    Usage:
+        # ingest process
+        publisher = MarketDataPublisher(mode=STREAM)
+        publisher.run_rest(client, ["BTCUSDT", "ETHUSDT"], interval=0.5)
+        # strategy process
+        for md in MarketDataSubscriber(["BTCUSDT"], mode=STREAM).listen():
+            if md.kind == ASKBID: ...
+"""
+import time
+import logging
+from logging import Logger
+from collections import namedtuple
+
+from ..exchange.base_restapi import AskBid, BaseClient, Ticker
+from ..utils import codec_util, db_util, async_db_util
+
+ASKBID = "askbid"
+TICKER = "ticker"
+DEPTH = "depth"
+KINDS = (ASKBID, TICKER, DEPTH)
+
+PUBSUB = "pubsub"
+STREAM = "stream"
+
+# kind: ASKBID/TICKER/DEPTH, ts: publish time in ms,
+# data: AskBid, Ticker or {'asks': [(price, size)], 'bids': [(price, size)]}
+MarketData = namedtuple('MarketData', ['kind', 'symbol', 'ts', 'data'])
+codec_util.register(6, MarketData)
+
+def channel_name(kind: str, symbol: str) -> str:
+    return f"md:{kind}:{symbol}"
+
+def stream_name(kind: str, symbol: str) -> str:
+    return f"md:stream:{kind}:{symbol}"
+
+def last_name(kind: str, symbol: str) -> str:
+    return f"md:last:{kind}:{symbol}"
+
+def _levels(levels: list) -> list:
+    """ normalize [{'price': p, 'size': s}] or [[p, s, ...]] to [(p, s)]
+    """
+    return [(item['price'], item['size']) if isinstance(item, dict) else (item[0], item[1])
+            for item in levels]
+
+
+class LocalBook:
+    """ order book of one symbol kept from a snapshot and the diffs after it
+        (Binance style depthUpdate: U / u first and last update id, a / b changed levels, size 0 removes)
+    """
+    def __init__(self):
+        self.asks = {}          # price -> size, as received
+        self.bids = {}
+        self.update_id = None   # last applied update id, None when unknown
+        self.ready = False
+
+    def reset(self, asks: list, bids: list, update_id=None):
+        self.asks = {price: size for price, size in _levels(asks) if float(size) > 0}
+        self.bids = {price: size for price, size in _levels(bids) if float(size) > 0}
+        self.update_id = int(update_id) if update_id is not None else None
+        self.ready = True
+
+    def apply(self, data: dict) -> bool:
+        """ apply one diff, False when the book needs a new snapshot (none yet, or a gap in the ids)
+        """
+        if not self.ready:
+            return False
+        first, last = data.get('U'), data.get('u')
+        if self.update_id is not None and last is not None:
+            if int(last) <= self.update_id:
+                return True     # already in the snapshot
+            if first is not None and int(first) > self.update_id + 1:
+                self.ready = False
+                return False
+        for side, levels in ((self.asks, data.get('a', [])), (self.bids, data.get('b', []))):
+            for price, size in _levels(levels):
+                if float(size) > 0:
+                    side[price] = size
+                else:
+                    side.pop(price, None)
+        if last is not None:
+            self.update_id = int(last)
+        return True
+
+    def levels(self, depth: int = 0) -> tuple:
+        """ (asks, bids) best first, depth: number of levels per side, 0 for all
+        """
+        asks = sorted(self.asks.items(), key=lambda item: float(item[0]))
+        bids = sorted(self.bids.items(), key=lambda item: -float(item[0]))
+        if depth:
+            asks, bids = asks[:depth], bids[:depth]
+        return asks, bids
+
+
+class MarketDataPublisher:
+    """ publish normalized market data through db_util
+    """
+    def __init__(self, mode: str = PUBSUB, maxlen: int = 1000, conn=None,
+                 logger: Logger = logging.getLogger(__file__)):
+        """ maxlen: approximate length cap of each stream (STREAM mode)
+            conn: redis client returning bytes, db_util.BDB() by default
+        """
+        if mode not in (PUBSUB, STREAM):
+            raise ValueError(f"unknown mode: {mode}")
+        self.mode = mode
+        self.maxlen = maxlen
+        self.conn = conn
+        self.logger = logger
+
+    def publish(self, kind: str, symbol: str, data):
+        """ publish one update and keep it as the latest value, in one round trip
+        """
+        payload = codec_util.pack(MarketData(kind, symbol, int(1000 * time.time()), data))
+        pipe = (self.conn or db_util.BDB()).pipeline(transaction=False)
+        if self.mode == STREAM:
+            pipe.xadd(stream_name(kind, symbol), {"d": payload}, maxlen=self.maxlen, approximate=True)
+        else:
+            pipe.publish(channel_name(kind, symbol), payload)
+        pipe.set(last_name(kind, symbol), payload)
+        pipe.execute()
+
+    def publish_askbid(self, symbol: str, askbid: AskBid):
+        self.publish(ASKBID, symbol, askbid)
+
+    def publish_ticker(self, symbol: str, ticker: Ticker):
+        self.publish(TICKER, symbol, ticker)
+
+    def publish_depth(self, symbol: str, asks: list, bids: list):
+        self.publish(DEPTH, symbol, {'asks': _levels(asks), 'bids': _levels(bids)})
+
+    def ws_depth_callback(self, symbol: str, snapshot=None, depth: int = 50):
+        """ async callback for the public WS clients, e.g.
+            await ws.subscribe_orderbook(symbol, publisher.ws_depth_callback(symbol))
+            await ws.subscribe_depth(symbol, publisher.ws_depth_callback(symbol, lambda: client.order_book(symbol)))
+            publishes the full depth (best depth levels per side) and the top of book derived from it.
+            Messages with asks / bids are full snapshots; diff messages (a / b) are applied to a local
+            book seeded by snapshot(), which returns {'asks', 'bids'[, 'lastUpdateId']}. Without snapshot
+            diffs are dropped, they are never published as a full book.
+        """
+        book = LocalBook()
+
+        async def callback(message: dict):
+            data = message.get('data', message)
+            if isinstance(data, list):
+                data = data[0] if data else {}
+            if 'asks' in data or 'bids' in data:
+                book.reset(data.get('asks', []), data.get('bids', []))
+            elif not book.apply(data):
+                if snapshot is None:
+                    self.logger.error("[%s] depth diff without a snapshot dropped", symbol)
+                    return
+                try:
+                    res = snapshot()
+                except Exception as e:
+                    self.logger.error("[%s] depth snapshot error: %s", symbol, e)
+                    return
+                if not res or not (res.get('asks') or res.get('bids')):
+                    self.logger.error("[%s] depth snapshot empty", symbol)
+                    return
+                book.reset(res.get('asks', []), res.get('bids', []), res.get('lastUpdateId'))
+                if not book.apply(data):
+                    # the diff is newer than the snapshot plus one: wait for the next one
+                    self.logger.error("[%s] depth diff ahead of the snapshot", symbol)
+                    return
+            asks, bids = book.levels(depth)
+            self.publish_depth(symbol, asks, bids)
+            if asks and bids:
+                self.publish_askbid(symbol, AskBid(ap=asks[0][0], aq=asks[0][1],
+                                                   bp=bids[0][0], bq=bids[0][1]))
+        return callback
+
+    def run_rest(self, client: BaseClient, symbols: list, interval: float = 1.0,
+                 tickers: bool = True, rounds: int = 0):
+        """ poll top_askbid (and ticker) of symbols by one client and publish them
+            rounds: stop after n rounds, 0 runs forever
+        """
+        done = 0
+        while not rounds or done < rounds:
+            start = time.monotonic()
+            for symbol in symbols:
+                try:
+                    res = client.top_askbid(symbol)
+                    if res:
+                        self.publish_askbid(symbol, res[0])
+                    if tickers:
+                        res = client.ticker(symbol)
+                        if res:
+                            self.publish_ticker(symbol, res[0])
+                except Exception as e:
+                    self.logger.error("[%s] market data publish error: %s", symbol, e)
+            done += 1
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+
+class _Confirmations:
+    """ subscribe confirmations awaited by MarketDataSubscriber, with the updates received meanwhile
+    """
+    def __init__(self, pending: int, timeout: float):
+        self.pending = pending
+        self.buffered = []
+        self.deadline = time.monotonic() + timeout
+
+    def waiting(self) -> bool:
+        return self.pending > 0 and time.monotonic() < self.deadline
+
+    def left(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def add(self, message: dict):
+        if message is None:
+            return
+        if message['type'] == 'subscribe':
+            self.pending -= 1
+        elif message['type'] == 'message':
+            self.buffered.append(message)
+
+
+class MarketDataSubscriber:
+    """ consume the updates of MarketDataPublisher
+    """
+    def __init__(self, symbols: list, kinds: tuple = (ASKBID, TICKER), mode: str = PUBSUB,
+                 from_latest: bool = True, conn=None, aconn=None):
+        """ from_latest: first yield the kept latest value of every (kind, symbol)
+            conn / aconn: redis clients returning bytes, db_util.BDB() / async_db_util.BDB() by default
+        """
+        if mode not in (PUBSUB, STREAM):
+            raise ValueError(f"unknown mode: {mode}")
+        self.symbols = list(symbols)
+        self.kinds = tuple(kinds)
+        self.mode = mode
+        self.from_latest = from_latest
+        self.conn = conn
+        self.aconn = aconn
+        # stream key -> last delivered id, '$' until the first read resolves it (_stream_start)
+        self._stream_ids = {stream_name(kind, symbol): '$' for kind in self.kinds for symbol in self.symbols}
+
+    def _conn(self):
+        return self.conn or db_util.BDB()
+
+    def _channels(self) -> list:
+        return [channel_name(kind, symbol) for kind in self.kinds for symbol in self.symbols]
+
+    def _last_keys(self) -> list:
+        return [last_name(kind, symbol) for kind in self.kinds for symbol in self.symbols]
+
+    def latest(self, kind: str, symbol: str) -> MarketData:
+        """ latest published value, None if nothing was published
+        """
+        return codec_util.unpack(self._conn().get(last_name(kind, symbol)))
+
+    def _latest_all(self) -> list:
+        return [codec_util.unpack(item) for item in self._conn().mget(self._last_keys()) if item is not None]
+
+    def _stream_snapshot(self) -> list:
+        """ streams whose newest entry is read before the first XREAD: all of them with from_latest,
+            else those still at '$'
+        """
+        return [stream for stream, last in self._stream_ids.items() if self.from_latest or last == '$']
+
+    def _stream_start(self, streams: list, newest: list) -> list:
+        """ continue the reads of streams right after their newest entry (XREVRANGE count=1 results),
+            '0-0' for an empty stream, so nothing published before the first XREAD is lost:
+            '$' would skip every entry added between two XREAD calls. Returns the newest values
+        """
+        res = []
+        for stream, entries in zip(streams, newest):
+            if entries:
+                entry_id, fields = entries[0]
+                self._stream_ids[stream] = entry_id
+                res.append(codec_util.unpack(fields[b'd']))
+            else:
+                self._stream_ids[stream] = '0-0'
+        return res
+
+    def _stream_latest(self) -> list:
+        """ newest entry of the streams of _stream_snapshot in one pipeline, see _stream_start
+        """
+        streams = self._stream_snapshot()
+        if not streams:
+            return []
+        pipe = self._conn().pipeline(transaction=False)
+        for stream in streams:
+            pipe.xrevrange(stream, count=1)
+        return self._stream_start(streams, pipe.execute())
+
+    def _stream_entries(self, res) -> list:
+        """ values of an XREAD result, advancing the last delivered ids
+        """
+        values = []
+        for stream, entries in res or []:
+            stream = stream.decode('utf-8') if isinstance(stream, bytes) else stream
+            for entry_id, fields in entries:
+                self._stream_ids[stream] = entry_id
+                values.append(codec_util.unpack(fields[b'd']))
+        return values
+
+    @staticmethod
+    def _fresh(md: MarketData, latest: dict) -> bool:
+        """ False for an update already yielded from the latest values (or older than it);
+            the pub/sub messages received while the latest values were read come before them
+        """
+        seen = latest.get((md.kind, md.symbol))
+        if seen is None:
+            return True
+        if md.ts < seen.ts or md == seen:
+            return False
+        del latest[(md.kind, md.symbol)]
+        return True
+
+    def _subscribe(self, pubsub, timeout: float = 5.0) -> list:
+        """ subscribe and wait until the server confirmed every channel, returns the updates
+            received meanwhile; a latest value read after this misses no update
+        """
+        channels = self._channels()
+        pubsub.subscribe(*channels)
+        confirm = _Confirmations(len(channels), timeout)
+        while confirm.waiting():
+            confirm.add(pubsub.get_message(timeout=confirm.left()))
+        return confirm.buffered
+
+    async def _asubscribe(self, pubsub, timeout: float = 5.0) -> list:
+        """ _subscribe of an asyncio pubsub
+        """
+        channels = self._channels()
+        await pubsub.subscribe(*channels)
+        confirm = _Confirmations(len(channels), timeout)
+        while confirm.waiting():
+            confirm.add(await pubsub.get_message(timeout=confirm.left()))
+        return confirm.buffered
+
+    def _replay(self, latest_values: list, buffered: list) -> tuple:
+        """ updates yielded before the live messages: the latest values (from_latest), then the
+            messages received while subscribing which are newer; returns (updates, latest)
+        """
+        latest = {(md.kind, md.symbol): md for md in latest_values}
+        updates = list(latest_values)
+        for message in buffered:
+            md = codec_util.unpack(message['data'])
+            if self._fresh(md, latest):
+                updates.append(md)
+        return updates, latest
+
+    def listen(self, block_ms: int = 1000):
+        """ generator of MarketData, blocks until updates arrive
+        """
+        if self.mode == STREAM:
+            latest = self._stream_latest()
+            if self.from_latest:
+                yield from latest
+            conn = self._conn()
+            while True:
+                yield from self._stream_entries(conn.xread(self._stream_ids, block=block_ms))
+        else:
+            pubsub = self._conn().pubsub()
+            try:
+                # subscribed before the latest values are read: an update published in between is
+                # either in the latest values or received on the channel
+                buffered = self._subscribe(pubsub)
+                updates, latest = self._replay(self._latest_all() if self.from_latest else [], buffered)
+                yield from updates
+                for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        md = codec_util.unpack(message['data'])
+                        if not latest or self._fresh(md, latest):
+                            yield md
+            finally:
+                pubsub.close()
+
+    async def alisten(self, block_ms: int = 1000):
+        """ async iterator of MarketData: async for md in subscriber.alisten()
+        """
+        conn = self.aconn or async_db_util.BDB()
+        if self.mode == STREAM:
+            streams = self._stream_snapshot()
+            latest = []
+            if streams:
+                async with conn.pipeline(transaction=False) as pipe:
+                    for stream in streams:
+                        pipe.xrevrange(stream, count=1)
+                    latest = self._stream_start(streams, await pipe.execute())
+            if self.from_latest:
+                for md in latest:
+                    yield md
+            while True:
+                for md in self._stream_entries(await conn.xread(self._stream_ids, block=block_ms)):
+                    yield md
+        else:
+            pubsub = conn.pubsub()
+            try:
+                buffered = await self._asubscribe(pubsub)
+                latest_values = []
+                if self.from_latest:
+                    latest_values = [codec_util.unpack(item) for item in await conn.mget(self._last_keys())
+                                     if item is not None]
+                updates, latest = self._replay(latest_values, buffered)
+                for md in updates:
+                    yield md
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        md = codec_util.unpack(message['data'])
+                        if not latest or self._fresh(md, latest):
+                            yield md
+            finally:
+                await pubsub.aclose()
@@ -0,0 +1,211 @@
+""" shared memory market data for co-located processes
+    SharedTopOfBook: fixed-width AskBid slots indexed by symbol, one writer (the WS ingest
+    process) and any number of lock-free readers, each slot protected by a seqlock.
+    TickRing: ring buffer of trades, readers follow it with their own cursor.
+
+    Prices and sizes are stored as float64, so AskBid read from here carries floats.
+    Seqlock ordering relies on stores becoming visible in program order (x86 TSO),
+    there is a single writer per segment.
+
+    Usage:
+        # ingest process
+        book = SharedTopOfBook("octo_tob", ["BTCUSDT", "ETHUSDT"], create=True)
+        book.update_askbid("BTCUSDT", askbid)
+        # any local process
+        book = SharedTopOfBook("octo_tob")
+        book.get("BTCUSDT")
+"""
+import time
+import struct
+from collections import namedtuple
+from multiprocessing import shared_memory, resource_tracker
+
+from ..exchange.base_restapi import AskBid
+
+# side: 'B' buy (taker buy), 'S' sell, ts in ms
+Tick = namedtuple('Tick', ['symbol', 'side', 'price', 'qty', 'ts'])
+
+CACHE_LINE = 64
+SYMBOL_WIDTH = 32
+READ_TIMEOUT = 1.0      # seconds a reader retries a slot left odd: an update takes microseconds, more only
+                        # when the writer is descheduled, a writer dead during an update never ends it
+
+TOB_MAGIC = b'OCTOTOB1'
+TOB_HEADER = struct.Struct('<8sI')          # magic, number of slots
+TOB_SEQ = struct.Struct('<Q')
+TOB_DATA = struct.Struct('<ddddq')          # ap, aq, bp, bq, ts; follows the seq in a slot
+
+RING_MAGIC = b'OCTORNG1'
+RING_HEADER = struct.Struct('<8sQ')         # magic, capacity
+RING_COUNT_OFFSET = 16                      # uint64 number of ticks ever written
+RING_ENTRY = struct.Struct('<Qqdd16sc7x')   # seq, ts, price, qty, symbol, side
+RING_SYMBOL_WIDTH = 16
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """ attach without tracking, readers must not unlink the segment when they exit
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+def _unlink(shm: shared_memory.SharedMemory):
+    """ a reader sharing the creator's resource tracker (forked child) may have unregistered
+        the segment, register it again so the tracker sees exactly one unregister
+    """
+    resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+
+
+class SharedTopOfBook:
+    """ symbol indexed table of top of book slots in shared memory
+    """
+    def __init__(self, name: str, symbols: list = None, create: bool = False):
+        """ create=True (writer) builds the table for symbols, otherwise attach to an existing one
+        """
+        self.create = create
+        if create:
+            symbols = list(symbols or [])
+            for symbol in symbols:
+                if len(symbol.encode('utf-8')) > SYMBOL_WIDTH:
+                    raise ValueError(f"symbol too long: {symbol}")
+            size = self._slots_offset(len(symbols)) + len(symbols) * CACHE_LINE
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.buf = self.shm.buf
+            TOB_HEADER.pack_into(self.buf, 0, TOB_MAGIC, len(symbols))
+            for idx, symbol in enumerate(symbols):
+                raw = symbol.encode('utf-8')
+                self.buf[CACHE_LINE + idx * SYMBOL_WIDTH: CACHE_LINE + idx * SYMBOL_WIDTH + len(raw)] = raw
+        else:
+            self.shm = _attach(name)
+            self.buf = self.shm.buf
+            magic, count = TOB_HEADER.unpack_from(self.buf, 0)
+            if magic != TOB_MAGIC:
+                raise ValueError(f"{name} is not a top of book segment")
+            symbols = [bytes(self.buf[CACHE_LINE + idx * SYMBOL_WIDTH: CACHE_LINE + (idx + 1) * SYMBOL_WIDTH])
+                       .rstrip(b'\0').decode('utf-8') for idx in range(count)]
+        base = self._slots_offset(len(symbols))
+        self.symbols = symbols
+        # symbol -> offset of its slot
+        self.offsets = {symbol: base + idx * CACHE_LINE for idx, symbol in enumerate(symbols)}
+
+    @staticmethod
+    def _slots_offset(count: int) -> int:
+        table_end = CACHE_LINE + count * SYMBOL_WIDTH
+        return (table_end + CACHE_LINE - 1) // CACHE_LINE * CACHE_LINE
+
+    def update(self, symbol: str, ap: float, aq: float, bp: float, bq: float, ts: int = 0):
+        """ writer side: odd sequence while the slot is being written
+        """
+        offset = self.offsets[symbol]
+        buf = self.buf
+        seq = TOB_SEQ.unpack_from(buf, offset)[0]
+        TOB_SEQ.pack_into(buf, offset, seq + 1)
+        TOB_DATA.pack_into(buf, offset + 8, ap, aq, bp, bq, ts or int(1000 * time.time()))
+        TOB_SEQ.pack_into(buf, offset, seq + 2)
+
+    def update_askbid(self, symbol: str, askbid: AskBid, ts: int = 0):
+        self.update(symbol, float(askbid.ap), float(askbid.aq), float(askbid.bp), float(askbid.bq), ts)
+
+    def read(self, symbol: str, timeout: float = READ_TIMEOUT) -> tuple:
+        """ reader side: (ap, aq, bp, bq, ts), None if never written; retries while the writer is busy,
+            TimeoutError when the slot stays busy for timeout seconds (writer died during an update)
+        """
+        offset = self.offsets[symbol]
+        buf = self.buf
+        deadline = None
+        while True:
+            seq = TOB_SEQ.unpack_from(buf, offset)[0]
+            if not seq & 1:
+                data = TOB_DATA.unpack_from(buf, offset + 8)
+                if TOB_SEQ.unpack_from(buf, offset)[0] == seq:
+                    return data if seq else None
+            # clock only read once the first attempt failed
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                raise TimeoutError(f"{symbol} slot busy for {timeout}s, writer stopped during an update")
+
+    def get(self, symbol: str) -> AskBid:
+        data = self.read(symbol)
+        if data is None:
+            return None
+        return AskBid(ap=data[0], aq=data[1], bp=data[2], bq=data[3])
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        """ writer side: remove the segment
+        """
+        _unlink(self.shm)
+
+
+class TickRing:
+    """ single writer ring buffer of trades in shared memory
+    """
+    def __init__(self, name: str, capacity: int = 65536, create: bool = False):
+        self.create = create
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=CACHE_LINE + capacity * RING_ENTRY.size)
+            RING_HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, capacity)
+            struct.pack_into('<Q', self.shm.buf, RING_COUNT_OFFSET, 0)
+        else:
+            self.shm = _attach(name)
+            magic, capacity = RING_HEADER.unpack_from(self.shm.buf, 0)
+            if magic != RING_MAGIC:
+                raise ValueError(f"{name} is not a tick ring segment")
+        self.buf = self.shm.buf
+        self.capacity = capacity
+
+    @property
+    def count(self) -> int:
+        """ number of ticks ever written, a reader cursor starts here to get only new ticks
+        """
+        return struct.unpack_from('<Q', self.buf, RING_COUNT_OFFSET)[0]
+
+    def append(self, symbol: str, side: str, price: float, qty: float, ts: int = 0):
+        """ writer side: the entry is invalid (seq 0) while being written
+        """
+        raw = symbol.encode('utf-8')
+        if len(raw) > RING_SYMBOL_WIDTH:
+            raise ValueError(f"symbol too long: {symbol}")
+        buf = self.buf
+        count = struct.unpack_from('<Q', buf, RING_COUNT_OFFSET)[0]
+        offset = CACHE_LINE + (count % self.capacity) * RING_ENTRY.size
+        struct.pack_into('<Q', buf, offset, 0)
+        RING_ENTRY.pack_into(buf, offset, 0, ts or int(1000 * time.time()), price, qty,
+                             raw, side.encode('utf-8')[:1])
+        struct.pack_into('<Q', buf, offset, count + 1)
+        struct.pack_into('<Q', buf, RING_COUNT_OFFSET, count + 1)
+
+    def read_from(self, cursor: int, limit: int = 0) -> tuple:
+        """ reader side: ticks written since cursor, returns (ticks, next_cursor).
+            A reader lapped by the writer skips to the oldest tick still in the ring.
+        """
+        count = self.count
+        cursor = max(cursor, count - self.capacity)
+        if limit:
+            count = min(count, cursor + limit)
+        ticks = []
+        buf = self.buf
+        for idx in range(cursor, count):
+            offset = CACHE_LINE + (idx % self.capacity) * RING_ENTRY.size
+            seq, ts, price, qty, symbol, side = RING_ENTRY.unpack_from(buf, offset)
+            if seq != idx + 1 or struct.unpack_from('<Q', buf, offset)[0] != seq:
+                continue    # overwritten while reading
+            ticks.append(Tick(symbol.rstrip(b'\0').decode('utf-8'), side.decode('utf-8'), price, qty, ts))
+        return ticks, count
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        _unlink(self.shm)
@@ -0,0 +1,136 @@
+""" micro-batching gateway in front of a BaseClient
+    Single places and cancels from different threads are buffered per symbol for a short window
+    (or until max_batch are waiting) and sent as one batch_make_orders / batch_cancel. Each caller
+    gets a Future resolved with its own OrderID, None when the exchange did not accept it.
+    Places are matched to the results by client_id, cancels by order_id.
+
+    Usage:
+        gateway = OrderGateway(client, window=0.002, max_batch=20)
+        future = gateway.place(order, "BTCUSDT")
+        gateway.cancel("12345", "BTCUSDT").result(timeout=1)
+        gateway.close()
+"""
+import time
+import logging
+import threading
+from logging import Logger
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ..exchange.base_restapi import BaseClient, NewOrder
+
+PLACE = "place"
+CANCEL = "cancel"
+
+
+class OrderGateway:
+    """ coalesces places and cancels of one client
+    """
+    def __init__(self, client: BaseClient, window: float = 0.002, max_batch: int = 20, workers: int = 4,
+                 logger: Logger = logging.getLogger(__file__)):
+        """ window: seconds the first request of a batch waits for others
+            max_batch: requests per batch call, a full batch is sent at once
+            workers: batch calls in flight at the same time
+        """
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self.logger = logger
+        self._cond = threading.Condition()
+        self._pending = {}      # (kind, symbol) -> [(payload, future)]
+        self._since = {}        # (kind, symbol) -> monotonic time of the oldest request
+        self._running = True
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="order_gateway")
+        self._thread = threading.Thread(target=self._run, name="order_gateway", daemon=True)
+        self._thread.start()
+
+    def _submit(self, kind: str, symbol: str, payload) -> Future:
+        future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("order gateway is closed")
+            key = (kind, symbol)
+            queue = self._pending.setdefault(key, [])
+            if not queue:
+                self._since[key] = time.monotonic()
+            queue.append((payload, future))
+            if len(queue) == 1 or len(queue) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def place(self, order: NewOrder, symbol: str = '') -> Future:
+        """ Future of the OrderID of order, order.client_id must be unique in the batch
+        """
+        return self._submit(PLACE, symbol or order.symbol, order)
+
+    def place_many(self, orders: list[NewOrder], symbol: str = '') -> list[Future]:
+        return [self.place(order, symbol) for order in orders]
+
+    def cancel(self, order_id: str, symbol: str) -> Future:
+        """ Future of the OrderID of the cancelled order
+        """
+        return self._submit(CANCEL, symbol, str(order_id))
+
+    def _take_due(self, flush_all: bool = False) -> tuple:
+        """ (batches to send, seconds until the next one is due), called with the lock held
+        """
+        now = time.monotonic()
+        due, wait = [], None
+        for key in list(self._pending):
+            queue = self._pending[key]
+            left = self.window - (now - self._since[key])
+            if flush_all or left <= 0 or len(queue) >= self.max_batch:
+                due.append((key, queue[:self.max_batch]))
+                del queue[:self.max_batch]
+                if not queue:
+                    del self._pending[key]
+                    del self._since[key]
+                    continue
+                left = self.window - (now - self._since[key])
+            wait = left if wait is None else min(wait, left)
+        return due, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due, wait = self._take_due(flush_all=not self._running)
+                if not due:
+                    if not self._running:
+                        return
+                    self._cond.wait(timeout=None if wait is None else max(wait, 0.0))
+                    continue
+            for (kind, symbol), batch in due:
+                self._pool.submit(self._flush, kind, symbol, batch)
+
+    def _flush(self, kind: str, symbol: str, batch: list):
+        payloads = [payload for payload, _ in batch]
+        try:
+            if kind == PLACE:
+                results = self.client.batch_make_orders(payloads, symbol) or []
+                by_key = {str(item.client_id): item for item in results}
+                keys = [str(order.client_id) for order in payloads]
+            else:
+                results = self.client.batch_cancel(payloads, symbol) or []
+                by_key = {str(item.order_id): item for item in results}
+                keys = payloads
+        except Exception as e:
+            self.logger.error("[%s] %s batch of %s failed: %s", symbol, kind, len(batch), e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for key, (_, future) in zip(keys, batch):
+            future.set_result(by_key.get(key))
+
+    def close(self, timeout: float = None):
+        """ send what is buffered, wait for the batch calls and stop
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,198 @@
+""" kill switch: every resting order on every venue cancelled within a deadline
+    All (venue, symbol) pairs are cancelled in parallel with cancel_all; a pair is retried until
+    open_orders confirms that nothing rests any more, or the deadline is over. fire() returns
+    at the deadline at the latest, with the outcome and timing of every venue.
+    Triggers: fire() from the code or an API handler, a signal (install_signal) or a redis key
+    (watch_redis, every watching switch fires once per new value of the key and acknowledges it,
+    so a value left in redis does not fire again after a restart).
+
+    Usage:
+        switch = KillSwitch({"okx": okx_client, "bn": bn_client}, symbols={"okx": ["BTC-USDT"]}, deadline=3.0)
+        switch.install_signal()
+        switch.watch_redis()        # kill_switch.trigger("reason") or redis-cli set octopuspy:kill_switch "reason"
+        report = switch.fire("manual")
+"""
+import time
+import signal
+import logging
+import threading
+from logging import Logger
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ..exchange.base_restapi import BaseClient
+
+KILL_KEY = "octopuspy:kill_switch"
+
+# open_orders: orders still resting after the last check, -1 when not verified
+VenueResult = namedtuple('VenueResult', ['venue', 'ok', 'attempts', 'open_orders', 'elapsed', 'error'])
+KillReport = namedtuple('KillReport', ['reason', 'ok', 'elapsed', 'venues'])   # venues: venue -> VenueResult
+
+
+class KillSwitch:
+    """ mass cancel of a set of clients
+    """
+    def __init__(self, clients: dict, symbols: dict = None, deadline: float = 5.0,
+                 retry_interval: float = 0.2, logger: Logger = logging.getLogger(__file__)):
+        """ clients: venue -> BaseClient
+            symbols: venue -> symbols to cancel and verify; venues without symbols use cancel_all(None),
+                     which cannot be verified by open_orders
+            deadline: seconds until fire() returns, whatever the venues answer
+        """
+        self.clients = dict(clients)
+        self.symbols = dict(symbols or {})
+        self.deadline = deadline
+        self.retry_interval = retry_interval
+        self.logger = logger
+        self.last_report = None
+        self._lock = threading.Lock()
+        self._firing = None     # Event of the running fire(), set when it is done
+        self._watching = threading.Event()
+
+    def _targets(self) -> list:
+        return [(venue, symbol) for venue in self.clients for symbol in (self.symbols.get(venue) or [None])]
+
+    def _flatten(self, client: BaseClient, symbol: str, stop_at: float) -> tuple:
+        """ (ok, attempts, open orders, error) of one symbol, retried until verified or stop_at
+        """
+        attempts, left, error = 0, -1, ''
+        while True:
+            attempts += 1
+            try:
+                ok = client.cancel_all(symbol)
+                if symbol is not None:
+                    orders = client.open_orders(symbol)
+                    # None: the open orders are unknown, flat is not verified
+                    left = -1 if orders is None else len(orders)
+                    ok = left == 0
+                error = ('' if ok else 'open orders left' if left > 0 else
+                         'open orders unknown' if symbol is not None and left < 0 else 'cancel failed')
+            except Exception as e:
+                ok, error = False, str(e)
+            if ok:
+                return True, attempts, left, ''
+            if time.monotonic() + self.retry_interval >= stop_at:
+                return False, attempts, left, error
+            time.sleep(self.retry_interval)
+
+    def fire(self, reason: str = '') -> KillReport:
+        """ cancel everything now, returns within the deadline;
+            while a fire() is running, another call waits for it and returns its report,
+            or a failed report (error 'still firing') if it is not done within the deadline
+        """
+        with self._lock:
+            running = self._firing
+            if running is None:
+                self._firing = done = threading.Event()
+        if running is not None:
+            self.logger.error("kill switch already firing, joined by: %s", reason)
+            start = time.monotonic()
+            if not running.wait(self.deadline):
+                return self._still_firing(reason, time.monotonic() - start)
+            return self.last_report
+        try:
+            return self._fire(reason)
+        finally:
+            with self._lock:
+                self._firing = None
+            done.set()
+
+    def _fire(self, reason: str) -> KillReport:
+        start = time.monotonic()
+        stop_at = start + self.deadline
+        self.logger.error("kill switch fired: %s", reason)
+        targets = self._targets()
+        pool = ThreadPoolExecutor(max_workers=max(1, len(targets)), thread_name_prefix="kill_switch")
+        futures = {pool.submit(self._flatten, self.clients[venue], symbol, stop_at): (venue, symbol)
+                   for venue, symbol in targets}
+        wait(futures, timeout=max(0.0, stop_at - time.monotonic()))
+        # threads still waiting for an exchange are left behind, fire() does not wait for them
+        pool.shutdown(wait=False, cancel_futures=True)
+        elapsed = time.monotonic() - start
+
+        outcomes = {}
+        for future, (venue, symbol) in futures.items():
+            if future.done() and not future.cancelled():
+                outcome = future.result()
+            else:
+                outcome = (False, 0, -1, 'deadline')
+            outcomes.setdefault(venue, []).append((symbol, outcome))
+        venues = {}
+        for venue, items in outcomes.items():
+            errors = [f"{symbol or '*'}: {outcome[3]}" for symbol, outcome in items if not outcome[0]]
+            lefts = [outcome[2] for _, outcome in items]
+            venues[venue] = VenueResult(venue=venue, ok=not errors,
+                                        attempts=max(outcome[1] for _, outcome in items),
+                                        open_orders=-1 if -1 in lefts else sum(lefts),
+                                        elapsed=elapsed, error="; ".join(errors))
+            if errors:
+                self.logger.error("kill switch [%s] failed: %s", venue, venues[venue].error)
+        report = KillReport(reason=reason, ok=all(item.ok for item in venues.values()),
+                            elapsed=elapsed, venues=venues)
+        self.logger.error("kill switch done in %.3fs, ok: %s", elapsed, report.ok)
+        self.last_report = report
+        return report
+
+    def _still_firing(self, reason: str, elapsed: float) -> KillReport:
+        """ report of a joined fire() whose running call did not finish in time, outcome unknown
+        """
+        self.logger.error("kill switch still firing after %.3fs, joined by: %s", elapsed, reason)
+        venues = {venue: VenueResult(venue=venue, ok=False, attempts=0, open_orders=-1,
+                                     elapsed=elapsed, error='still firing')
+                  for venue in self.clients}
+        return KillReport(reason=reason, ok=False, elapsed=elapsed, venues=venues)
+
+    def fire_async(self, reason: str = '') -> threading.Thread:
+        """ fire() in a new thread, e.g. from a signal handler
+        """
+        thread = threading.Thread(target=self.fire, args=(reason,), name="kill_switch", daemon=True)
+        thread.start()
+        return thread
+
+    def install_signal(self, signum: int = signal.SIGUSR1):
+        """ fire on signum (kill -USR1 <pid>), only from the main thread
+        """
+        signal.signal(signum, lambda sig, frame: self.fire_async(f"signal {sig}"))
+
+    def watch_redis(self, key: str = KILL_KEY, interval: float = 0.5, name: str = None) -> threading.Thread:
+        """ fire when key is set to a new non empty value (the value is the reason).
+            Every fired value is acknowledged under {key}:ack:{name} (name: the venues by default),
+            a value this switch already fired for, e.g. before a restart, does not fire again;
+            trigger() makes every value unique, so the same reason can be sent twice.
+        """
+        from ..utils import db_util
+        ack_key = f"{key}:ack:{name or ','.join(sorted(self.clients))}"
+
+        def watch():
+            last = None
+            while self._watching.is_set():
+                try:
+                    value, acked = db_util.RDB().mget([key, ack_key])
+                except Exception as e:
+                    self.logger.error("kill switch watch %s error: %s", key, e)
+                    value = acked = last
+                if value and value != last and value != acked:
+                    self.fire(f"redis {key}: {value}")
+                    try:
+                        db_util.RDB().set(ack_key, value)
+                    except Exception as e:
+                        self.logger.error("kill switch ack %s error: %s", ack_key, e)
+                last = value
+                time.sleep(interval)
+
+        self._watching.set()
+        thread = threading.Thread(target=watch, name="kill_switch_watch", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """ stop watch_redis
+        """
+        self._watching.clear()
+
+
+def trigger(reason: str, key: str = KILL_KEY):
+    """ fire every switch watching key, the value is made unique by the time
+    """
+    from ..utils import db_util
+    db_util.RDB().set(key, f"{int(1000 * time.time())} {reason}")
@@ -0,0 +1,126 @@
+""" quote ladders computed with numpy for many symbols at once
+    Prices are mid * (1 +/- (spread / 2 + level * step)) shifted by the inventory skew,
+    sizes follow a size curve scaled by the skew; everything is snapped to integer ticks
+    and lots in one pass (bids down, asks up, sizes down). compute() is the hot path
+    (100 levels x 50 symbols well under 1 ms); orders() turns the result of one symbol into
+    NewOrder for batch_make_orders, in python at about 4 us per order, which that figure excludes.
+
+    Usage:
+        builder = LadderBuilder.from_instruments(infos, levels=100, spread=0.001, step=0.0002,
+                                                 sizes=size_curve(100, 0.01, 1.05))
+        ladder = builder.compute(mids, skews)
+        client.batch_make_orders(builder.orders(ladder, "BTC-USDT"), "BTC-USDT")
+"""
+import os
+import time
+import itertools
+from decimal import Decimal, ROUND_CEILING
+from collections import namedtuple
+
+import numpy as np
+
+from ..exchange.base_restapi import NewOrder
+from ..exchange.quantizer import Quantizer
+
+# integer ticks and lots, shape (symbols, levels); level 0 is the best quote
+Ladder = namedtuple('Ladder', ['bid_ticks', 'bid_lots', 'ask_ticks', 'ask_lots'])
+
+EPS = 1e-9     # float tolerance before floor/ceil, 0.3 / 0.1 is 2.9999999999999996
+
+# default client ids, shared by all builders of the process: one counter from the start time
+# in us, prefixed with the pid so that processes started in the same millisecond differ
+_client_ids = itertools.count(int(1000 * time.time()) * 1000)
+
+def next_client_id() -> str:
+    return f"{os.getpid() % 100000:05d}{next(_client_ids)}"
+
+def size_curve(levels: int, base: float, growth: float = 1.0) -> np.ndarray:
+    """ base * growth ** level, e.g. growth > 1 puts more size on the outer levels
+    """
+    return base * np.power(growth, np.arange(levels, dtype=np.float64))
+
+
+class LadderBuilder:
+    """ ladders of a fixed symbol set, the per symbol tick and lot sizes are kept as arrays
+    """
+    def __init__(self, symbols: list, tick_sizes: list, lot_sizes: list, levels: int,
+                 spread: float, step: float, sizes, min_lots: list = None,
+                 biz_type: str = 'SPOT', tif: str = 'GTX', client_id=None):
+        """ lot_sizes: lot in base asset units (exchange step size * contract value)
+            spread: full spread as fraction of mid, step: distance between levels as fraction of mid
+            sizes: size per level in base asset units, array of length levels
+            client_id: callable returning a new client id, default next_client_id (numeric, unique
+                       across the builders and processes of a host)
+        """
+        self.symbols = list(symbols)
+        self.index = {symbol: idx for idx, symbol in enumerate(self.symbols)}
+        self.levels = levels
+        self.spread = spread
+        self.step = step
+        self.biz_type = biz_type
+        self.tif = tif
+        self.quantizers = [Quantizer(tick, lot) for tick, lot in zip(tick_sizes, lot_sizes)]
+        self.ticks = np.array([float(tick) for tick in tick_sizes], dtype=np.float64)[:, None]
+        self.lots = np.array([float(lot) for lot in lot_sizes], dtype=np.float64)[:, None]
+        self.min_lots = np.array(min_lots or [1] * len(self.symbols), dtype=np.int64)[:, None]
+        self.sizes = np.asarray(sizes, dtype=np.float64)[None, :]
+        if self.sizes.shape[1] != levels:
+            raise ValueError(f"sizes has {self.sizes.shape[1]} levels, expected {levels}")
+        # distance of every level from mid, shared by all symbols
+        self.offsets = (spread / 2 + step * np.arange(levels, dtype=np.float64))[None, :]
+        self.client_id = client_id or next_client_id
+
+    @classmethod
+    def from_instruments(cls, instruments: list, levels: int, spread: float, step: float, sizes, **kwargs):
+        """ builder of InstrumentInfo (instrument registry), ladder symbols are the exchange symbols
+        """
+        lot_sizes = [str(Decimal(info.step_size or "1") * Decimal(info.ct_val or "1")) for info in instruments]
+        # a minimum size between two lots needs the next whole lot, as in Quantizer
+        min_lots = [int((Decimal(info.min_size) / Decimal(info.step_size)).to_integral_value(ROUND_CEILING))
+                    if info.min_size and info.step_size else 1 for info in instruments]
+        return cls([info.symbol for info in instruments], [info.tick_size for info in instruments],
+                   lot_sizes, levels, spread, step, sizes, min_lots=min_lots, **kwargs)
+
+    def compute(self, mids, skews=None) -> Ladder:
+        """ mids: mid price per symbol, skews: inventory skew per symbol in [-1, 1],
+            positive when long: quotes move down, bid sizes shrink and ask sizes grow
+        """
+        mids = np.asarray(mids, dtype=np.float64)[:, None]
+        if skews is None:
+            shift = 0.0
+            bid_sizes = ask_sizes = self.sizes
+        else:
+            skews = np.clip(np.asarray(skews, dtype=np.float64), -1.0, 1.0)[:, None]
+            shift = skews * (self.spread / 2)
+            bid_sizes = self.sizes * (1.0 - skews)
+            ask_sizes = self.sizes * (1.0 + skews)
+        bid_ticks = np.floor(mids * (1.0 - self.offsets - shift) / self.ticks + EPS).astype(np.int64)
+        ask_ticks = np.ceil(mids * (1.0 + self.offsets - shift) / self.ticks - EPS).astype(np.int64)
+        bid_lots = np.floor(bid_sizes / self.lots + EPS).astype(np.int64)
+        ask_lots = np.floor(ask_sizes / self.lots + EPS).astype(np.int64)
+        # below the minimum size the level is not quoted
+        bid_lots[bid_lots < self.min_lots] = 0
+        ask_lots[ask_lots < self.min_lots] = 0
+        return Ladder(bid_ticks, bid_lots, ask_ticks, ask_lots)
+
+    def orders(self, ladder: Ladder, symbol: str, order_type: str = 'LIMIT') -> list[NewOrder]:
+        """ NewOrder of both sides of one symbol, levels without size are skipped
+        """
+        idx = self.index[symbol]
+        quantizer = self.quantizers[idx]
+        res = []
+        for side, ticks, lots in (('BUY', ladder.bid_ticks[idx], ladder.bid_lots[idx]),
+                                  ('SELL', ladder.ask_ticks[idx], ladder.ask_lots[idx])):
+            for tick, lot in zip(ticks.tolist(), lots.tolist()):
+                if lot <= 0 or tick <= 0:
+                    continue
+                res.append(NewOrder(symbol=symbol, client_id=self.client_id(), side=side, type=order_type,
+                                    quantity=quantizer.qty_str(lot), price=quantizer.price_str(tick),
+                                    biz_type=self.biz_type, tif=self.tif, position_side=''))
+        return res
+
+    def build(self, mids, skews=None) -> dict:
+        """ symbol -> list[NewOrder] of all symbols
+        """
+        ladder = self.compute(mids, skews)
+        return {symbol: self.orders(ladder, symbol) for symbol in self.symbols}
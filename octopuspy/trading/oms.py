@@ -0,0 +1,245 @@
+""" in-memory order management
+    Every order is tracked from submission (NewOrder) through ack, partial fills and final state,
+    indexed by client_id, order_id and by symbol / side / price for the live ones, so questions
+    like "my live bids at 99.9" are answered without a request to the exchange.
+    Updates come from REST responses (place / cancel / apply_status) and from private streams
+    (update), are applied incrementally and never move an order backwards.
+
+    Usage:
+        oms = OrderManager()
+        oms.place(client, orders, "BTCUSDT")
+        oms.at_price("BTCUSDT", "BUY", "99.9")
+        oms.update(order_id="123", state=ORDER_STATE_CONSTANTS.PARTIALLY_FILLED, filled="0.5")
+"""
+import time
+import threading
+
+from ..exchange.base_restapi import BaseClient, NewOrder, OrderID, OrderStatus, ORDER_STATE_CONSTANTS
+from .reconciler import FINAL_STATES
+
+PENDING = -2    # submitted, not acknowledged by the exchange yet
+CLOSED = -3     # not open on the exchange any more, how it ended is unknown (e.g. missing from a snapshot)
+_CLOSED_STATES = FINAL_STATES + (CLOSED,)
+
+# progress of the states, an update to a lower rank is ignored (late or reordered message)
+_RANK = {PENDING: 0, ORDER_STATE_CONSTANTS.UNKNOWN: 0, ORDER_STATE_CONSTANTS.NEW: 1,
+         ORDER_STATE_CONSTANTS.PARTIALLY_FILLED: 2}
+
+
+class ManagedOrder:
+    """ one order, updated in place by the OrderManager
+    """
+    __slots__ = ('symbol', 'client_id', 'order_id', 'side', 'type', 'price', 'quantity', 'filled',
+                 'state', 'created', 'updated')
+
+    def __init__(self, order: NewOrder, symbol: str):
+        self.symbol = symbol
+        self.client_id = str(order.client_id)
+        self.order_id = ''
+        self.side = order.side.upper()
+        self.type = order.type
+        self.price = float(order.price or 0)
+        self.quantity = float(order.quantity)
+        self.filled = 0.0
+        self.state = PENDING
+        self.created = self.updated = time.time()
+
+    @property
+    def live(self) -> bool:
+        return self.state not in _CLOSED_STATES
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.quantity - self.filled)
+
+    def __repr__(self):
+        return (f"ManagedOrder({self.symbol} {self.side} {self.quantity}@{self.price} client_id={self.client_id} "
+                f"order_id={self.order_id} state={self.state} filled={self.filled})")
+
+
+class OrderManager:
+    """ orders of all symbols, thread safe
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_client = {}    # client_id -> ManagedOrder
+        self._by_id = {}        # order_id -> ManagedOrder
+        self._book = {}         # (symbol, side) -> price -> {client_id: ManagedOrder}, live orders only
+
+    # index
+    def _book_add(self, order: ManagedOrder):
+        levels = self._book.setdefault((order.symbol, order.side), {})
+        levels.setdefault(order.price, {})[order.client_id] = order
+
+    def _book_remove(self, order: ManagedOrder):
+        levels = self._book.get((order.symbol, order.side))
+        if not levels:
+            return
+        level = levels.get(order.price)
+        if level is not None:
+            level.pop(order.client_id, None)
+            if not level:
+                del levels[order.price]
+
+    # submission and REST responses
+    def submit(self, orders: list[NewOrder], symbol: str = '') -> list[ManagedOrder]:
+        """ track new orders before they are sent, symbol defaults to the symbol of each order
+        """
+        res = []
+        with self._lock:
+            for order in orders:
+                managed = ManagedOrder(order, symbol or order.symbol)
+                previous = self._by_client.get(managed.client_id)
+                if previous is not None and previous.live:
+                    self._book_remove(previous)
+                self._by_client[managed.client_id] = managed
+                self._book_add(managed)
+                res.append(managed)
+        return res
+
+    def on_placed(self, results: list[OrderID], submitted: list[ManagedOrder] = None):
+        """ ack of batch_make_orders; submitted orders without result are rejected
+        """
+        with self._lock:
+            acked = set()
+            for item in results or []:
+                order = self._by_client.get(str(item.client_id))
+                if order is None:
+                    continue
+                acked.add(order.client_id)
+                self._set_order_id(order, item.order_id)
+                self._set_state(order, ORDER_STATE_CONSTANTS.NEW)
+            for order in submitted or []:
+                if order.client_id not in acked and order.state == PENDING:
+                    self._set_state(order, ORDER_STATE_CONSTANTS.REJECTED)
+
+    def on_cancelled(self, results: list[OrderID]):
+        """ result of batch_cancel / cancel_order
+        """
+        with self._lock:
+            for item in results or []:
+                order = self._by_id.get(str(item.order_id))
+                if order is not None:
+                    self._set_state(order, ORDER_STATE_CONSTANTS.CANCELED)
+
+    def place(self, client: BaseClient, orders: list[NewOrder], symbol: str) -> list[OrderID]:
+        """ submit, batch_make_orders and ack in one call
+        """
+        submitted = self.submit(orders, symbol)
+        results = client.batch_make_orders(orders, symbol) or []
+        self.on_placed(results, submitted)
+        return results
+
+    def cancel(self, client: BaseClient, order_ids: list[str], symbol: str) -> list[OrderID]:
+        results = client.batch_cancel(order_ids, symbol) or []
+        self.on_cancelled(results)
+        return results
+
+    def apply_status(self, statuses: list[OrderStatus], symbol: str = '', ct_val: float = 1.0):
+        """ open_orders / order_status results, orders not placed by this OMS are tracked as well;
+            state CLOSED ends an order whose final state is unknown
+            ct_val: base units of one unit of origQty (contract value on OKX SWAP, see
+            QuoteReconciler.ct_val), the OMS keeps the base quantities the orders were submitted with
+        """
+        for status in statuses or []:
+            quantity = float(status.origQty) * ct_val if status.origQty not in (None, '') else None
+            self.update(order_id=status.order_id, client_id=status.client_id, state=status.state,
+                        symbol=symbol, side=status.side, price=status.price, quantity=quantity)
+
+    # incremental update, e.g. from a private stream
+    def update(self, order_id: str = '', client_id: str = '', state: int = None, filled=None,
+               symbol: str = '', side: str = '', price=None, quantity=None) -> ManagedOrder:
+        """ apply what is known of one order, returns it (None when it is unknown and cannot be created)
+            filled is the cumulative filled quantity
+        """
+        order_id, client_id = str(order_id or ''), str(client_id or '')
+        with self._lock:
+            order = self._by_id.get(order_id) if order_id else None
+            if order is None and client_id:
+                order = self._by_client.get(client_id)
+            if order is None:
+                if not (symbol and side and price is not None and quantity is not None):
+                    return None
+                new_order = NewOrder(symbol=symbol, client_id=client_id or f"ext-{order_id}", side=side,
+                                     type='LIMIT', quantity=quantity, price=price, biz_type='', tif='',
+                                     position_side='')
+                order = self.submit([new_order], symbol)[0]
+            if order_id:
+                self._set_order_id(order, order_id)
+            if order.live:
+                if quantity is not None:
+                    order.quantity = float(quantity)
+                if price is not None and float(price) != order.price:
+                    # amended: move to its new level
+                    self._book_remove(order)
+                    order.price = float(price)
+                    self._book_add(order)
+            if filled is not None and float(filled) > order.filled:
+                order.filled = float(filled)
+                if state is None and order.live:
+                    state = (ORDER_STATE_CONSTANTS.FILLED if order.filled >= order.quantity
+                             else ORDER_STATE_CONSTANTS.PARTIALLY_FILLED)
+            if state is not None:
+                self._set_state(order, state)
+            order.updated = time.time()
+            return order
+
+    def _set_order_id(self, order: ManagedOrder, order_id):
+        order_id = str(order_id or '')
+        if order_id and order.order_id != order_id:
+            if order.order_id:
+                self._by_id.pop(order.order_id, None)
+            order.order_id = order_id
+            self._by_id[order_id] = order
+
+    def _set_state(self, order: ManagedOrder, state: int):
+        if state == order.state:
+            return
+        # a CLOSED order only learns how it ended
+        if not order.live and not (order.state == CLOSED and state in FINAL_STATES):
+            return
+        if state not in _CLOSED_STATES and _RANK.get(state, 0) < _RANK.get(order.state, 0):
+            return
+        order.state = state
+        order.updated = time.time()
+        if state in _CLOSED_STATES:
+            self._book_remove(order)
+
+    # queries, no exchange request
+    def get(self, client_id: str) -> ManagedOrder:
+        return self._by_client.get(str(client_id))
+
+    def by_order_id(self, order_id: str) -> ManagedOrder:
+        return self._by_id.get(str(order_id))
+
+    def at_price(self, symbol: str, side: str, price) -> list[ManagedOrder]:
+        """ live orders of symbol and side at price
+        """
+        with self._lock:
+            level = self._book.get((symbol, side.upper()), {}).get(float(price))
+            return list(level.values()) if level else []
+
+    def live_orders(self, symbol: str = None, side: str = None) -> list[ManagedOrder]:
+        with self._lock:
+            return [order for (book_symbol, book_side), levels in self._book.items()
+                    if (symbol is None or book_symbol == symbol) and (side is None or book_side == side.upper())
+                    for level in levels.values() for order in level.values()]
+
+    def prices(self, symbol: str, side: str) -> list[float]:
+        """ price levels with live orders, best first
+        """
+        with self._lock:
+            levels = list(self._book.get((symbol, side.upper()), {}))
+        return sorted(levels, reverse=side.upper() == 'BUY')
+
+    def purge(self, max_age: float = 3600.0) -> int:
+        """ forget the final orders not updated for max_age seconds, returns their number
+        """
+        deadline = time.time() - max_age
+        with self._lock:
+            stale = [order for order in self._by_client.values() if not order.live and order.updated < deadline]
+            for order in stale:
+                self._by_client.pop(order.client_id, None)
+                if order.order_id:
+                    self._by_id.pop(order.order_id, None)
+            return len(stale)
@@ -0,0 +1,119 @@
+""" incremental open-order sync of one symbol
+    A local set of the open orders is kept up to date with open_orders_since: clients with change
+    queries (OKX: new pending orders after the newest known ordId, orders closed since the last
+    sync) only fetch what changed, the others return full snapshots that are merged the same way.
+    Known orders missing from a full snapshot are looked up with orders_status to learn how they
+    ended, those it does not find are reported CLOSED. A full snapshot is taken every full_interval
+    seconds to correct any drift of the local set.
+
+    Usage:
+        sync = OpenOrderSync(client, "BTC-USDT", full_interval=60)
+        res = sync.sync()           # SyncResult(added, changed, removed, full)
+        oms.apply_status(res.added + res.changed + res.removed, "BTC-USDT",
+                         QuoteReconciler.ct_val(client, "BTC-USDT"))
+"""
+import time
+import logging
+import threading
+from logging import Logger
+from collections import namedtuple
+
+from ..exchange.base_restapi import BaseClient, OrderStatus
+from .reconciler import FINAL_STATES
+from .oms import CLOSED
+
+# removed: orders closed since the last sync, with their final state when the exchange reported it, CLOSED
+# (oms.CLOSED, ends the order in an OrderManager) otherwise
+SyncResult = namedtuple('SyncResult', ['added', 'changed', 'removed', 'full'])
+
+
+class OpenOrderSync:
+    """ open orders of one symbol of a client, thread safe
+    """
+    def __init__(self, client: BaseClient, symbol: str, full_interval: float = 60.0,
+                 logger: Logger = logging.getLogger(__file__)):
+        """ full_interval: seconds between two full snapshots, 0 for a full snapshot on every sync
+        """
+        self.client = client
+        self.symbol = symbol
+        self.full_interval = full_interval
+        self.logger = logger
+        self.orders = {}        # order_id -> OrderStatus
+        self.cursor = None
+        self.last_full = None   # monotonic time of the last full snapshot
+        self._lock = threading.Lock()
+
+    def sync(self, full: bool = False) -> SyncResult:
+        """ fetch the changes since the last sync and apply them, full forces a full snapshot;
+            on error nothing changes and the next sync retries from the same cursor
+        """
+        with self._lock:
+            now = time.monotonic()
+            full = (full or self.last_full is None or self.cursor is None
+                    or now - self.last_full >= self.full_interval)
+            changes = self.client.open_orders_since(self.symbol, None if full else self.cursor)
+            if changes is None:
+                self.logger.error("[%s] open orders sync failed", self.symbol)
+                return SyncResult(added=[], changed=[], removed=[], full=False)
+            if changes.full:
+                res = self._replace(changes.orders)
+                self.last_full = now
+            else:
+                res = self._merge(changes.orders)
+            self.cursor = changes.cursor
+            return res
+
+    def _replace(self, orders: list[OrderStatus]) -> SyncResult:
+        current = {str(item.order_id): item for item in orders if item.state not in FINAL_STATES}
+        added, changed = self._upsert(current.values())
+        missing = [order_id for order_id in self.orders if order_id not in current]
+        removed = []
+        for order_id, item in self._resolve(missing).items():
+            if item.state in FINAL_STATES or item.state == CLOSED:
+                removed.append(item)
+            else:
+                # still open, missed by the snapshot
+                current[order_id] = item
+        self.orders = current
+        return SyncResult(added=added, changed=changed, removed=removed, full=True)
+
+    def _resolve(self, order_ids: list[str]) -> dict:
+        """ order_id -> status of the known orders missing from a snapshot: how they ended when
+            orders_status tells it, CLOSED otherwise
+        """
+        if not order_ids:
+            return {}
+        try:
+            found = self.client.orders_status(order_ids, self.symbol) or {}
+        except Exception as e:
+            self.logger.error("[%s] status of the closed orders %s fail: %s", self.symbol, order_ids, e)
+            found = {}
+        return {order_id: found.get(order_id) or self.orders[order_id]._replace(state=CLOSED)
+                for order_id in order_ids}
+
+    def _merge(self, orders: list[OrderStatus]) -> SyncResult:
+        live, removed = [], []
+        for item in orders:
+            if item.state not in FINAL_STATES:
+                live.append(item)
+            elif self.orders.pop(str(item.order_id), None) is not None:
+                # orders opened and closed between two syncs were never known, nothing to report
+                removed.append(item)
+        added, changed = self._upsert(live)
+        for item in live:
+            self.orders[str(item.order_id)] = item
+        return SyncResult(added=added, changed=changed, removed=removed, full=False)
+
+    def _upsert(self, orders) -> tuple:
+        added, changed = [], []
+        for item in orders:
+            known = self.orders.get(str(item.order_id))
+            if known is None:
+                added.append(item)
+            elif known != item:
+                changed.append(item)
+        return added, changed
+
+    def open_orders(self) -> list[OrderStatus]:
+        with self._lock:
+            return list(self.orders.values())
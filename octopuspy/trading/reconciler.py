@@ -0,0 +1,118 @@
+""" reconcile a desired quote ladder with the open orders
+    Instead of cancelling everything and re-placing the ladder, open orders that are close
+    enough to a desired order (price within price_tol, size within size_tol) are kept and
+    keep their queue priority; only the rest is cancelled, placed or amended.
+    Desired quantities are in base units, open order sizes in exchange units (contracts on OKX
+    SWAP): they are compared in base units with the ct_val of the instrument.
+
+    Usage:
+        reconciler = QuoteReconciler(price_tol=0.1, size_tol=0.2)
+        plan = reconciler.sync(client, builder.orders(ladder, symbol), symbol)
+"""
+import logging
+from logging import Logger
+from collections import namedtuple
+
+from ..exchange.base_restapi import AmendOrder, BaseClient, NewOrder, OrderStatus, ORDER_STATE_CONSTANTS
+
+# cancels: list[OrderStatus], places: list[NewOrder], amends: list[(OrderStatus, NewOrder)],
+# keeps: list[OrderStatus]
+QuotePlan = namedtuple('QuotePlan', ['cancels', 'places', 'amends', 'keeps'])
+
+# open_orders may report unknown states, everything not final is treated as open
+FINAL_STATES = (ORDER_STATE_CONSTANTS.FILLED, ORDER_STATE_CONSTANTS.CANCELED,
+                ORDER_STATE_CONSTANTS.REJECTED, ORDER_STATE_CONSTANTS.EXPIRED)
+
+
+class QuoteReconciler:
+    """ minimal cancel/place/amend set between desired and open orders
+    """
+    def __init__(self, price_tol: float = 0.0, size_tol: float = 0.0, amend: bool = False,
+                 logger: Logger = logging.getLogger(__file__)):
+        """ price_tol: absolute price distance to keep an order (e.g. one tick)
+            size_tol: relative size difference to keep an order (0.1 = 10%)
+            amend: pair leftover cancels and places of a side into amends
+        """
+        self.price_tol = price_tol
+        self.size_tol = size_tol
+        self.amend = amend
+        self.logger = logger
+
+    def _close(self, order: OrderStatus, price: float, qty: float, ct_val: float = 1.0) -> bool:
+        if abs(float(order.price) - price) > self.price_tol + 1e-12:
+            return False
+        orig_qty = float(order.origQty) * ct_val
+        return abs(orig_qty - qty) <= self.size_tol * max(qty, orig_qty) + 1e-12
+
+    @staticmethod
+    def ct_val(client: BaseClient, symbol: str) -> float:
+        """ base units of one exchange unit of size of symbol, 1 when the instrument is unknown
+        """
+        registry = getattr(client, "instruments", None)
+        info = registry.get(symbol) if registry is not None else None
+        return float(info.ct_val or 1) if info is not None else 1.0
+
+    def diff(self, desired: list[NewOrder], current: list[OrderStatus], ct_val: float = 1.0) -> QuotePlan:
+        """ plan of the changes from current (open_orders) to desired
+            ct_val: base units of one unit of origQty (contract value on OKX SWAP)
+        """
+        cancels, places, amends, keeps = [], [], [], []
+        for side in ('BUY', 'SELL'):
+            wanted = [order for order in desired if order.side.upper() == side]
+            opened = [order for order in current
+                      if order.side.upper() == side and order.state not in FINAL_STATES]
+            # best quotes first, they matter most for queue priority
+            wanted.sort(key=lambda order: float(order.price), reverse=side == 'BUY')
+            unmatched = list(opened)
+            side_places = []
+            for order in wanted:
+                price, qty = float(order.price), float(order.quantity)
+                best, best_dist = None, None
+                for idx, item in enumerate(unmatched):
+                    if self._close(item, price, qty, ct_val):
+                        dist = abs(float(item.price) - price)
+                        if best is None or dist < best_dist:
+                            best, best_dist = idx, dist
+                if best is None:
+                    side_places.append(order)
+                else:
+                    keeps.append(unmatched.pop(best))
+            if self.amend:
+                pairs = min(len(unmatched), len(side_places))
+                amends.extend(zip(unmatched[:pairs], side_places[:pairs]))
+                unmatched, side_places = unmatched[pairs:], side_places[pairs:]
+            cancels.extend(unmatched)
+            places.extend(side_places)
+        return QuotePlan(cancels, places, amends, keeps)
+
+    def execute(self, client: BaseClient, plan: QuotePlan, symbol: str) -> QuotePlan:
+        """ cancel first (releases the frozen balance), then amend and place;
+            amends use the native amend of the client (cancel and place where there is none)
+        """
+        if plan.cancels:
+            res = client.batch_cancel([order.order_id for order in plan.cancels], symbol)
+            if len(res or []) < len(plan.cancels):
+                self.logger.error("[%s] %s/%s cancels succeeded", symbol, len(res or []), len(plan.cancels))
+        if plan.amends:
+            amends = [AmendOrder(order_id=order.order_id, client_id=new_order.client_id, side=new_order.side,
+                                 price=new_order.price, quantity=new_order.quantity, type=new_order.type,
+                                 tif=new_order.tif)
+                      for order, new_order in plan.amends]
+            res = client.amend_orders(amends, symbol)
+            if len(res or []) < len(amends):
+                self.logger.error("[%s] %s/%s amends succeeded", symbol, len(res or []), len(amends))
+        if plan.places:
+            res = client.batch_make_orders(plan.places, symbol)
+            if len(res or []) < len(plan.places):
+                self.logger.error("[%s] %s/%s orders placed", symbol, len(res or []), len(plan.places))
+        return plan
+
+    def sync(self, client: BaseClient, desired: list[NewOrder], symbol: str) -> QuotePlan:
+        """ open_orders, diff and execute in one call; nothing is done when open_orders fails,
+            the desired orders would be placed a second time
+        """
+        current = client.open_orders(symbol)
+        if current is None:
+            self.logger.error("[%s] open orders unknown, quotes not synced", symbol)
+            return QuotePlan([], [], [], [])
+        return self.execute(client, self.diff(desired, current, self.ct_val(client, symbol)), symbol)
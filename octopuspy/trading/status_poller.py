@@ -0,0 +1,223 @@
+""" adaptive order status polling
+    The live orders of an OrderManager are polled with orders_status at a rate of their own: orders
+    at the touch every min_interval, slower the further they rest from top_askbid, new orders faster
+    than old ones, and at once again after a fill (of the order or of the symbol). Requests are taken
+    from a RequestScheduler, which pollers of many symbols (and other users of the account) share as
+    the global budget. When the orders would need more than the budget, every interval is stretched
+    by the same factor and the most overdue orders are polled first. Results are applied to the
+    OrderManager, orders left out of a successful orders_status are ended there as CLOSED.
+
+    Usage:
+        scheduler = get_scheduler(("okx", api_key), rate=5, burst=10)
+        poller = StatusPoller(client, oms, "BTC-USDT", scheduler=scheduler, budget=2.0)
+        poller.start(tick=0.2)      # or poller.poll() from the strategy loop
+        poller.stop()
+"""
+import time
+import logging
+import threading
+from logging import Logger
+
+from ..exchange.base_restapi import BaseClient, AskBid, OrderStatus, ORDER_STATE_CONSTANTS
+from ..exchange.scheduler import RequestScheduler, PRIVATE_READ, PUBLIC_READ
+from .oms import OrderManager, ManagedOrder, CLOSED
+from .reconciler import FINAL_STATES, QuoteReconciler
+
+DEFAULT_BUDGET = 2.0
+
+
+class StatusPoller:
+    """ status polling of the live orders of one symbol
+    """
+    def __init__(self, client: BaseClient, oms: OrderManager, symbol: str, scheduler: RequestScheduler = None,
+                 budget: float = None, min_interval: float = 0.5, max_interval: float = 30.0,
+                 near_bps: float = 10.0, age_scale: float = 60.0, fill_window: float = 10.0,
+                 logger: Logger = logging.getLogger(__file__)):
+        """ client: not wrapped by schedule_client, the poller takes one token per request it sends
+            scheduler: request budget shared with other pollers, one of its own of budget requests
+                       per second when None
+            budget: requests per second this poller aims at, the scheduler rate by default
+            min_interval / max_interval: seconds between two polls of an order at / far from the touch
+            near_bps: the interval grows by min_interval for each near_bps between the order and the touch
+            age_scale: seconds until an order is polled at its normal rate, 2x slower after 1.5 * age_scale
+            fill_window: seconds after a fill during which the order is polled every min_interval
+                         and the other orders of the symbol twice as often
+        """
+        self.client = client
+        self.oms = oms
+        self.symbol = symbol
+        if scheduler is None:
+            budget = budget or DEFAULT_BUDGET
+            # room for the touch and one orders_status at any budget
+            scheduler = RequestScheduler(rate=budget, burst=max(4.0, 2 * budget))
+        self.scheduler = scheduler
+        self.budget = float(budget or scheduler.rate)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.near_bps = near_bps
+        self.age_scale = age_scale
+        self.fill_window = fill_window
+        self.logger = logger
+        self.stretch = 1.0          # factor applied to the intervals by the budget in the last poll
+        self.askbid = None          # last touch, used until the next top_askbid
+        self._polled = {}           # order_id -> monotonic time of the last poll
+        self._seen = {}             # order_id -> (state, filled) at the last poll
+        self._filled_at = {}        # order_id -> monotonic time of the last fill seen
+        self._symbol_filled_at = None
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+
+    @staticmethod
+    def distance_bps(order: ManagedOrder, askbid: AskBid) -> float:
+        """ distance of the order behind the touch of its side in bps, 0 at or through the touch
+        """
+        if askbid is None:
+            return 0.0
+        if order.side == 'BUY':
+            touch = float(askbid.bp)
+            distance = touch - order.price
+        else:
+            touch = float(askbid.ap)
+            distance = order.price - touch
+        if touch <= 0:
+            return 0.0
+        return max(0.0, distance / touch * 1e4)
+
+    def interval(self, order: ManagedOrder, askbid: AskBid, now: float) -> float:
+        """ seconds between two polls of order, before the budget stretch
+        """
+        filled_at = self._filled_at.get(order.order_id)
+        if filled_at is not None and now - filled_at < self.fill_window:
+            return self.min_interval
+        interval = self.min_interval * (1.0 + self.distance_bps(order, askbid) / self.near_bps)
+        age = max(0.0, time.time() - order.created)
+        interval *= 0.5 + min(age / self.age_scale, 1.5)
+        if self._symbol_filled_at is not None and now - self._symbol_filled_at < self.fill_window:
+            interval /= 2.0
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _due(self, orders: list[ManagedOrder], askbid: AskBid, now: float) -> list[ManagedOrder]:
+        """ orders due for a poll, most overdue first; sets the budget stretch
+        """
+        intervals = {order.order_id: self.interval(order, askbid, now) for order in orders}
+        # requests per second: one orders_status polls several ids on most clients
+        per_order = self.client.orders_status_requests(len(orders)) / len(orders)
+        demand = per_order * sum(1.0 / interval for interval in intervals.values())
+        self.stretch = max(1.0, demand / self.budget)
+        due = []
+        for order in orders:
+            polled = self._polled.get(order.order_id)
+            since = now - polled if polled is not None else time.time() - order.created
+            overdue = since / (intervals[order.order_id] * self.stretch)
+            if overdue >= 1.0:
+                due.append((overdue, order))
+        due.sort(key=lambda item: item[0], reverse=True)
+        return [order for _, order in due]
+
+    def _fetch_askbid(self):
+        if not self.scheduler.acquire(PUBLIC_READ):
+            return
+        try:
+            res = self.client.top_askbid(self.symbol)
+        except Exception as e:
+            self.logger.error("[%s] status poller top_askbid error: %s", self.symbol, e)
+            return
+        if res:
+            self.askbid = res[0]
+
+    def poll(self, askbid: AskBid = None) -> list[OrderStatus]:
+        """ poll the due orders within the budget and apply the results, returns them;
+            askbid: touch of the symbol when the caller has it, top_askbid is requested otherwise
+            (only when orders are due and the budget has room for it and a poll)
+        """
+        with self._lock:
+            now = time.monotonic()
+            orders = [order for order in self.oms.live_orders(self.symbol) if order.order_id]
+            live_ids = {order.order_id for order in orders}
+            for known in (self._polled, self._seen, self._filled_at):
+                for order_id in [order_id for order_id in known if order_id not in live_ids]:
+                    del known[order_id]
+            self._track_fills(orders, now)
+            if not orders:
+                return []
+            if askbid is not None:
+                self.askbid = askbid
+            due = self._due(orders, self.askbid, now)
+            if not due:
+                return []
+            if askbid is None and self.scheduler.available(PUBLIC_READ) >= 2:
+                self._fetch_askbid()
+                due = self._due(orders, self.askbid, now)
+            available = self.scheduler.available(PRIVATE_READ)
+            order_ids = []
+            for order in due:
+                if self.client.orders_status_requests(len(order_ids) + 1) > available:
+                    break
+                order_ids.append(order.order_id)
+            if not order_ids or not self.scheduler.acquire(PRIVATE_READ,
+                                                           self.client.orders_status_requests(len(order_ids))):
+                return []
+            for order_id in order_ids:
+                self._polled[order_id] = now
+
+        try:
+            res = self.client.orders_status(order_ids, self.symbol)
+        except Exception as e:
+            self.logger.error("[%s] status poller orders_status error: %s", self.symbol, e)
+            return []
+        if res is None:
+            self.logger.error("[%s] status poller orders_status failed", self.symbol)
+            return []
+        statuses = [res[order_id] for order_id in order_ids if order_id in res]
+        # left out of a successful query: not open any more (only open orders can be queried on some
+        # clients) or unknown to the exchange, ended as CLOSED instead of being polled forever
+        gone = [order_id for order_id in order_ids if order_id not in res]
+        for order_id in gone:
+            self.oms.update(order_id=order_id, state=CLOSED)
+        # requests for the orders which are not open any more (order_status of each on some clients)
+        closed = len(order_ids) - sum(1 for item in statuses if item.state not in FINAL_STATES)
+        extra = (self.client.orders_status_requests(len(order_ids), closed)
+                 - self.client.orders_status_requests(len(order_ids)))
+        if extra > 0:
+            self.scheduler.charge(extra)
+        self.oms.apply_status(statuses, self.symbol, QuoteReconciler.ct_val(self.client, self.symbol))
+        with self._lock:
+            self._track_fills([self.oms.by_order_id(order_id) for order_id in order_ids], time.monotonic())
+        return statuses
+
+    def _track_fills(self, orders: list[ManagedOrder], now: float):
+        """ remember when an order got a fill, from the polls or from other updates of the OMS
+        """
+        for order in orders:
+            if order is None:
+                continue
+            seen = self._seen.get(order.order_id)
+            current = (order.state, order.filled)
+            self._seen[order.order_id] = current
+            if seen is None:
+                continue
+            filled = order.filled > seen[1] or (
+                order.state != seen[0] and order.state in (ORDER_STATE_CONSTANTS.PARTIALLY_FILLED,
+                                                           ORDER_STATE_CONSTANTS.FILLED))
+            if filled:
+                self._filled_at[order.order_id] = now
+                self._symbol_filled_at = now
+
+    def start(self, tick: float = 0.2) -> threading.Thread:
+        """ poll every tick seconds in a thread until stop()
+        """
+        def run():
+            while self._running.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    self.logger.error("[%s] status poller error: %s", self.symbol, e)
+                time.sleep(tick)
+
+        self._running.set()
+        thread = threading.Thread(target=run, name="status_poller", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._running.clear()
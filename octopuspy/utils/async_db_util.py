@@ -0,0 +1,181 @@
+""" asyncio variant of db_util, same key layout and encoding
+    The plain, bulk and hash functions of db_util have an awaitable counterpart of the same name;
+    the local cache tier (enable_local_cache) is not available here, reads always go to redis.
+    The client is created lazily on first use and is bound to that event loop,
+    use one event loop per process (asyncio.run of the strategy main).
+    The clients share the settings of db_util, db_util.configure() is picked up on the next call.
+"""
+import json
+import asyncio
+import redis
+import redis.asyncio as aioredis
+
+from . import db_util
+
+_conn = None
+_bin_conn = None
+_version = db_util._config_version     # the db_util settings the clients were built with
+
+class Connection(aioredis.Connection):
+    """ pool connection raising db_util.RedisUnavailable / RedisConnectTimeout when connect fails
+    """
+    async def connect(self):
+        try:
+            await super().connect()
+        except redis.RedisError as e:
+            converted = db_util.unavailable(e)
+            if converted is e:
+                raise
+            raise converted from e
+
+def _client(decode_responses: bool = True) -> aioredis.Redis:
+    return aioredis.Redis(connection_pool=aioredis.ConnectionPool(
+        connection_class=Connection, **{**db_util.REDIS_CONFIG, "decode_responses": decode_responses}))
+
+def _check_config():
+    """ drop the clients built before the last db_util.configure(), closing them on the running loop
+    """
+    global _conn, _bin_conn, _version
+    if _version == db_util._config_version:
+        return
+    stale, _conn, _bin_conn = (_conn, _bin_conn), None, None
+    _version = db_util._config_version
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    for conn in stale:
+        if conn is not None:
+            loop.create_task(conn.aclose())
+
+def get_conn() -> aioredis.Redis:
+    """ shared asyncio client built from db_util.REDIS_CONFIG
+    """
+    global _conn
+    _check_config()
+    if _conn is None:
+        _conn = _client()
+    return _conn
+
+def RDB() -> aioredis.Redis:
+    return get_conn()
+
+def BDB() -> aioredis.Redis:
+    """ shared asyncio client returning raw bytes, for codec_util encoded values
+    """
+    global _bin_conn
+    _check_config()
+    if _bin_conn is None:
+        _bin_conn = _client(decode_responses=False)
+    return _bin_conn
+
+async def close():
+    """ close the shared clients and their pools, a later call creates new ones
+    """
+    global _conn, _bin_conn
+    conns, _conn, _bin_conn = (_conn, _bin_conn), None, None
+    for conn in conns:
+        if conn is not None:
+            await conn.aclose()
+
+
+# fundamental API
+async def get_int(key: str) -> int:
+    """ get int value
+    """
+    res = await RDB().get(key)
+    if res:
+        return int(res)
+    return res
+
+async def get_float(key: str) -> float:
+    """ get float value
+    """
+    res = await RDB().get(key)
+    if res:
+        return float(res)
+    return 0.0
+
+async def set_float(key: str, value: float):
+    """ set float value
+    """
+    if key:
+        await RDB().set(key, float(value))
+
+async def get_dict(key: str) -> dict:
+    """ get dict object
+    """
+    res = await RDB().get(key)
+    if res:
+        return json.loads(res)
+    return res
+
+async def set_dict(key: str, value: dict):
+    """ set dict object
+    """
+    if key and value:
+        await RDB().set(key, json.dumps(value))
+
+
+# bulk API, one round trip per call
+async def get_many(keys: list, cast=None) -> list:
+    """ get values of keys in one MGET, missing keys are None
+    """
+    if not keys:
+        return []
+    res = await RDB().mget(keys)
+    if cast:
+        return [cast(item) if item is not None else None for item in res]
+    return res
+
+async def set_many(mapping: dict, ex: int = None):
+    """ set key/value pairs in one round trip, dict values are json encoded
+    """
+    if not mapping:
+        return
+    values = {key: json.dumps(value) if isinstance(value, (dict, list)) else value
+              for key, value in mapping.items()}
+    if ex is None:
+        await RDB().mset(values)
+        return
+    async with RDB().pipeline(transaction=False) as pipe:
+        for key, value in values.items():
+            pipe.set(key, value, ex=ex)
+        await pipe.execute()
+
+async def hget_dict(key: str, fields: list = None) -> dict:
+    """ get fields of a hash as dict, all fields when fields is None
+    """
+    if fields is None:
+        return await RDB().hgetall(key)
+    if not fields:
+        return {}
+    values = await RDB().hmget(key, fields)
+    return {field: value for field, value in zip(fields, values) if value is not None}
+
+async def hset_dict(key: str, value: dict):
+    """ set fields of a hash, untouched fields are kept
+    """
+    if key and value:
+        await RDB().hset(key, mapping=value)
+
+async def hget_many(keys: list) -> list:
+    """ HGETALL of several hashes in one pipeline
+    """
+    if not keys:
+        return []
+    async with RDB().pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.hgetall(key)
+        return await pipe.execute()
+
+async def hset_many(mapping: dict):
+    """ HSET several hashes in one pipeline, mapping is {key: {field: value}}
+    """
+    mapping = {key: value for key, value in mapping.items() if value}
+    if not mapping:
+        return
+    async with RDB().pipeline(transaction=False) as pipe:
+        for key, value in mapping.items():
+            pipe.hset(key, mapping=value)
+        await pipe.execute()
@@ -0,0 +1,54 @@
+""" in-process LRU cache with per-key TTL
+    Used by db_util as the local tier in front of redis.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+MISS = object()     # sentinel, None is a valid cached value (missing redis key)
+
+class LocalCache:
+    """ size bounded LRU, every entry expires after its ttl (seconds)
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 1.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()     # key -> (expire_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISS):
+        """ cached value, or default when missing or expired
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if item[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return item[1]
+                del self._data[key]
+            self.misses += 1
+        return default
+
+    def set(self, key, value, ttl: float = None):
+        """ cache value for ttl seconds (default self.ttl), evict the least recently used on overflow
+        """
+        expire_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expire_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
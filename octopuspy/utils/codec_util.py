@@ -0,0 +1,135 @@
+""" compact value codec for redis
+    msgpack (optional dependency) when installed, otherwise compact json.
+    Every payload starts with one byte naming its codec, so readers decode
+    whatever the writer used. The namedtuples of base_restapi round trip natively:
+    msgpack ext types / tagged json objects carry the type code and field values.
+    Dict keys which are not strings (e.g. int, tuple) are kept by both codecs, numpy values decode
+    as python ints / floats / lists.
+"""
+import json
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+from ..exchange.base_restapi import AskBid, NewOrder, OrderID, OrderStatus, Ticker
+
+MSGPACK = b'M'
+JSON = b'J'
+
+# ext type code -> namedtuple class, codes are part of the stored format: never reuse one
+NAMEDTUPLE_TYPES = {
+    1: OrderStatus,
+    2: Ticker,
+    3: AskBid,
+    4: OrderID,
+    5: NewOrder,
+}
+_TYPE_CODES = {cls: code for code, cls in NAMEDTUPLE_TYPES.items()}
+# msgpack ext type of a dict with tuple keys, packed as [key, value] pairs: msgpack decodes
+# arrays as lists, which can not be map keys
+_PAIRS_CODE = 127
+
+def register(code: int, cls):
+    """ register another namedtuple class for native round trip
+    """
+    if code == _PAIRS_CODE:
+        raise ValueError(f"type code {code} is reserved")
+    if NAMEDTUPLE_TYPES.get(code, cls) is not cls:
+        raise ValueError(f"type code {code} already used by {NAMEDTUPLE_TYPES[code].__name__}")
+    NAMEDTUPLE_TYPES[code] = cls
+    _TYPE_CODES[cls] = code
+
+
+def _plain(obj):
+    """ builtin value of a numpy scalar or array (.item() / .tolist()), for both codecs
+    """
+    if type(obj).__module__ == "numpy" and hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"can not serialize {type(obj).__name__}")
+
+def _key(key):
+    """ dict key of a decoded pair, tuple keys come back as lists
+    """
+    if isinstance(key, list):
+        return tuple(_key(item) for item in key)
+    return key
+
+
+def _msgpack_prepare(obj):
+    """ registered namedtuples as ext types; other tuples, lists and dicts (subclasses too) walked
+    """
+    code = _TYPE_CODES.get(type(obj))
+    if code is not None:
+        return msgpack.ExtType(code, _packb(list(obj)))
+    if isinstance(obj, (list, tuple)):
+        return [_msgpack_prepare(item) for item in obj]
+    if isinstance(obj, dict):
+        if any(isinstance(key, tuple) for key in obj):
+            return msgpack.ExtType(_PAIRS_CODE, _packb([[key, value] for key, value in obj.items()]))
+        return {key: _msgpack_prepare(value) for key, value in obj.items()}
+    return obj
+
+def _msgpack_ext_hook(code, data):
+    if code == _PAIRS_CODE:
+        return {_key(key): value for key, value in _unpackb(data)}
+    cls = NAMEDTUPLE_TYPES.get(code)
+    if cls is None:
+        return msgpack.ExtType(code, data)
+    return cls(*_unpackb(data))
+
+def _packb(value) -> bytes:
+    # subclasses (OrderedDict, defaultdict, np.float64) pack as their base type, numpy others by _plain
+    return msgpack.packb(_msgpack_prepare(value), use_bin_type=True, default=_plain)
+
+def _unpackb(data: bytes):
+    return msgpack.unpackb(data, raw=False, ext_hook=_msgpack_ext_hook, strict_map_key=False)
+
+
+def _json_encode(obj):
+    code = _TYPE_CODES.get(type(obj))
+    if code is not None:
+        return {"__t": code, "v": [_json_encode(item) for item in obj]}
+    if isinstance(obj, (list, tuple)):
+        return [_json_encode(item) for item in obj]
+    if isinstance(obj, dict):
+        if all(isinstance(key, str) for key in obj):
+            return {key: _json_encode(value) for key, value in obj.items()}
+        # json object keys are strings: other keys (int order ids, ...) are kept as pairs,
+        # so both codecs decode the same dict
+        return {"__d": [[_json_encode(key), _json_encode(value)] for key, value in obj.items()]}
+    return obj
+
+def _json_object_hook(obj: dict):
+    if "__t" in obj and len(obj) == 2:
+        cls = NAMEDTUPLE_TYPES.get(obj["__t"])
+        if cls:
+            return cls(*obj["v"])
+    if "__d" in obj and len(obj) == 1:
+        return {_key(key): value for key, value in obj["__d"]}
+    return obj
+
+
+def pack(value, codec: bytes = None) -> bytes:
+    """ encode value, codec is MSGPACK (default when installed) or JSON
+    """
+    if codec is None:
+        codec = MSGPACK if msgpack else JSON
+    if codec == MSGPACK:
+        return MSGPACK + _packb(value)
+    return JSON + json.dumps(_json_encode(value), separators=(',', ':'), default=_plain).encode('utf-8')
+
+def unpack(data: bytes):
+    """ decode a payload of pack(), None stays None
+    """
+    if data is None:
+        return None
+    codec, body = data[:1], data[1:]
+    if codec == MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack payload but msgpack is not installed")
+        return _unpackb(body)
+    if codec == JSON:
+        return json.loads(body, object_hook=_json_object_hook)
+    raise ValueError(f"unknown codec {codec!r}")
@@ -1,49 +1,251 @@
 """ the singleton of redis client
     update:uding ConnectionPool
+    update:no ping per call, liveness is left to the pool (health_check_interval, retry_on_timeout);
+           pipelined bulk API; settings configurable by environment or configure()
+    update:field level hashes and compact binary values through codec_util
+    update:optional local LRU+TTL tier (enable_local_cache), invalidated by pub/sub or keyspace events
+    update:an unreachable server still raises the builtin ConnectionError (RedisUnavailable)
 """
+import os
 import json
+import time
+import logging
+import threading
 import redis
 from redis import ConnectionPool
-from functools import lru_cache
+
+from . import codec_util
+from .cache_util import LocalCache, MISS
 
 REDIS_CONFIG = {
-    "host": "127.0.0.1", "port": 6379, "password": "",
-    "max_connections": 5,
+    "host": os.getenv("OCTOPUSPY_REDIS_HOST", "127.0.0.1"),
+    "port": int(os.getenv("OCTOPUSPY_REDIS_PORT", "6379")),
+    "password": os.getenv("OCTOPUSPY_REDIS_PASSWORD", ""),
+    "db": int(os.getenv("OCTOPUSPY_REDIS_DB", "0")),
+    "max_connections": int(os.getenv("OCTOPUSPY_REDIS_MAX_CONNECTIONS", "5")),
     "socket_connect_timeout": 1,
     "health_check_interval": 30,
+    "retry_on_timeout": True,
     "decode_responses": True,
 }
 
-pool = ConnectionPool(**REDIS_CONFIG)
+class RedisUnavailable(redis.ConnectionError, ConnectionError):
+    """ the server can not be reached, both a redis.ConnectionError and the builtin ConnectionError
+        RDB() raised before connections were left to the pool
+    """
 
-@lru_cache(maxsize=1)
-def get_conn():
-    try:
-        conn = redis.Redis(connection_pool=pool)
-        if conn.ping():
-            return conn
-    except redis.RedisError:
-        raise ConnectionError("Local node unavailable")
+class RedisConnectTimeout(redis.TimeoutError, ConnectionError):
+    """ connecting to the server timed out (socket_connect_timeout), also a builtin ConnectionError
+    """
 
+def unavailable(error: Exception) -> Exception:
+    """ the builtin compatible exception of a failed connect, other errors are returned unchanged
+    """
+    if isinstance(error, ConnectionError):
+        return error
+    if isinstance(error, redis.TimeoutError):
+        return RedisConnectTimeout(*error.args)
+    if isinstance(error, redis.ConnectionError):
+        return RedisUnavailable(*error.args)
+    return error
+
+class Connection(redis.Connection):
+    """ pool connection raising RedisUnavailable / RedisConnectTimeout when connect fails
+    """
+    def connect(self):
+        try:
+            super().connect()
+        except redis.RedisError as e:
+            converted = unavailable(e)
+            if converted is e:
+                raise
+            raise converted from e
+
+def _pool(decode_responses: bool = True) -> ConnectionPool:
+    return ConnectionPool(connection_class=Connection, **{**REDIS_CONFIG, "decode_responses": decode_responses})
+
+pool = _pool()
+# values written by codec_util are binary, they are read by a client without response decoding
+bin_pool = _pool(decode_responses=False)
+_conn = None
+_bin_conn = None
+_conn_lock = threading.Lock()
+_config_version = 0     # bumped by configure(), async_db_util rebuilds its clients when it changes
+
+def configure(**kwargs):
+    """ update REDIS_CONFIG and rebuild the connection pool, e.g. configure(host="10.0.0.2", db=1)
+        the asyncio clients of async_db_util follow on their next use
+    """
+    global pool, bin_pool, _conn, _bin_conn, _config_version
+    with _conn_lock:
+        REDIS_CONFIG.update(kwargs)
+        old_pools = (pool, bin_pool)
+        pool = _pool()
+        bin_pool = _pool(decode_responses=False)
+        _conn = _bin_conn = None
+        _config_version += 1
+    for old_pool in old_pools:
+        old_pool.disconnect()
+
+def get_conn() -> redis.Redis:
+    """ shared client on the module pool, connections are checked by the pool itself
+    """
+    global _conn
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                _conn = redis.Redis(connection_pool=pool)
+    return _conn
+
+
+def RDB() -> redis.Redis:
+    return get_conn()
+
+
+def BDB() -> redis.Redis:
+    """ shared client returning raw bytes, for codec_util encoded values
+    """
+    global _bin_conn
+    if _bin_conn is None:
+        with _conn_lock:
+            if _bin_conn is None:
+                _bin_conn = redis.Redis(connection_pool=bin_pool)
+    return _bin_conn
+
+
+# local cache tier, disabled by default
+INVALIDATE_CHANNEL = "octopuspy:invalidate"
+LISTEN_POLL = 0.2   # seconds the invalidation listener waits for a message before checking for stop
+_local_cache = None
+_invalidate_channel = INVALIDATE_CHANNEL
+_listener = None    # (thread, stop event) of the invalidation listener
+_cache_lock = threading.Lock()
+_logger = logging.getLogger(__name__)
+
+def enable_local_cache(max_size: int = 1024, ttl: float = 1.0, channel: str = INVALIDATE_CHANNEL,
+                       keyspace: bool = False) -> LocalCache:
+    """ serve get_int/get_float/get_dict/get_obj from an in-process LRU cache.
+        Writes through this module evict the key locally and publish it on `channel`,
+        a background thread evicts keys published by other processes. With keyspace=True
+        it listens to redis keyspace notifications instead, which also covers writers
+        outside octopuspy (needs `notify-keyspace-events KA` on the server).
+        Staleness is bounded by ttl even if invalidation messages are lost.
+        Calling it again replaces the cache and restarts the listener with the new channel / keyspace.
+    """
+    global _local_cache, _invalidate_channel, _listener
+    with _cache_lock:
+        _stop_listener()
+        _invalidate_channel = channel
+        _local_cache = LocalCache(max_size, ttl)
+        stop = threading.Event()
+        thread = threading.Thread(target=_listen_invalidation, args=(_local_cache, channel, keyspace, stop),
+                                  name="db-cache-invalidation", daemon=True)
+        _listener = (thread, stop)
+        thread.start()
+        return _local_cache
+
+def disable_local_cache():
+    """ drop the local cache and stop its listener
+    """
+    global _local_cache
+    with _cache_lock:
+        _local_cache = None
+        _stop_listener()
+
+def _stop_listener():
+    """ stop the invalidation listener and wait for it, called with _cache_lock held
+    """
+    global _listener
+    if _listener is None:
+        return
+    thread, stop = _listener
+    _listener = None
+    stop.set()
+    if thread is not threading.current_thread():
+        thread.join(timeout=LISTEN_POLL + 1.0)
+
+def _evict(key: str, cache: LocalCache = None):
+    if cache is None:
+        cache = _local_cache
+    if cache is not None:
+        cache.pop(('s', key))
+        cache.pop(('b', key))
+
+def _listen_invalidation(cache: LocalCache, channel: str, keyspace: bool, stop: threading.Event):
+    """ evict keys of cache changed by other processes until stop is set,
+        drop the whole cache after a disconnect
+    """
+    prefix = f"__keyspace@{REDIS_CONFIG.get('db', 0)}__:"
+    while not stop.is_set():
+        pubsub = None
+        try:
+            pubsub = RDB().pubsub(ignore_subscribe_messages=True)
+            if keyspace:
+                pubsub.psubscribe(f"{prefix}*")
+            else:
+                pubsub.subscribe(channel)
+            while not stop.is_set():
+                message = pubsub.get_message(timeout=LISTEN_POLL)
+                if message is None:
+                    continue
+                if message["type"] == "pmessage":
+                    _evict(message["channel"][len(prefix):], cache)
+                elif message["type"] == "message":
+                    _evict(message["data"], cache)
+        except redis.RedisError as e:
+            _logger.error("cache invalidation listener error: %s", e)
+            cache.clear()
+            stop.wait(1)
+        finally:
+            if pubsub is not None:
+                pubsub.close()
+
+def _invalidate(*keys):
+    """ evict keys locally and tell the other processes
+    """
+    if _local_cache is None:
+        return
+    pipe = pipeline()
+    for key in keys:
+        _evict(key)
+        pipe.publish(_invalidate_channel, key)
+    pipe.execute()
+
+def _get(key: str):
+    cache = _local_cache
+    if cache is None:
+        return RDB().get(key)
+    res = cache.get(('s', key))
+    if res is MISS:
+        res = RDB().get(key)
+        cache.set(('s', key), res)
+    return res
+
+def _bget(key: str):
+    cache = _local_cache
+    if cache is None:
+        return BDB().get(key)
+    res = cache.get(('b', key))
+    if res is MISS:
+        res = BDB().get(key)
+        cache.set(('b', key), res)
+    return res
 
-def RDB():
-    try:
-        conn = get_conn()
-        if conn and conn.ping():
-            # print("using cache_conn")
-            return conn
-        get_conn.cache_clear()
-    except (redis.RedisError, ConnectionError):
-        get_conn.cache_clear()
 
-    raise ConnectionError("Redis server unavailable")
+def ping() -> bool:
+    """ explicit liveness check, for startup or monitoring (not needed before commands)
+    """
+    try:
+        return bool(get_conn().ping())
+    except redis.RedisError:
+        return False
 
 
 # fundamental API
 def get_int(key: str) -> int:
     """ get int value
     """
-    res = RDB().get(key)
+    res = _get(key)
     if res:
         return int(res)
     return res
@@ -51,7 +253,7 @@ def get_int(key: str) -> int:
 def get_float(key: str) -> float:
     """ get float value
     """
-    res = RDB().get(key)
+    res = _get(key)
     if res:
         return float(res)
     return 0.0
@@ -61,11 +263,12 @@ def set_float(key: str, value: float):
     """
     if key:
         RDB().set(key, float(value))
+        _invalidate(key)
 
 def get_dict(key: str) -> dict:
     """ get dict object
     """
-    res = RDB().get(key)
+    res = _get(key)
     if res:
         return json.loads(res)
     return res
@@ -75,3 +278,114 @@ def set_dict(key: str, value: dict):
     """
     if key and value:
         RDB().set(key, json.dumps(value))
+        _invalidate(key)
+
+
+# bulk API, one round trip per call
+def pipeline(transaction: bool = False):
+    """ pipeline on the shared client for custom batches
+    """
+    return RDB().pipeline(transaction=transaction)
+
+def get_many(keys: list, cast=None) -> list:
+    """ get values of keys in one MGET, missing keys are None
+        cast: optional converter applied to present values, e.g. float or json.loads
+    """
+    if not keys:
+        return []
+    res = RDB().mget(keys)
+    if cast:
+        return [cast(item) if item is not None else None for item in res]
+    return res
+
+def set_many(mapping: dict, ex: int = None):
+    """ set key/value pairs in one round trip, dict values are json encoded
+        ex: optional expire seconds of every key
+    """
+    if not mapping:
+        return
+    values = {key: json.dumps(value) if isinstance(value, (dict, list)) else value
+              for key, value in mapping.items()}
+    if ex is None:
+        RDB().mset(values)
+    else:
+        pipe = pipeline()
+        for key, value in values.items():
+            pipe.set(key, value, ex=ex)
+        pipe.execute()
+    _invalidate(*values)
+
+def hget_dict(key: str, fields: list = None) -> dict:
+    """ get fields of a hash as dict, all fields when fields is None
+    """
+    if fields is None:
+        return RDB().hgetall(key)
+    if not fields:
+        return {}
+    return {field: value for field, value in zip(fields, RDB().hmget(key, fields)) if value is not None}
+
+def hset_dict(key: str, value: dict):
+    """ set fields of a hash, untouched fields are kept
+    """
+    if key and value:
+        RDB().hset(key, mapping=value)
+
+def hget_many(keys: list) -> list:
+    """ HGETALL of several hashes in one pipeline
+    """
+    if not keys:
+        return []
+    pipe = pipeline()
+    for key in keys:
+        pipe.hgetall(key)
+    return pipe.execute()
+
+def hset_many(mapping: dict):
+    """ HSET several hashes in one pipeline, mapping is {key: {field: value}}
+    """
+    mapping = {key: value for key, value in mapping.items() if value}
+    if not mapping:
+        return
+    pipe = pipeline()
+    for key, value in mapping.items():
+        pipe.hset(key, mapping=value)
+    pipe.execute()
+
+
+# field level and binary API, values are encoded by codec_util (msgpack when installed)
+# so namedtuples like OrderStatus, Ticker, AskBid round trip natively
+def get_obj(key: str):
+    """ get a codec encoded value
+    """
+    return codec_util.unpack(_bget(key))
+
+def set_obj(key: str, value, ex: int = None):
+    """ set a codec encoded value
+    """
+    if key:
+        BDB().set(key, codec_util.pack(value), ex=ex)
+        _invalidate(key)
+
+def get_fields(key: str, fields: list = None) -> dict:
+    """ get codec encoded fields of a hash, all fields when fields is None
+    """
+    if fields is None:
+        return {field.decode('utf-8'): codec_util.unpack(value)
+                for field, value in BDB().hgetall(key).items()}
+    if not fields:
+        return {}
+    return {field: codec_util.unpack(value)
+            for field, value in zip(fields, BDB().hmget(key, fields)) if value is not None}
+
+def set_fields(key: str, value: dict):
+    """ update only the given fields of a hash, each field is encoded on its own,
+        so a small state update does not rewrite the whole object
+    """
+    if key and value:
+        BDB().hset(key, mapping={field: codec_util.pack(item) for field, item in value.items()})
+
+def del_fields(key: str, fields: list):
+    """ delete fields of a hash
+    """
+    if key and fields:
+        BDB().hdel(key, *fields)
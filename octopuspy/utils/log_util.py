@@ -1,24 +1,108 @@
 """ utilities for logger
 """
 import os
+import time
+import queue
+import atexit
 import logging
 import logging.handlers
+import threading
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(filename)s:%(lineno)d - %(message)s'
+
+# (QueueListener, QueueHandler) of each async logger, listeners are stopped (and flushed) at exit
+_LISTENERS = {}
+_LISTENERS_LOCK = threading.Lock()
 
 def _init_log_dir(proj_dir):
     log_dir = os.path.join(proj_dir, 'log')
     if not os.path.exists(log_dir):
         os.mkdir(log_dir)
 
-def create_logger(proj_dir, log_file, log_name, backup_cnt=10):
-    """ create logger """
+class RateLimitFilter(logging.Filter):
+    """ Rate limit repetitive records.
+        Records with the same (logger, level, message template) pass at most `burst` times
+        per `interval` seconds; the rest are dropped and counted. `sample` > 1 additionally
+        keeps only one of every `sample` records once the burst is exhausted.
+        The next record passed after suppression reports the suppressed count.
+    """
+    def __init__(self, interval: float = 1.0, burst: int = 5, sample: int = 0,
+                 min_level: int = logging.NOTSET):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.sample = sample
+        self.min_level = min_level
+        self._buckets = {}  # key -> [window_start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.interval:
+                suppressed = bucket[2] if bucket else 0
+                self._buckets[key] = [now, 1, 0]
+            elif bucket[1] < self.burst:
+                bucket[1] += 1
+                suppressed, bucket[2] = bucket[2], 0
+            else:
+                bucket[2] += 1
+                if not self.sample or bucket[2] % self.sample:
+                    return False
+                suppressed, bucket[2] = bucket[2] - 1, 0
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} similar records suppressed]"
+        return True
+
+def create_logger(proj_dir, log_file, log_name, backup_cnt=10, level='DEBUG',
+                  async_mode=False, rate_limit: RateLimitFilter = None):
+    """ create logger
+        level: per-logger level gate, records below it are dropped before any formatting
+        async_mode: hand records to a QueueHandler, file I/O runs on a background QueueListener thread
+        rate_limit: optional RateLimitFilter applied in the caller thread, before enqueuing
+    """
     _init_log_dir(proj_dir)
     handler = logging.handlers.RotatingFileHandler(
         os.path.join(proj_dir, 'log', log_file),
         maxBytes=50 * 1024 * 1024,
         backupCount=backup_cnt)
-    handler.setFormatter(
-        logging.Formatter('%(asctime)s %(levelname)s %(filename)s:%(lineno)d - %(message)s'))
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
     logger = logging.getLogger(log_name)
-    logger.setLevel('DEBUG') # DEBUG ,INFO
+    logger.setLevel(level) # DEBUG ,INFO
+    if async_mode:
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        listener = logging.handlers.QueueListener(
+            queue_handler.queue, handler, respect_handler_level=True)
+        with _LISTENERS_LOCK:
+            old = _LISTENERS.pop(log_name, None)
+            if old:
+                # re-created: detach the previous queue so records do not pile up in it
+                old[0].stop()
+                logger.removeHandler(old[1])
+            _LISTENERS[log_name] = (listener, queue_handler)
+        listener.start()
+        handler = queue_handler
+    if rate_limit:
+        handler.addFilter(rate_limit)
     logger.addHandler(handler)
     return logger
+
+def set_level(log_name, level):
+    """ change the level gate of a logger at runtime
+    """
+    logging.getLogger(log_name).setLevel(level)
+
+def stop_listeners():
+    """ flush queued records and stop the background listeners
+    """
+    with _LISTENERS_LOCK:
+        listeners = list(_LISTENERS.values())
+        _LISTENERS.clear()
+    for listener, _ in listeners:
+        listener.stop()
+
+atexit.register(stop_listeners)
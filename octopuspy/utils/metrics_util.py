@@ -0,0 +1,357 @@
+""" Prometheus compatible metrics for exchange clients, websocket feeds and order flow
+    Pure standard library: counters, gauges and histograms are rendered in the
+    Prometheus text exposition format (0.0.4), served by a tiny built-in http
+    endpoint or pushed to a local collector (pushgateway).
+
+    Usage:
+        from octopuspy.utils import metrics_util
+        client = metrics_util.instrument_client(OkxSpotClient(params, logger), "okx_spot")
+        metrics_util.start_http_server(9108)
+"""
+import time
+import bisect
+import threading
+import urllib.request
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# default latency buckets in seconds, from 1ms to 10s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """ base class of metric, values are keyed by the tuple of label values
+    """
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> list:
+        with self._lock:
+            return [f"{self.name}{_label_str(self.labelnames, key)} {value}"
+                    for key, value in self._values.items()]
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """ monotonically increasing counter
+    """
+    kind = "counter"
+
+    def inc(self, *labels, value: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def get(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    """ value that can go up and down
+    """
+    kind = "gauge"
+
+    def set(self, *labels, value: float):
+        self._values[labels] = value    # single store is atomic under the GIL
+
+    def inc(self, *labels, value: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def get(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+
+class Histogram(_Metric):
+    """ cumulative histogram, observation is a bisect plus two additions
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # per bucket counts (last slot is +Inf), sum of observations
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][idx] += 1
+            state[1] += value
+
+    def get(self, *labels) -> tuple:
+        """ return (count, sum) of observations
+        """
+        state = self._values.get(labels)
+        if state is None:
+            return 0, 0.0
+        return sum(state[0]), state[1]
+
+    def _samples(self) -> list:
+        lines = []
+        with self._lock:
+            items = [(key, list(state[0]), state[1]) for key, state in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """ collection of metrics rendered together
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"duplicated metric name: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        """ render all metrics in Prometheus text format
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.expose() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# exchange client requests
+REQUESTS = REGISTRY.counter(
+    "octopuspy_requests_total", "Exchange client requests", ("client", "method", "status"))
+REQUEST_LATENCY = REGISTRY.histogram(
+    "octopuspy_request_latency_seconds", "Exchange client request latency", ("client", "method"))
+RATE_LIMIT_REMAINING = REGISTRY.gauge(
+    "octopuspy_rate_limit_remaining", "Remaining request weight before the rate limit", ("client", "limit"))
+RATE_LIMIT_USED = REGISTRY.gauge(
+    "octopuspy_rate_limit_used", "Request weight used in the current rate limit window", ("client", "limit"))
+# websocket feeds
+WS_MESSAGES = REGISTRY.counter(
+    "octopuspy_ws_messages_total", "Websocket messages received", ("feed", "channel"))
+WS_LAG = REGISTRY.histogram(
+    "octopuspy_ws_lag_seconds", "Delay between exchange event time and local receive time", ("feed",))
+WS_RECONNECTS = REGISTRY.counter(
+    "octopuspy_ws_reconnects_total", "Websocket reconnections", ("feed",))
+# order flow
+ORDERS = REGISTRY.counter(
+    "octopuspy_orders_total", "Orders by action: placed, cancelled, rejected", ("client", "symbol", "action"))
+OPEN_ORDERS = REGISTRY.gauge(
+    "octopuspy_open_orders", "Open orders of last open_orders call", ("client", "symbol"))
+
+
+def observe_ws_message(feed: str, channel: str, event_ms: int = 0):
+    """ count a websocket message, and its lag if the exchange event time (ms) is given
+    """
+    WS_MESSAGES.inc(feed, channel)
+    if event_ms:
+        WS_LAG.observe(feed, value=max(0.0, time.time() - event_ms / 1000))
+
+
+# limit of the windows of which the venue reports only the used weight (Binance spot defaults,
+# pass limits to instrument_client for other accounts, e.g. {"x-mbx-used-weight-1m": 2400} on USDS-M)
+WEIGHT_LIMITS = {"x-mbx-used-weight-1m": 6000, "x-mbx-order-count-10s": 100, "x-mbx-order-count-1d": 200000}
+
+
+def observe_rate_limit(name: str, headers, limits: dict = None):
+    """ update the rate limit gauges from the headers of a response:
+        Binance X-MBX-USED-WEIGHT-* / X-MBX-ORDER-COUNT-* (used, remaining by limits), and the
+        X-RateLimit-Remaining[-*] family (Bifu and other venues reporting the remaining weight)
+    """
+    limits = WEIGHT_LIMITS if limits is None else limits
+    for key, value in headers.items():
+        key = key.lower()
+        try:
+            if key.startswith(("x-mbx-used-weight-", "x-mbx-order-count-")):
+                used = float(value)
+                RATE_LIMIT_USED.set(name, key[6:], value=used)
+                if key in limits:
+                    RATE_LIMIT_REMAINING.set(name, key[6:], value=max(0.0, limits[key] - used))
+            elif key.startswith("x-ratelimit-remaining"):
+                RATE_LIMIT_REMAINING.set(name, key[22:] or "default", value=float(value))
+        except ValueError:
+            continue
+
+
+def _attach_response_hook(client, hook):
+    """ call hook(response) after every http response of the requests sessions and httpx clients
+        held by client (directly or as .session of its SDK objects)
+    """
+    seen = set()
+    for obj in list(getattr(client, "__dict__", {}).values()):
+        for target in (obj, getattr(obj, "session", None)):
+            if target is None or id(target) in seen:
+                continue
+            seen.add(id(target))
+            hooks = getattr(target, "hooks", None)              # requests.Session
+            if isinstance(hooks, dict) and isinstance(hooks.get("response"), list):
+                hooks["response"].append(hook)
+                continue
+            event_hooks = getattr(target, "event_hooks", None)  # httpx.Client, e.g. the okx SDK
+            if isinstance(event_hooks, dict) and isinstance(event_hooks.get("response"), list):
+                target.event_hooks = {**event_hooks, "response": event_hooks["response"] + [hook]}
+
+
+def _failed(res) -> bool:
+    """ None or False is the error result of the client interface; an empty list is a valid
+        answer (no open orders, nothing cancelled)
+    """
+    return res is None or res is False
+
+
+def _order_flow(name: str, method: str, args: tuple, kwargs: dict, res):
+    """ update order metrics from the arguments and the result of a client call
+    """
+    symbol = kwargs.get("symbol", "")
+    if method == "batch_make_orders":
+        orders = kwargs.get("orders", args[0] if args else [])
+        symbol = symbol or (args[1] if len(args) > 1 else "") or (orders[0].symbol if orders else "")
+        placed = len(res or [])
+        ORDERS.inc(name, symbol, "placed", value=placed)
+        if len(orders) > placed:
+            ORDERS.inc(name, symbol, "rejected", value=len(orders) - placed)
+    elif method == "batch_cancel":
+        symbol = symbol or (args[1] if len(args) > 1 else "")
+        ORDERS.inc(name, symbol, "cancelled", value=len(res or []))
+    elif method == "cancel_order":
+        symbol = symbol or (args[1] if len(args) > 1 else "")
+        if res and res.order_id:
+            ORDERS.inc(name, symbol, "cancelled")
+    elif method == "open_orders" and res is not None:
+        symbol = symbol or (args[0] if args else "")
+        OPEN_ORDERS.set(name, symbol, value=len(res))
+
+
+INSTRUMENTED_METHODS = ("batch_make_orders", "batch_cancel", "cancel_order", "open_orders",
+                        "order_status", "ticker", "top_askbid")
+
+
+def instrument_client(client, name: str = "", methods: tuple = INSTRUMENTED_METHODS, limits: dict = None):
+    """ wrap the standard interface of a BaseClient instance with request and order metrics,
+        and read the rate limit headers of every response of its http sessions.
+        A failed response (None, False) is counted as status 'error', an exception as 'exception'.
+        limits: window limits for observe_rate_limit, WEIGHT_LIMITS by default
+    """
+    name = name or type(client).__name__
+
+    def on_response(response, *args, **kwargs):
+        try:
+            observe_rate_limit(name, response.headers, limits)
+        except Exception:
+            pass    # metrics never break a request
+    if not getattr(client, "__metrics__", False):
+        _attach_response_hook(client, on_response)
+        client.__metrics__ = True
+    for method in methods:
+        func = getattr(client, method, None)
+        if func is None or getattr(func, "__metrics__", False):
+            continue
+
+        def _wrap(func, method):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    res = func(*args, **kwargs)
+                except Exception:
+                    REQUESTS.inc(name, method, "exception")
+                    raise
+                finally:
+                    REQUEST_LATENCY.observe(name, method, value=time.perf_counter() - start)
+                REQUESTS.inc(name, method, "error" if _failed(res) else "ok")
+                _order_flow(name, method, args, kwargs, res)
+                return res
+            wrapper.__metrics__ = True
+            return wrapper
+        setattr(client, method, _wrap(func, method))
+    return client
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.expose().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass    # keep scrapes out of stderr
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY):
+    """ serve /metrics from a daemon thread, return the server (call shutdown() to stop)
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    return server
+
+
+def push_to_gateway(gateway: str, job: str, registry: MetricsRegistry = REGISTRY, timeout: float = 2):
+    """ push metrics to a local collector, e.g. push_to_gateway("http://127.0.0.1:9091", "mm_bot")
+    """
+    url = f"{gateway.rstrip('/')}/metrics/job/{job}"
+    request = urllib.request.Request(url, data=registry.expose().encode("utf-8"), method="PUT",
+                                     headers={"Content-Type": CONTENT_TYPE})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
@@ -0,0 +1,111 @@
+""" fakes shared by the exchange client tests: order factories, a silent logger and in-memory
+    stand-ins of the OKX trade API and the Bifu REST session
+"""
+import time
+import logging
+
+from octopuspy import NewOrder, OrderStatus, ORDER_STATE_CONSTANTS
+
+def quiet_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+def status(order_id: str, state: int = ORDER_STATE_CONSTANTS.NEW, side: str = 'BUY', price: str = '1',
+           qty: str = '1') -> OrderStatus:
+    return OrderStatus(order_id=order_id, client_id='', side=side, price=price, state=state, origQty=qty)
+
+def new_order(client_id: str, side: str = 'BUY', price: str = '99.9', quantity: str = '1') -> NewOrder:
+    return NewOrder(symbol='BTCUSDT', client_id=client_id, side=side, type='LIMIT', quantity=quantity,
+                    price=price, biz_type='SPOT', tif='GTX', position_side='')
+
+def okx_order(ord_id, state: str = "live", fill: str = "0", age: float = 0.0, inst_id: str = "BTC-USDT") -> dict:
+    """ age: seconds since the last update (uTime)
+    """
+    return {"instId": inst_id, "ordId": str(ord_id), "clOrdId": "", "side": "buy", "px": "1",
+            "sz": "1", "state": state, "accFillSz": fill, "uTime": str(int((time.time() - age) * 1000))}
+
+class FakeOkxTrade:
+    """ okx orders-pending (newest ordId first, 100 per page), orders-history and cancel-batch-orders;
+        the pending pages after fail_after pages fail, the cancel chunk with ordId broken raises
+    """
+    def __init__(self, orders: list = (), fail_after: int = None, broken: str = None):
+        self.pending = {item["ordId"]: item for item in orders}
+        self.history = []
+        self.fail_after = fail_after
+        self.broken = broken
+        self.calls = []         # ("pending", after, before) / ("history", after)
+        self.chunks = []        # size of every cancel-batch-orders request
+
+    def pages(self) -> list:
+        """ the after cursor of every orders-pending request
+        """
+        return [call[1] for call in self.calls if call[0] == "pending"]
+
+    def get_order_list(self, instType='', instId='', after='', before='', **kwargs):
+        self.calls.append(("pending", after, before))
+        if self.fail_after is not None and len(self.pages()) > self.fail_after:
+            return {"code": "50011", "msg": "Too Many Requests", "data": []}
+        orders = sorted(self.pending.values(), key=lambda item: -int(item["ordId"]))
+        if after:
+            orders = [item for item in orders if int(item["ordId"]) < int(after)]
+        elif before:
+            # the 100 oldest orders newer than before, newest first
+            orders = [item for item in orders if int(item["ordId"]) > int(before)][-100:]
+        return {"code": "0", "data": orders[:100]}
+
+    def get_orders_history(self, instType='', instId='', after='', **kwargs):
+        self.calls.append(("history", after))
+        orders = sorted(self.history, key=lambda item: -int(item["ordId"]))
+        if after:
+            orders = [item for item in orders if int(item["ordId"]) < int(after)]
+        return {"code": "0", "data": orders[:100]}
+
+    def cancel_multiple_orders(self, orders: list):
+        self.chunks.append(len(orders))
+        if any(item["ordId"] == self.broken for item in orders):
+            raise ConnectionError("connection reset")
+        return {"code": "0", "data": [{"ordId": item["ordId"], "sCode": "0"} for item in orders]}
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def json(self) -> dict:
+        return self.data
+
+class FakeBifuSession:
+    """ bifu getActiveOrderPage2: pages pages of one order per (symbol, status), page fail_page fails;
+        getOrderById: every id of orderIdList filled, the queries after the first fail when fail is set
+    """
+    def __init__(self, pages: int = 1, symbols: tuple = ('900',), statuses: tuple = ('OPEN',),
+                 fail_page: int = None):
+        self.pages = pages
+        self.symbols = symbols
+        self.statuses = statuses
+        self.fail_page = fail_page
+        self.fail = False
+        self.requests = []      # (params, headers) of every page request
+        self.queries = []       # ids of every getOrderById request
+
+    def get(self, url: str, params=None, headers: dict = None, timeout: int = 5):
+        if url.endswith('/getOrderById'):
+            return self._order_by_id(params)
+        self.requests.append((dict(params), headers))
+        page = params['pageNo']
+        if page == self.fail_page:
+            return FakeResponse({'code': 'TOO_MANY_REQUEST', 'data': None})
+        pairs = [(symbol_id, state) for symbol_id in self.symbols for state in self.statuses]
+        orders = [{'id': f'{page}{idx}', 'symbolId': symbol_id, 'clientOrderId': '', 'orderSide': 'SELL',
+                   'price': '2', 'size': '1', 'status': state} for idx, (symbol_id, state) in enumerate(pairs)]
+        return FakeResponse({'code': 'SUCCESS', 'data': {'dataList': orders, 'nextFlag': page < self.pages - 1}})
+
+    def _order_by_id(self, params: str):
+        ids = params.split('=')[1].split(',')
+        self.queries.append(ids)
+        if self.fail and len(self.queries) > 1:
+            return FakeResponse({'code': 'TOO_MANY_REQUESTS', 'data': None})
+        return FakeResponse({'code': 'SUCCESS', 'data': [
+            {'id': order_id, 'clientOrderId': f'c{order_id}', 'orderSide': 'SELL', 'price': '2', 'status': 'FILLED',
+             'size': '1'} for order_id in ids]})
@@ -0,0 +1,69 @@
+import unittest
+import os
+import sys
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import AmendOrder, BaseClient, ClientParams, NewOrder, OrderID, OrderStatus
+from octopuspy.trading.reconciler import QuoteReconciler
+from tests.exchange_fakes import status
+
+
+def _amend(order_id: str, price: str) -> AmendOrder:
+    return AmendOrder(order_id=order_id, client_id=f'c{order_id}', side='BUY', price=price, quantity='1',
+                      type='LIMIT', tif='GTX')
+
+class EmulatedClient(BaseClient):
+    """ no native amend, order 2 is filled before it can be cancelled
+    """
+    def __init__(self, mock: bool = False):
+        super().__init__(ClientParams('', '', '', ''), mock=mock)
+        self.placed = []
+
+    def batch_cancel(self, order_ids: list[str], symbol: str) -> list[OrderID]:
+        return [OrderID(order_id=int(order_id), client_id='') for order_id in order_ids if order_id != '2']
+
+    def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
+        self.placed.extend(orders)
+        return [OrderID(order_id=f'new{order.client_id}', client_id=order.client_id) for order in orders]
+
+class NativeClient(EmulatedClient):
+    def __init__(self):
+        super().__init__()
+        self.amended = []
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        return [status('1', price='99.5')]
+
+    def amend_orders(self, amends: list[AmendOrder], symbol: str = '') -> list[OrderID]:
+        self.amended.extend(amends)
+        return [OrderID(order_id=item.order_id, client_id=item.client_id) for item in amends]
+
+class AmendOrdersTest(unittest.TestCase):
+    def test_01_emulated_replaces_cancelled_only(self):
+        client = EmulatedClient()
+        res = client.amend_orders([_amend('1', '99.9'), _amend('2', '99.8')], 'BTCUSDT')
+        self.assertEqual(res, [OrderID(order_id='newc1', client_id='c1')])
+        self.assertEqual([(order.symbol, order.price, order.tif) for order in client.placed],
+                         [('BTCUSDT', '99.9', 'GTX')])
+        self.assertEqual(client.amend_orders([], 'BTCUSDT'), [])
+
+    def test_02_mock(self):
+        res = EmulatedClient(mock=True).amend_orders([_amend('1', '99.9')], 'BTCUSDT')
+        self.assertEqual(len(res), 2)
+
+    def test_03_reconciler_amends(self):
+        client = NativeClient()
+        desired = [NewOrder(symbol='BTCUSDT', client_id='b1', side='BUY', type='LIMIT', quantity='1',
+                            price='99.9', biz_type='SPOT', tif='GTX', position_side='')]
+        QuoteReconciler(amend=True).sync(client, desired, 'BTCUSDT')
+        self.assertEqual([(item.order_id, item.price, item.client_id) for item in client.amended],
+                         [('1', '99.9', 'b1')])
+        self.assertEqual(client.placed, [])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(AmendOrdersTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
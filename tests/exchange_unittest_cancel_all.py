@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, OrderID, OrderStatus
+from octopuspy.exchange.base_restapi import CANCEL_ALL_CHUNK
+from octopuspy.exchange.okx.spot_restapi import OkxSpotClient, BATCH_CANCEL_SIZE
+from tests.exchange_fakes import FakeOkxTrade, okx_order, quiet_logger, status
+
+LOGGER = quiet_logger('cancel_all_test')
+
+class FallbackClient(BaseClient):
+    """ no mass cancel, refuse: order ids which fail to cancel
+    """
+    def __init__(self, count: int, refuse: tuple = (), broken: str = None):
+        super().__init__(ClientParams('', '', '', ''), LOGGER)
+        self.orders = [status(str(i)) for i in range(count)]
+        self.refuse = refuse
+        self.broken = broken     # order id whose chunk raises
+        self.requests = []
+        self.threads = set()
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        return self.orders
+
+    def batch_cancel(self, order_ids: list[str], symbol: str) -> list[OrderID]:
+        self.requests.append(list(order_ids))
+        self.threads.add(threading.get_ident())
+        if self.broken in order_ids:
+            raise ConnectionError("connection reset")
+        return [OrderID(order_id=order_id, client_id='') for order_id in order_ids if order_id not in self.refuse]
+
+class SymbolClient(BaseClient):
+    """ native cancel_all of one symbol
+    """
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''))
+        self.cancelled = []
+
+    def cancel_all(self, symbol: str = None) -> bool:
+        if symbol is None:
+            return self._cancel_symbols(['ETHUSDT', 'BTCUSDT', 'ETHUSDT'])
+        self.cancelled.append(symbol)
+        return symbol != 'FAILUSDT'
+
+def _trade(count: int, broken: str = None) -> FakeOkxTrade:
+    return FakeOkxTrade([okx_order(1000 - idx) for idx in range(count)], broken=broken)
+
+class CancelAllTest(unittest.TestCase):
+    def test_01_chunked_fallback(self):
+        client = FallbackClient(2 * CANCEL_ALL_CHUNK + 5)
+        self.assertTrue(client.cancel_all('BTCUSDT'))
+        self.assertEqual(sorted(len(ids) for ids in client.requests), [5, CANCEL_ALL_CHUNK, CANCEL_ALL_CHUNK])
+        self.assertEqual(sorted(int(i) for ids in client.requests for i in ids), list(range(2 * CANCEL_ALL_CHUNK + 5)))
+
+    def test_02_partial_and_empty(self):
+        self.assertFalse(FallbackClient(3, refuse=('1',)).cancel_all('BTCUSDT'))
+        client = FallbackClient(0)
+        self.assertTrue(client.cancel_all('BTCUSDT'))
+        self.assertEqual(client.requests, [])
+        # the fallback cannot list the open orders of all symbols
+        self.assertFalse(FallbackClient(3).cancel_all(None))
+
+    def test_03_all_symbols(self):
+        client = SymbolClient()
+        self.assertTrue(client.cancel_all())
+        self.assertEqual(sorted(client.cancelled), ['BTCUSDT', 'ETHUSDT'])
+        self.assertFalse(client._cancel_symbols(['BTCUSDT', 'FAILUSDT']))
+
+    def test_04_mock(self):
+        client = BaseClient(ClientParams('', '', '', ''), mock=True)
+        self.assertTrue(client.cancel_all('BTCUSDT'))
+
+    def test_05_chunk_errors(self):
+        client = FallbackClient(2 * CANCEL_ALL_CHUNK, broken='0')
+        self.assertFalse(client.cancel_all('BTCUSDT'))
+        self.assertEqual(len(client.requests), 2)
+        okx = OkxSpotClient(ClientParams('', 'key', 'secret', 'pass'), LOGGER)
+        okx.trade_api = _trade(2 * BATCH_CANCEL_SIZE)
+        self.assertTrue(okx.cancel_all('BTC-USDT'))
+        okx.trade_api = _trade(2 * BATCH_CANCEL_SIZE, broken='1000')
+        self.assertFalse(okx.cancel_all('BTC-USDT'))
+        self.assertEqual(okx.trade_api.chunks, [BATCH_CANCEL_SIZE, BATCH_CANCEL_SIZE])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(CancelAllTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
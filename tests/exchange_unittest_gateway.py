@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import time
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, NewOrder, OrderID
+from octopuspy.trading.gateway import OrderGateway
+from tests.exchange_fakes import new_order, quiet_logger
+
+LOGGER = quiet_logger('gateway_test')
+
+class BatchClient(BaseClient):
+    """ records the batch calls, rejects client id 'bad', fails symbol 'DOWN'
+    """
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''))
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
+        with self._lock:
+            self.calls.append(('place', symbol, len(orders)))
+        if symbol == 'DOWN':
+            raise ConnectionError('timeout')
+        return [OrderID(order_id=f'9{order.client_id}', client_id=order.client_id)
+                for order in reversed(orders) if order.client_id != 'bad']
+
+    def batch_cancel(self, order_ids: list[str], symbol: str) -> list[OrderID]:
+        with self._lock:
+            self.calls.append(('cancel', symbol, len(order_ids)))
+        return [OrderID(order_id=int(order_id), client_id='') for order_id in order_ids]
+
+class OrderGatewayTest(unittest.TestCase):
+    def setUp(self):
+        self.client = BatchClient()
+
+    def test_01_coalesce_threads(self):
+        with OrderGateway(self.client, window=0.05, max_batch=100, logger=LOGGER) as gateway:
+            futures = {}
+            def worker(idx):
+                futures[idx] = gateway.place(new_order(str(idx)), 'BTCUSDT')
+            threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for idx, future in futures.items():
+                self.assertEqual(future.result(timeout=1), OrderID(order_id=f'9{idx}', client_id=str(idx)))
+        self.assertEqual(self.client.calls, [('place', 'BTCUSDT', 10)])
+
+    def test_02_max_batch_and_cancel(self):
+        with OrderGateway(self.client, window=10.0, max_batch=4, logger=LOGGER) as gateway:
+            futures = gateway.place_many([new_order(str(idx)) for idx in range(8)], 'BTCUSDT')
+            # full batches do not wait for the window
+            self.assertEqual(futures[-1].result(timeout=1).order_id, '97')
+            cancel = gateway.cancel('97', 'BTCUSDT')
+        self.assertEqual(cancel.result(timeout=1).order_id, 97)
+        self.assertEqual(sorted(self.client.calls), [('cancel', 'BTCUSDT', 1), ('place', 'BTCUSDT', 4),
+                                                     ('place', 'BTCUSDT', 4)])
+
+    def test_03_rejects_and_errors(self):
+        with OrderGateway(self.client, window=0.001, logger=LOGGER) as gateway:
+            good, bad = gateway.place(new_order('1'), 'BTCUSDT'), gateway.place(new_order('bad'), 'BTCUSDT')
+            down = gateway.place(new_order('2'), 'DOWN')
+            self.assertEqual(good.result(timeout=1).order_id, '91')
+            self.assertIsNone(bad.result(timeout=1))
+            self.assertRaises(ConnectionError, down.result, 1)
+        self.assertRaises(RuntimeError, gateway.place, new_order('3'), 'BTCUSDT')
+
+    def test_04_window_latency(self):
+        with OrderGateway(self.client, window=0.002, logger=LOGGER) as gateway:
+            start = time.monotonic()
+            gateway.place(new_order('1'), 'BTCUSDT').result(timeout=1)
+            self.assertLess(time.monotonic() - start, 0.05)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(OrderGatewayTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import ClientParams
+from octopuspy.exchange.okx.spot_restapi import OkxSpotClient
+from octopuspy.exchange.bifu.spot_restapi import BifuSpotClient
+from tests.exchange_fakes import FakeBifuSession, FakeOkxTrade, okx_order, quiet_logger
+
+LOGGER = quiet_logger('iter_open_orders_test')
+
+def _trade(count: int, fail_after: int = None) -> FakeOkxTrade:
+    return FakeOkxTrade([okx_order(1000 - idx) for idx in range(count)], fail_after=fail_after)
+
+class IterOpenOrdersTest(unittest.TestCase):
+    def setUp(self):
+        self.okx = OkxSpotClient(ClientParams('', 'key', 'secret', 'pass'), LOGGER)
+
+    def test_01_okx_all_pages(self):
+        self.okx.trade_api = _trade(250)
+        orders = self.okx.open_orders('BTC_USDT')
+        self.assertEqual(len(orders), 250)
+        self.assertEqual(len({order.order_id for order in orders}), 250)
+        self.assertEqual(self.okx.trade_api.pages(), ['', '901', '801'])
+
+    def test_02_okx_streaming(self):
+        self.okx.trade_api = _trade(250)
+        orders = self.okx.iter_open_orders('BTC-USDT')
+        self.assertEqual(next(orders).order_id, '1000')
+        # only the first page is requested so far
+        self.assertEqual(len(self.okx.trade_api.pages()), 1)
+        self.assertEqual(sum(1 for _ in orders), 249)
+
+    def test_03_okx_error_no_partial_list(self):
+        self.okx.trade_api = _trade(250, fail_after=1)
+        self.assertIsNone(self.okx.open_orders('BTC-USDT'))
+        orders = self.okx.iter_open_orders('BTC-USDT')
+        self.okx.trade_api = _trade(250, fail_after=1)
+        with self.assertRaises(RuntimeError):
+            for _ in orders:
+                pass
+
+    def test_04_bifu_signs_every_page(self):
+        client = BifuSpotClient(ClientParams('', 'key', 'secret', ''), LOGGER)
+        client.session = FakeBifuSession(3, statuses=('OPEN', 'CANCELING'))
+        signed = []
+        sign = client._sign
+        client._sign = lambda path: signed.append(path) or sign(path)
+        orders = list(client.iter_open_orders('900'))
+        self.assertEqual([order.order_id for order in orders], ['00', '10', '20'])
+        self.assertEqual(len(signed), 3)
+        self.assertEqual(len(client.session.requests), 3)
+
+    def test_05_bifu_error_no_partial_list(self):
+        client = BifuSpotClient(ClientParams('', 'key', 'secret', ''), LOGGER)
+        client.session = FakeBifuSession(3, statuses=('OPEN', 'CANCELING'), fail_page=1)
+        self.assertIsNone(client.open_orders('900'))
+        self.assertEqual(len(client.session.requests), 2)
+
+    def test_06_mock(self):
+        self.okx.mock = True
+        self.assertEqual(len(self.okx.open_orders('BTCUSDT')), 2)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(IterOpenOrdersTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, OrderStatus
+from octopuspy.exchange.base_restapi import partition_orders
+from octopuspy.exchange.binance.spot_restapi import BnSpotClient
+from octopuspy.exchange.okx.spot_restapi import OkxSpotClient
+from octopuspy.exchange.bifu.spot_restapi import BifuSpotClient
+from tests.exchange_fakes import FakeBifuSession, FakeOkxTrade, okx_order, quiet_logger, status
+
+LOGGER = quiet_logger('open_orders_many_test')
+
+class PerSymbolClient(BaseClient):
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''), LOGGER)
+        self.symbols = []
+        self.fail = set()
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        self.symbols.append(symbol)
+        return None if symbol in self.fail else [status(symbol)]
+
+class FakeSpot:
+    """ binance spot openOrders, all symbols or one
+    """
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+        self.orders = [{"symbol": symbol, "orderId": idx, "clientOrderId": "", "side": "BUY", "price": "1",
+                        "status": "NEW", "origQty": "1"} for idx, symbol in enumerate(["BTCUSDT", "ETHUSDT", "BTCUSDT"])]
+
+    def get_open_orders(self, symbol: str = None):
+        self.calls.append(symbol)
+        if self.fail:
+            raise ConnectionError("timeout")
+        return [item for item in self.orders if symbol is None or item["symbol"] == symbol]
+
+class OpenOrdersManyTest(unittest.TestCase):
+    def test_01_partition(self):
+        items = [('BTCUSDT', status('1')), ('ETHUSDT', status('2')), ('XRPUSDT', status('3'))]
+        self.assertEqual(sorted(partition_orders(items)), ['BTCUSDT', 'ETHUSDT', 'XRPUSDT'])
+        res = partition_orders(items, ['btc_usdt', 'SOL-USDT'], lambda s: s.replace('_', '').replace('-', '').upper())
+        self.assertEqual(res, {'btc_usdt': [status('1')], 'SOL-USDT': []})
+
+    def test_02_fallback(self):
+        client = PerSymbolClient()
+        res = client.open_orders_many(['A', 'B', 'C'])
+        self.assertEqual(sorted(client.symbols), ['A', 'B', 'C'])
+        self.assertEqual(res['B'], [status('B')])
+        self.assertIsNone(client.open_orders_many(None))
+        self.assertEqual(client.open_orders_many([]), {})
+
+    def test_03_binance_account_wide(self):
+        client = BnSpotClient(ClientParams('', 'key', 'secret', ''), LOGGER)
+        client.spot_client = FakeSpot()
+        symbols = ['BTCUSDT', 'ETHUSDT'] + [f'C{idx}USDT' for idx in range(20)]
+        res = client.open_orders_many(symbols)
+        self.assertEqual(client.spot_client.calls, [None])
+        self.assertEqual([item.order_id for item in res['BTCUSDT']], ['0', '2'])
+        self.assertEqual(res['C3USDT'], [])
+        # a few symbols weigh less one by one
+        client.spot_client.calls.clear()
+        res = client.open_orders_many(['ETHUSDT'])
+        self.assertEqual(client.spot_client.calls, ['ETHUSDT'])
+        self.assertEqual([item.order_id for item in res['ETHUSDT']], ['1'])
+
+    def test_04_okx_all_pages(self):
+        client = OkxSpotClient(ClientParams('', 'key', 'secret', 'pass'), LOGGER)
+        client.trade_api = FakeOkxTrade([okx_order(1000 - idx, inst_id="BTC-USDT" if idx % 2 else "ETH-USDT")
+                                         for idx in range(250)])
+        res = client.open_orders_many(['BTC_USDT', 'ETH-USDT'])
+        self.assertEqual(len(client.trade_api.pages()), 3)
+        self.assertEqual((len(res['BTC_USDT']), len(res['ETH-USDT'])), (125, 125))
+
+    def test_05_bifu_symbol_list(self):
+        client = BifuSpotClient(ClientParams('', 'key', 'secret', ''), LOGGER)
+        client.session = FakeBifuSession(2, symbols=('900', '901'))
+        res = client.open_orders_many(['900', '901', '902'])
+        self.assertEqual({symbol: len(items) for symbol, items in res.items()}, {'900': 2, '901': 2, '902': 0})
+        self.assertEqual(client.session.requests[0][0]['filterSymbolIdList'], '900,901,902')
+        self.assertEqual(len(client.session.requests), 2)
+
+    def test_06_failure_is_not_empty(self):
+        client = PerSymbolClient()
+        client.fail = {'B'}
+        self.assertIsNone(client.open_orders_many(['A', 'B', 'C']))
+        bn = BnSpotClient(ClientParams('', 'key', 'secret', ''), LOGGER)
+        bn.spot_client = FakeSpot()
+        bn.spot_client.fail = True
+        self.assertIsNone(bn.open_orders_many(None))
+        # a few symbols one by one, one of them fails
+        self.assertIsNone(bn.open_orders_many(['ETHUSDT']))
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(OpenOrdersManyTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
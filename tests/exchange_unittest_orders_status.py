@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, OrderStatus, ORDER_STATE_CONSTANTS
+from octopuspy.exchange.bifu.spot_restapi import BifuSpotClient
+from octopuspy.exchange.dolphin.spot_restapi import DolphinClient
+from tests.exchange_fakes import FakeBifuSession, quiet_logger, status
+
+LOGGER = quiet_logger('orders_status_test')
+
+class FallbackClient(BaseClient):
+    """ orders 1 and 2 are open, 3 is filled, 4 is unknown
+    """
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''), LOGGER)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        with self._lock:
+            self.calls.append('open_orders')
+        return [status('1'), status('2'), status('9')]
+
+    def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
+        with self._lock:
+            self.calls.append(order_id)
+        return [status(order_id, ORDER_STATE_CONSTANTS.FILLED)] if order_id == '3' else []
+
+class OrdersStatusTest(unittest.TestCase):
+    def test_01_fallback(self):
+        client = FallbackClient()
+        res = client.orders_status(['1', '2', 3, '4'], 'BTCUSDT')
+        self.assertEqual(sorted(res), ['1', '2', '3'])
+        self.assertEqual(res['3'].state, ORDER_STATE_CONSTANTS.FILLED)
+        # one snapshot, lookups only of the ids which are not open
+        self.assertEqual(sorted(client.calls), ['3', '4', 'open_orders'])
+        self.assertEqual(client.orders_status([], 'BTCUSDT'), {})
+
+    def test_02_bifu_multi_id(self):
+        client = BifuSpotClient(ClientParams('', 'key', 'secret', ''), LOGGER)
+        client.session = FakeBifuSession()
+        res = client.orders_status([str(i) for i in range(45)], '90000001')
+        self.assertEqual(len(res), 45)
+        self.assertEqual(res['7'].client_id, 'c7')
+        self.assertEqual(sorted(len(ids) for ids in client.session.queries), [5, 20, 20])
+
+    def test_03_dolphin_snapshot(self):
+        client = DolphinClient(ClientParams('', '', '', ''), LOGGER)
+        client.open_orders = lambda symbol: [status('1'), status('2')]
+        self.assertEqual(sorted(client.orders_status(['2', '5'], 'BTCUSDT')), ['2'])
+
+    def test_04_mock(self):
+        client = BaseClient(ClientParams('', '', '', ''), mock=True)
+        self.assertEqual(sorted(client.orders_status(['1', 2])), ['1', '2'])
+
+    def test_05_failure_is_none(self):
+        client = FallbackClient()
+        client.open_orders = lambda symbol: None
+        self.assertIsNone(client.orders_status(['1'], 'BTCUSDT'))
+        dolphin = DolphinClient(ClientParams('', '', '', ''), LOGGER)
+        dolphin.open_orders = lambda symbol: None
+        self.assertIsNone(dolphin.orders_status(['1'], 'BTCUSDT'))
+        # one failed chunk: the ids of that chunk are not taken as unknown
+        bifu = BifuSpotClient(ClientParams('', 'key', 'secret', ''), LOGGER)
+        bifu.session = FakeBifuSession()
+        bifu.session.fail = True
+        self.assertIsNone(bifu.orders_status([str(i) for i in range(45)], '90000001'))
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(OrdersStatusTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
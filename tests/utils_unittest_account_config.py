@@ -0,0 +1,105 @@
+import unittest
+import os
+import sys
+import logging
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import ClientParams, create_client
+from octopuspy.exchange.account_config import AccountConfigCache
+from octopuspy.exchange.instrument import InstrumentInfo, InstrumentRegistry
+from octopuspy.exchange.base_restapi import NewOrder
+
+class FakeOkxAccount:
+    """ okx account API: leverage per (mgnMode, instId), a set without instId is rejected like OKX does
+    """
+    def __init__(self, calls: list):
+        self.calls = calls
+        self.lever = {}
+
+    def get_leverage(self, mgnMode='', instId=''):
+        self.calls.append(("get_leverage", instId))
+        return {"code": "0", "data": [{"instId": instId, "mgnMode": mgnMode, "lever": self.lever.get(instId, "10")}]}
+
+    def set_leverage(self, lever='', mgnMode='', instId='', **kwargs):
+        self.calls.append(("set_leverage", instId, lever))
+        if not instId:
+            return {"code": "51000", "msg": "Parameter instId error", "data": []}
+        self.lever[instId] = lever
+        return {"code": "0", "data": [{"instId": instId, "lever": lever}]}
+
+class FakeOkxTrade:
+    def place_multiple_orders(self, orders):
+        return {"code": "0", "data": [{"ordId": str(idx), "clOrdId": item["clOrdId"], "sCode": "0"}
+                                      for idx, item in enumerate(orders)]}
+
+LOGGER = logging.getLogger('account_config_test')
+
+class AccountConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def tearDown(self):
+        for key in ('key_a', 'key_b'):
+            AccountConfigCache("test", key).forget()
+        AccountConfigCache("okx", "key_okx").forget()
+
+    def _apply(self, ok: bool = True):
+        def apply(value):
+            self.calls.append(value)
+            return ok
+        return apply
+
+    def test_01_skip_unchanged(self):
+        config = AccountConfigCache("test", "key_a")
+        self.assertTrue(config.ensure("posMode", "net_mode", self._apply()))
+        self.assertFalse(config.ensure("posMode", "net_mode", self._apply()))
+        # another client of the same account knows it too, another account does not
+        self.assertFalse(AccountConfigCache("test", "key_a").ensure("posMode", "net_mode", self._apply()))
+        self.assertTrue(AccountConfigCache("test", "key_b").ensure("posMode", "net_mode", self._apply()))
+        self.assertEqual(self.calls, ["net_mode", "net_mode"])
+
+    def test_02_read_current(self):
+        config = AccountConfigCache("test", "key_a")
+        self.assertFalse(config.ensure("lever", 3, self._apply(), read=lambda: "3"))
+        self.assertTrue(config.ensure("lever", 5, self._apply(), read=lambda: "3"))
+        self.assertEqual(self.calls, ["5"])
+        self.assertEqual(config.get("lever"), "5")
+
+    def test_03_failure_not_cached(self):
+        config = AccountConfigCache("test", "key_a")
+        self.assertFalse(config.ensure("lever", 2, self._apply(ok=False)))
+        self.assertIsNone(config.get("lever"))
+        self.assertTrue(config.ensure("lever", 2, self._apply()))
+
+    def test_04_bifu_ensure_leverage(self):
+        client = create_client("bifu_future", ClientParams("https://api.bifu.example", "key_a", "s", ""), LOGGER)
+        client.account_config = AccountConfigCache("test", "key_a")
+        client.set_leverage = lambda symbol, margin_mode, leverage: self.calls.append(leverage) or {'code': 'SUCCESS'}
+        self.assertTrue(client.ensure_leverage("10000009", "SHARED", 2))
+        self.assertFalse(client.ensure_leverage("10000009", "SHARED", 2))
+        self.assertTrue(client.ensure_leverage("10000009", "SHARED", 3))
+        self.assertEqual(self.calls, [2, 3])
+
+    def test_05_okx_leverage_per_instrument(self):
+        # position mode known: the client is built without requests
+        AccountConfigCache("okx", "key_okx").set("posMode", "net_mode")
+        client = create_client("okx_future", ClientParams("https://www.okx.com", "key_okx", "s", "p"), LOGGER)
+        client.account_api = FakeOkxAccount(self.calls)
+        client.trade_api = FakeOkxTrade()
+        info = InstrumentInfo(symbol='BTC-USDT-SWAP', exchange_id='', biz_type='SWAP', tick_size='0.1',
+                              step_size='1', min_size='1', max_size='', ct_val='0.01')
+        client.instruments = InstrumentRegistry(lambda: [info])
+        self.assertEqual(self.calls, [])
+        order = NewOrder('BTC-USDT-SWAP', 'c1', 'BUY', 'LIMIT', '1', '100', 'SWAP', 'GTX', '')
+        self.assertEqual(len(client.batch_make_orders([order], 'BTC-USDT-SWAP')), 1)
+        client.batch_make_orders([order._replace(client_id='c2')], 'BTC-USDT-SWAP')
+        # read once, set once, with the instId
+        self.assertEqual(self.calls, [("get_leverage", "BTC-USDT-SWAP"), ("set_leverage", "BTC-USDT-SWAP", "1")])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(AccountConfigTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,175 @@
+import unittest
+import os
+import sys
+import time
+import queue
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy.utils.cache_util import LocalCache, MISS
+from octopuspy.utils import db_util
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.messages = queue.Queue()
+        self.patterns = []
+        self.channels = []
+
+    def subscribe(self, *channels):
+        self.channels.extend(channels)
+        self.server.listeners.append(self)
+
+    def psubscribe(self, *patterns):
+        self.patterns.extend(pattern.rstrip('*') for pattern in patterns)
+        self.server.listeners.append(self)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if self in self.server.listeners:
+            self.server.listeners.remove(self)
+
+class FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.calls = []
+
+    def publish(self, channel, message):
+        self.calls.append((channel, message))
+
+    def execute(self):
+        return [self.server.publish(channel, message) for channel, message in self.calls]
+
+class FakeRedis:
+    """ one redis server shared by the "processes" of a test: get/set, pub/sub, keyspace events
+    """
+    def __init__(self):
+        self.values = {}
+        self.gets = 0
+        self.listeners = []
+
+    def get(self, key):
+        self.gets += 1
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = str(value)
+        for pubsub in list(self.listeners):
+            for prefix in pubsub.patterns:
+                pubsub.messages.put({"type": "pmessage", "channel": f"{prefix}{key}", "data": "set"})
+
+    def publish(self, channel, message):
+        for pubsub in list(self.listeners):
+            if channel in pubsub.channels:
+                pubsub.messages.put({"type": "message", "channel": channel, "data": message})
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def pubsub(self, **kwargs):
+        return FakePubSub(self)
+
+class LocalCacheTest(unittest.TestCase):
+    def test_01_lru_eviction(self):
+        cache = LocalCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)    # a is now most recently used
+        cache.set("c", 3)
+        self.assertIs(cache.get("b"), MISS)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_02_ttl(self):
+        cache = LocalCache(max_size=8, ttl=60)
+        cache.set("short", "x", ttl=0.01)
+        cache.set("none", None)
+        time.sleep(0.02)
+        self.assertIs(cache.get("short"), MISS)
+        self.assertIsNone(cache.get("none"))    # cached missing key is a hit
+
+    def test_03_invalidate(self):
+        cache = LocalCache()
+        cache.set("k", 1.0)
+        cache.pop("k")
+        self.assertIs(cache.get("k"), MISS)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+class DbLocalCacheTest(unittest.TestCase):
+    """ db_util local tier on a fake server, other processes write to the server directly
+    """
+    def setUp(self):
+        self.server = FakeRedis()
+        self.conn = db_util._conn
+        db_util._conn = self.server
+
+    def tearDown(self):
+        db_util.disable_local_cache()
+        db_util._conn = self.conn
+
+    def _wait_listening(self, count: int = 1):
+        deadline = time.time() + 2
+        while len(self.server.listeners) != count and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.server.listeners), count)
+
+    def _wait_evicted(self, key: str, value: float):
+        deadline = time.time() + 2
+        while db_util.get_float(key) != value and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(db_util.get_float(key), value)
+
+    def test_01_read_through(self):
+        self.server.values["px"] = "1.5"
+        db_util.enable_local_cache(ttl=60)
+        self.assertEqual(db_util.get_float("px"), 1.5)
+        self.assertEqual(db_util.get_float("px"), 1.5)
+        self.assertIsNone(db_util.get_int("missing"))
+        self.assertIsNone(db_util.get_int("missing"))
+        self.assertEqual(self.server.gets, 2)
+        # own writes evict at once
+        db_util.set_float("px", 2.5)
+        self.assertEqual(db_util.get_float("px"), 2.5)
+
+    def test_02_invalidation_across_clients(self):
+        self.server.values["px"] = "1.5"
+        db_util.enable_local_cache(ttl=60)
+        self._wait_listening()
+        self.assertEqual(db_util.get_float("px"), 1.5)
+        # another process writes and publishes the key
+        self.server.values["px"] = "3.0"
+        self.server.publish(db_util.INVALIDATE_CHANNEL, "px")
+        self._wait_evicted("px", 3.0)
+
+    def test_03_restart_with_new_parameters(self):
+        db_util.enable_local_cache(ttl=60, channel="first")
+        self._wait_listening()
+        thread = db_util._listener[0]
+        db_util.enable_local_cache(ttl=60, keyspace=True)
+        self.assertFalse(thread.is_alive())
+        self._wait_listening()
+        self.assertEqual(self.server.listeners[0].patterns, ["__keyspace@0__:"])
+        self.server.values["px"] = "1.0"
+        self.assertEqual(db_util.get_float("px"), 1.0)
+        # written outside octopuspy: only the keyspace event tells
+        self.server.set("px", 4.0)
+        self._wait_evicted("px", 4.0)
+        thread = db_util._listener[0]
+        db_util.disable_local_cache()
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.server.listeners, [])
+
+if __name__ == "__main__":
+    for case in (LocalCacheTest, DbLocalCacheTest):
+        suite = unittest.TestLoader().loadTestsFromTestCase(case)
+        runner = unittest.TextTestRunner(verbosity=1)
+        runner.run(suite)
@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+from collections import OrderedDict, defaultdict
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from octopuspy.utils import codec_util
+from octopuspy.exchange.base_restapi import AskBid, OrderStatus, Ticker, ORDER_STATE_CONSTANTS
+
+VALUE = {
+    "top": AskBid(ap='69987.11', aq='1.01', bp='69986.11', bq='0.99'),
+    "orders": [OrderStatus(order_id="1", client_id="c1", side='BUY', price='1.0',
+                           state=ORDER_STATE_CONSTANTS.NEW, origQty='1.0')],
+    "last": Ticker(s='BTCUSDT', p='69987.11', q='1.00'),
+    "pos": 1.5,
+    "ids": ("a", "b"),
+}
+
+class CodecUtilTest(unittest.TestCase):
+    def _round_trip(self, codec):
+        data = codec_util.pack(VALUE, codec)
+        self.assertTrue(data.startswith(codec))
+        res = codec_util.unpack(data)
+        self.assertIsInstance(res["top"], AskBid)
+        self.assertIsInstance(res["orders"][0], OrderStatus)
+        self.assertEqual(res["top"], VALUE["top"])
+        self.assertEqual(res["orders"], VALUE["orders"])
+        self.assertEqual(res["last"], VALUE["last"])
+        self.assertEqual(res["pos"], 1.5)
+        self.assertEqual(list(res["ids"]), ["a", "b"])
+
+    def test_01_json(self):
+        self._round_trip(codec_util.JSON)
+
+    @unittest.skipIf(codec_util.msgpack is None, "msgpack is not installed")
+    def test_02_msgpack(self):
+        self._round_trip(codec_util.MSGPACK)
+        self.assertLess(len(codec_util.pack(VALUE, codec_util.MSGPACK)),
+                        len(codec_util.pack(VALUE, codec_util.JSON)))
+
+    def _plain_types(self, codec):
+        counts = defaultdict(int, {'a': np.int64(3)})
+        value = {'book': OrderedDict([('bid', np.float64(1.5)), ('ask', np.float32(2.5))]), 'counts': counts,
+                 'ids': {1: 'one', 2: 'two'}, 'arr': np.array([1, 2]),
+                 'top': AskBid(ap=np.float64(2.0), aq='1', bp='1', bq='1')}
+        res = codec_util.unpack(codec_util.pack(value, codec))
+        self.assertEqual(res['book'], {'bid': 1.5, 'ask': 2.5})
+        self.assertEqual(res['counts'], {'a': 3})
+        # int keys stay int with both codecs
+        self.assertEqual(res['ids'], {1: 'one', 2: 'two'})
+        self.assertEqual(res['arr'], [1, 2])
+        self.assertEqual(res['top'], AskBid(ap=2.0, aq='1', bp='1', bq='1'))
+
+    @unittest.skipIf(codec_util.msgpack is None or np is None, "msgpack or numpy is not installed")
+    def test_04_msgpack_plain_types(self):
+        self._plain_types(codec_util.MSGPACK)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_05_json_plain_types(self):
+        self._plain_types(codec_util.JSON)
+
+    def test_03_none_and_unknown(self):
+        self.assertIsNone(codec_util.unpack(None))
+        with self.assertRaises(ValueError):
+            codec_util.unpack(b'X{}')
+        with self.assertRaises(ValueError):
+            codec_util.register(1, Ticker)
+
+    def _tuple_keys(self, codec):
+        value = {'pos': {('okx', 'BTC-USDT'): 1.5, ('bn', ('BTC', 'USDT')): [1, 2]}, 'n': {1: 'one'}}
+        res = codec_util.unpack(codec_util.pack(value, codec))
+        self.assertEqual(res, value)
+        self.assertIsInstance(list(res['pos'])[1][1], tuple)
+
+    def test_06_tuple_keys(self):
+        self._tuple_keys(codec_util.JSON)
+        if codec_util.msgpack is not None:
+            self._tuple_keys(codec_util.MSGPACK)
+        with self.assertRaises(ValueError):
+            codec_util.register(127, Ticker)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(CodecUtilTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,51 @@
+import unittest
+import os
+import sys
+import logging
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import ClientParams, create_clients
+from octopuspy.exchange import conn_pool
+
+LOGGER = logging.getLogger('conn_pool_test')
+
+def _accounts(base_url: str, count: int = 3) -> list:
+    return [ClientParams(base_url, f'key{idx}', f'secret{idx}', f'pass{idx}') for idx in range(count)]
+
+class ConnPoolTest(unittest.TestCase):
+    def tearDown(self):
+        conn_pool.close()
+
+    def test_01_requests_clients(self):
+        clients = create_clients('bifu_spot', _accounts('https://api.bifu.example'), LOGGER)
+        url = 'https://api.bifu.example/api/v1/ticker'
+        adapters = {id(client.session.get_adapter(url)) for client in clients}
+        self.assertEqual(len(adapters), 1)
+        self.assertEqual(len({id(client.session) for client in clients}), 3)
+        # another host gets its own pool
+        other = create_clients('bifu_spot', _accounts('https://other.example', 1), LOGGER)[0]
+        self.assertIsNot(other.session.get_adapter('https://other.example/x'),
+                         clients[0].session.get_adapter(url))
+        self.assertEqual(conn_pool.stats()['requests'], 2)
+
+    def test_02_binance_keys_stay_per_account(self):
+        clients = create_clients('binance_umfuture', _accounts(''), LOGGER)
+        url = clients[0].future_client.base_url + '/fapi/v1/ticker/price'
+        self.assertEqual(len({id(client.future_client.session.get_adapter(url)) for client in clients}), 1)
+        self.assertEqual([client.future_client.session.headers['X-MBX-APIKEY'] for client in clients],
+                         ['key0', 'key1', 'key2'])
+
+    def test_03_okx_transport(self):
+        clients = create_clients('okx_spot', _accounts('https://www.okx.com'), LOGGER)
+        transports = {id(api._transport) for client in clients
+                      for api in (client.market_data_api, client.account_api, client.trade_api)}
+        self.assertEqual(len(transports), 1)
+        self.assertEqual([client.trade_api.API_KEY for client in clients], ['key0', 'key1', 'key2'])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(ConnPoolTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,183 @@
+import unittest
+import os
+import sys
+import asyncio
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+import redis
+
+from octopuspy.utils import db_util, async_db_util
+
+class FakePipeline:
+    """ commands are queued and sent to the server in one round trip by execute
+    """
+    def __init__(self, server):
+        self.server = server
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        self.server.round_trips += 1
+        return [getattr(self.server, name)(*args, _pipelined=True, **kwargs) for name, args, kwargs in self.calls]
+
+class FakeRedis:
+    """ string and hash commands of a decoding client, counting round trips
+    """
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.round_trips = 0
+
+    def _trip(self, pipelined: bool):
+        if not pipelined:
+            self.round_trips += 1
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def get(self, key, _pipelined=False):
+        self._trip(_pipelined)
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, _pipelined=False):
+        self._trip(_pipelined)
+        self.values[key] = str(value)
+        return True
+
+    def mget(self, keys, _pipelined=False):
+        self._trip(_pipelined)
+        return [self.values.get(key) for key in keys]
+
+    def mset(self, mapping, _pipelined=False):
+        self._trip(_pipelined)
+        self.values.update({key: str(value) for key, value in mapping.items()})
+        return True
+
+    def hgetall(self, key, _pipelined=False):
+        self._trip(_pipelined)
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key, mapping=None, _pipelined=False):
+        self._trip(_pipelined)
+        self.hashes.setdefault(key, {}).update({field: str(value) for field, value in mapping.items()})
+        return len(mapping)
+
+class AsyncPipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self):
+        return FakePipeline.execute(self)
+
+class AsyncFakeRedis:
+    """ asyncio face of FakeRedis
+    """
+    def __init__(self, server: FakeRedis):
+        self.server = server
+
+    def pipeline(self, transaction=False):
+        return AsyncPipeline(self.server)
+
+    def __getattr__(self, name):
+        method = getattr(self.server, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+class DbBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRedis()
+        self.conns = (db_util._conn, async_db_util._conn)
+        db_util._conn = self.server
+        async_db_util._conn = AsyncFakeRedis(self.server)
+
+    def tearDown(self):
+        db_util._conn, async_db_util._conn = self.conns
+
+    def test_01_get_set_many(self):
+        db_util.set_many({"a": 1.5, "b": {"x": 1}})
+        self.assertEqual(db_util.get_many(["a", "b", "c"]), ["1.5", '{"x": 1}', None])
+        self.assertEqual(db_util.get_many(["a", "c"], cast=float), [1.5, None])
+        self.assertEqual(self.server.round_trips, 3)
+        # with expiry: one pipeline
+        db_util.set_many({"d": 1, "e": 2}, ex=10)
+        self.assertEqual(self.server.round_trips, 4)
+        self.assertEqual(db_util.get_many([]), [])
+        self.assertEqual(self.server.round_trips, 4)
+
+    def test_02_hash_many(self):
+        db_util.hset_many({"h1": {"px": 1}, "h2": {"px": 2}, "h3": {}})
+        self.assertEqual(self.server.round_trips, 1)
+        self.assertEqual(db_util.hget_many(["h1", "h2", "h3"]), [{"px": "1"}, {"px": "2"}, {}])
+        self.assertEqual(self.server.round_trips, 2)
+        db_util.hset_many({"h4": {}})
+        self.assertEqual(db_util.hget_many([]), [])
+        self.assertEqual(self.server.round_trips, 2)
+
+    def test_03_async_same_api(self):
+        async def run():
+            await async_db_util.set_many({"a": 2, "b": [1, 2]}, ex=5)
+            many = await async_db_util.get_many(["a", "b", "c"], cast=str)
+            await async_db_util.hset_many({"h1": {"qty": 3}, "h2": {}})
+            hashes = await async_db_util.hget_many(["h1", "h2"])
+            number = await async_db_util.get_int("a")
+            return many, hashes, number
+        many, hashes, number = asyncio.run(run())
+        self.assertEqual(many, ["2", "[1, 2]", None])
+        self.assertEqual(hashes, [{"qty": "3"}, {}])
+        self.assertEqual(number, 2)
+        # set_many, get_many, hset_many, hget_many, get_int
+        self.assertEqual(self.server.round_trips, 5)
+        for name in ("get_int", "get_float", "set_float", "get_dict", "set_dict", "get_many", "set_many",
+                     "hget_dict", "hset_dict", "hget_many", "hset_many"):
+            self.assertTrue(hasattr(async_db_util, name), name)
+
+class DbConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.config = dict(db_util.REDIS_CONFIG)
+        # nothing listens on port 1, connecting is refused at once
+        db_util.configure(port=1)
+
+    def tearDown(self):
+        db_util.configure(**self.config)
+
+    def test_01_unavailable_is_builtin_connection_error(self):
+        with self.assertRaises(ConnectionError) as ctx:
+            db_util.RDB().get("a")
+        self.assertIsInstance(ctx.exception, redis.ConnectionError)
+        self.assertFalse(db_util.ping())
+
+        async def run():
+            try:
+                await async_db_util.get_int("a")
+            finally:
+                await async_db_util.close()
+        with self.assertRaises(ConnectionError) as ctx:
+            asyncio.run(run())
+        self.assertIsInstance(ctx.exception, redis.ConnectionError)
+
+    def test_02_async_follows_configure(self):
+        async def run():
+            ports = [async_db_util.get_conn().connection_pool.connection_kwargs["port"],
+                     async_db_util.BDB().connection_pool.connection_kwargs["port"]]
+            db_util.configure(port=2)
+            ports += [async_db_util.get_conn().connection_pool.connection_kwargs["port"],
+                      async_db_util.BDB().connection_pool.connection_kwargs["port"]]
+            await async_db_util.close()
+            return ports
+        self.assertEqual(asyncio.run(run()), [1, 1, 2, 2])
+        self.assertEqual(db_util.pool.connection_kwargs["port"], 2)
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=1)
+    for case in (DbBatchTest, DbConfigTest):
+        runner.run(unittest.TestLoader().loadTestsFromTestCase(case))
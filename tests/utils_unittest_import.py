@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+import json
+import subprocess
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# exchange SDKs and http stacks a bare `import octopuspy` must not load
+HEAVY_MODULES = ('okx', 'binance', 'httpx', 'requests', 'pydantic')
+# generous bound for slow CI hosts, the eager import used to take several hundred ms
+IMPORT_TIME_LIMIT = 0.15
+
+def _run(code: str) -> dict:
+    """ run code in a fresh interpreter, it prints a json result
+    """
+    out = subprocess.run([sys.executable, '-c', code], cwd=PKG_DIR, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+class LazyImportTest(unittest.TestCase):
+    def test_01_import_time(self):
+        res = _run("import sys, time, json\n"
+                   "start = time.perf_counter()\n"
+                   "import octopuspy\n"
+                   "cost = time.perf_counter() - start\n"
+                   "print(json.dumps({'cost': cost, 'modules': sorted(m.split('.')[0] for m in sys.modules)}))")
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, res['modules'])
+        self.assertLess(res['cost'], IMPORT_TIME_LIMIT)
+
+    def test_02_create_client_loads_one_exchange(self):
+        res = _run("import sys, json, logging\n"
+                   "from octopuspy import ClientParams, create_client\n"
+                   "client = create_client('bifu_spot', ClientParams('https://api.example.com', 'k', 's', ''),\n"
+                   "                       logging.getLogger('test'))\n"
+                   "print(json.dumps({'cls': type(client).__name__, 'modules': sorted(sys.modules)}))")
+        self.assertEqual(res['cls'], 'BifuSpotClient')
+        self.assertIn('octopuspy.exchange.bifu.spot_restapi', res['modules'])
+        for module in ('okx', 'binance', 'octopuspy.exchange.okx.spot_restapi'):
+            self.assertNotIn(module, res['modules'])
+
+    def test_03_lazy_attribute(self):
+        res = _run("import sys, json, octopuspy\n"
+                   "before = 'octopuspy.exchange.bifu.future_restapi' in sys.modules\n"
+                   "cls = octopuspy.BifuFutureClient\n"
+                   "print(json.dumps({'before': before, 'cls': cls.__name__,\n"
+                   "                  'after': 'octopuspy.exchange.bifu.future_restapi' in sys.modules}))")
+        self.assertEqual(res, {'before': False, 'cls': 'BifuFutureClient', 'after': True})
+
+    def test_04_unknown_client(self):
+        if PKG_DIR not in sys.path:
+            sys.path.insert(0, PKG_DIR)
+        import octopuspy
+        with self.assertRaises(ValueError):
+            octopuspy.load_client_class('no_such_exchange')
+        with self.assertRaises(AttributeError):
+            getattr(octopuspy, 'NoSuchClient')
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(LazyImportTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
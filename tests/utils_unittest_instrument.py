@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+import time
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy.exchange import instrument
+from octopuspy.exchange.instrument import (
+    InstrumentRegistry, get_registry, bifu_instruments, binance_instruments, okx_instruments
+)
+
+BIFU_META = {'code': 'SUCCESS', 'data': {
+    'contractList': [{'contractId': '10000001', 'contractName': 'BTC/USDT', 'tickSize': '0.01', 'stepSize': '0.001',
+                      'minOrderSize': '0.002', 'maxOrderSize': '90', 'takerFeeRate': '0.0005', 'makerFeeRate': '0.0002'}],
+    'symbolList': [{'symbolId': '90000001', 'symbolName': 'BTC-USDT', 'tickSize': '0.1', 'stepSize': '0.001',
+                    'minOrderSize': '0.001', 'maxOrderSize': '100', 'takerFeeRate': '0.0005', 'makerFeeRate': '0.0002'},
+                   {'symbolId': '90000003', 'symbolName': 'PEPE-USDT', 'tickSize': '0.00000001', 'stepSize': '1',
+                    'minOrderSize': '5000000', 'maxOrderSize': '5000000000'}]}}
+
+BINANCE_INFO = {'symbols': [{'symbol': 'BTCUSDT', 'filters': [
+    {'filterType': 'PRICE_FILTER', 'minPrice': '0.01', 'maxPrice': '1000000', 'tickSize': '0.01'},
+    {'filterType': 'LOT_SIZE', 'minQty': '0.00001', 'maxQty': '9000', 'stepSize': '0.00001'}]}]}
+
+OKX_INSTRUMENTS = {'code': '0', 'data': [{'instId': 'BTC-USDT-SWAP', 'instType': 'SWAP', 'tickSz': '0.1',
+                                          'lotSz': '0.01', 'minSz': '0.01', 'maxLmtSz': '100000', 'ctVal': '0.01'}]}
+
+class InstrumentRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.loads = 0
+
+    def _loader(self, res: dict, **kwargs):
+        def loader():
+            self.loads += 1
+            return bifu_instruments(res, **kwargs)
+        return loader
+
+    def test_01_lookup(self):
+        registry = InstrumentRegistry(self._loader(BIFU_META))
+        info = registry.get("BTC-USDT")
+        self.assertEqual((info.exchange_id, info.tick_size, info.step_size), ('90000001', '0.1', '0.001'))
+        self.assertIs(registry.get("BTCUSDT"), info)
+        self.assertIs(registry.get("btc_usdt"), info)
+        self.assertIs(registry.get("90000001"), info)
+        self.assertIs(registry.by_id("90000001"), info)
+        self.assertEqual(registry.symbols(), ['BTC-USDT', 'PEPE-USDT'])
+        self.assertEqual(self.loads, 1)     # one bulk request for all lookups
+
+    def test_02_contract_and_other_exchanges(self):
+        registry = InstrumentRegistry(self._loader(BIFU_META, contract=True))
+        self.assertEqual(registry.get("10000001").symbol, 'BTC/USDT')
+        btc = binance_instruments(BINANCE_INFO)[0]
+        self.assertEqual((btc.tick_size, btc.step_size, btc.min_size, btc.max_size),
+                         ('0.01', '0.00001', '0.00001', '9000'))
+        swap = okx_instruments(OKX_INSTRUMENTS)[0]
+        self.assertEqual((swap.symbol, swap.ct_val, swap.step_size), ('BTC-USDT-SWAP', '0.01', '0.01'))
+
+    def test_03_ttl_and_failure(self):
+        registry = InstrumentRegistry(self._loader(BIFU_META), ttl=0)
+        self.assertIsNotNone(registry.get("BTC-USDT"))
+        registry._tried_at = 0.0    # skip the retry interval
+        registry.loader = lambda: []
+        # a failed reload keeps the known instruments
+        self.assertIsNotNone(registry.get("BTC-USDT"))
+        registry._loading.join()
+        self.assertIsNone(registry.get("ETH-USDT"))
+
+    def test_04_background_loads(self):
+        release = threading.Event()
+        def slow_loader():
+            release.wait(5)
+            return bifu_instruments(BIFU_META)
+        # the first load starts with the registry, a lookup waits for it
+        registry = get_registry(("test", "slow", "spot"), slow_loader, ttl=0)
+        self.assertTrue(registry._loading.is_alive())
+        threading.Timer(0.1, release.set).start()
+        self.assertIsNotNone(registry.get("BTC-USDT"))
+        # expired: the reload runs in the background, lookups keep the known instruments
+        release.clear()
+        registry._tried_at = 0.0
+        started = time.monotonic()
+        self.assertIsNotNone(registry.get("BTC-USDT"))
+        self.assertIsNone(registry.get("ETH-USDT"))
+        self.assertLess(time.monotonic() - started, 0.5)
+        release.set()
+        registry._loading.join()
+        del instrument._registries[("test", "slow", "spot")]
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(InstrumentRegistryTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,176 @@
+import unittest
+import os
+import sys
+import time
+import signal
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, OrderStatus
+from octopuspy.trading import kill_switch
+from octopuspy.trading.kill_switch import KillSwitch
+from octopuspy.utils import db_util
+from tests.exchange_fakes import quiet_logger, status
+
+LOGGER = quiet_logger('kill_switch_test')
+
+class VenueClient(BaseClient):
+    """ failures: cancel_all calls that fail before it works, delay: seconds per cancel_all
+    """
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        super().__init__(ClientParams('', '', '', ''))
+        self.failures = failures
+        self.delay = delay
+        self.resting = {'BTCUSDT': 3, 'ETHUSDT': 2}
+        self.unknown = False
+        self.calls = []
+
+    def cancel_all(self, symbol: str = None) -> bool:
+        self.calls.append(symbol)
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('timeout')
+        for key in ([symbol] if symbol else list(self.resting)):
+            self.resting[key] = 0
+        return True
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        if self.unknown:
+            return None     # query failed
+        return [status(str(i)) for i in range(self.resting.get(symbol, 0))]
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value):
+        self.values[key] = value
+
+class KillSwitchTest(unittest.TestCase):
+    def test_01_all_venues_flat(self):
+        good, flaky, unscoped = VenueClient(), VenueClient(failures=2), VenueClient()
+        switch = KillSwitch({'good': good, 'flaky': flaky, 'all': unscoped},
+                            symbols={'good': ['BTCUSDT', 'ETHUSDT'], 'flaky': ['BTCUSDT']},
+                            deadline=2.0, retry_interval=0.01, logger=LOGGER)
+        report = switch.fire('test')
+        self.assertTrue(report.ok)
+        self.assertEqual(sorted(good.calls), ['BTCUSDT', 'ETHUSDT'])
+        self.assertEqual((report.venues['flaky'].attempts, report.venues['flaky'].open_orders), (3, 0))
+        self.assertEqual(unscoped.calls, [None])
+        self.assertEqual(report.venues['all'].open_orders, -1)
+        self.assertIs(switch.last_report, report)
+
+    def test_02_deadline(self):
+        switch = KillSwitch({'slow': VenueClient(delay=1.0), 'down': VenueClient(failures=1000), 'good': VenueClient()},
+                            symbols={'slow': ['BTCUSDT'], 'down': ['BTCUSDT'], 'good': ['BTCUSDT']},
+                            deadline=0.3, retry_interval=0.05, logger=LOGGER)
+        start = time.monotonic()
+        report = switch.fire('test')
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(report.ok)
+        self.assertTrue(report.venues['good'].ok)
+        self.assertEqual(report.venues['slow'].error, 'BTCUSDT: deadline')
+        self.assertIn('timeout', report.venues['down'].error)
+        self.assertGreater(report.venues['down'].attempts, 1)
+
+    def test_03_signal(self):
+        client = VenueClient()
+        switch = KillSwitch({'venue': client}, symbols={'venue': ['BTCUSDT']}, logger=LOGGER)
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            switch.install_signal(signal.SIGUSR1)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            for _ in range(100):
+                if switch.last_report:
+                    break
+                time.sleep(0.01)
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+        self.assertTrue(switch.last_report.ok)
+        self.assertEqual(client.calls, ['BTCUSDT'])
+
+    def test_04_concurrent_fire_joins(self):
+        client = VenueClient(delay=0.2)
+        switch = KillSwitch({'venue': client}, symbols={'venue': ['BTCUSDT']}, deadline=1.0, logger=LOGGER)
+        reports = []
+        threads = [threading.Thread(target=lambda: reports.append(switch.fire('test'))) for _ in range(3)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+        # one cancel round, the other calls got the same report without queueing behind it
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(client.calls, ['BTCUSDT'])
+        self.assertEqual(len({id(report) for report in reports}), 1)
+        self.assertTrue(reports[0].ok)
+
+    def test_05_unknown_open_orders_not_flat(self):
+        client = VenueClient()
+        client.unknown = True
+        switch = KillSwitch({'venue': client}, symbols={'venue': ['BTCUSDT']}, deadline=0.2,
+                            retry_interval=0.05, logger=LOGGER)
+        report = switch.fire('test')
+        self.assertFalse(report.ok)
+        self.assertEqual(report.venues['venue'].open_orders, -1)
+        self.assertEqual(report.venues['venue'].error, 'BTCUSDT: open orders unknown')
+
+    def test_06_redis_key_fires_once(self):
+        conn, db_util._conn = db_util._conn, FakeRedis()
+        switches = []
+        try:
+            def watch(client):
+                switch = KillSwitch({'venue': client}, symbols={'venue': ['BTCUSDT']}, logger=LOGGER)
+                switch.watch_redis(interval=0.01)
+                switches.append(switch)
+                time.sleep(0.1)
+                return switch
+            # a key set before the start fires once and is acknowledged
+            db_util._conn.set(kill_switch.KILL_KEY, 'old')
+            first = VenueClient()
+            watch(first)
+            self.assertEqual(first.calls, ['BTCUSDT'])
+            switches[-1].stop()
+            # restarted: the acknowledged key does not fire again, a new trigger does
+            second = VenueClient()
+            watch(second)
+            self.assertEqual(second.calls, [])
+            kill_switch.trigger('again')
+            time.sleep(0.1)
+            self.assertEqual(second.calls, ['BTCUSDT'])
+            self.assertIn('again', switches[-1].last_report.reason)
+        finally:
+            for switch in switches:
+                switch.stop()
+            time.sleep(0.05)
+            db_util._conn = conn
+
+    def test_07_joined_fire_times_out(self):
+        client = VenueClient()
+        switch = KillSwitch({'venue': client}, symbols={'venue': ['BTCUSDT']}, deadline=0.1, logger=LOGGER)
+        switch.fire('first')
+        # a fire() stuck past the deadline: the joined call does not return the previous report
+        switch._firing = threading.Event()
+        report = switch.fire('joined')
+        self.assertIsNot(report, switch.last_report)
+        self.assertFalse(report.ok)
+        self.assertEqual(report.reason, 'joined')
+        self.assertEqual(report.venues['venue'].error, 'still firing')
+        self.assertEqual(report.venues['venue'].open_orders, -1)
+        self.assertEqual(client.calls, ['BTCUSDT'])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(KillSwitchTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
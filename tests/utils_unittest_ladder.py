@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import time
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+import numpy as np
+
+from octopuspy.exchange.instrument import InstrumentInfo
+from octopuspy.trading.ladder import LadderBuilder, size_curve
+
+def _info(symbol: str, tick: str, step: str, ct_val: str = '1', min_size: str = '') -> InstrumentInfo:
+    return InstrumentInfo(symbol=symbol, exchange_id='', biz_type='', tick_size=tick, step_size=step,
+                          min_size=min_size, max_size='', ct_val=ct_val)
+
+class LadderTest(unittest.TestCase):
+    def test_01_prices_and_sizes(self):
+        builder = LadderBuilder.from_instruments([_info('BTC-USDT', '0.1', '0.001')], levels=3,
+                                                 spread=0.001, step=0.001, sizes=[0.01, 0.02, 0.03])
+        orders = builder.build([100000.0])['BTC-USDT']
+        self.assertEqual([(o.side, o.price, o.quantity) for o in orders],
+                         [('BUY', '99950.0', '0.010'), ('BUY', '99850.0', '0.020'), ('BUY', '99750.0', '0.030'),
+                          ('SELL', '100050.0', '0.010'), ('SELL', '100150.0', '0.020'), ('SELL', '100250.0', '0.030')])
+        self.assertEqual(len({o.client_id for o in orders}), 6)
+
+    def test_02_skew_snap_and_contracts(self):
+        # 1 contract = 0.01 BTC, lot 1 contract, min 2 contracts
+        builder = LadderBuilder.from_instruments([_info('BTC-USDT-SWAP', '0.1', '1', '0.01', '2')], levels=2,
+                                                 spread=0.0002, step=0.0001, sizes=[0.03, 0.05])
+        ladder = builder.compute([70000.03], skews=[0.5])
+        orders = builder.orders(ladder, 'BTC-USDT-SWAP')
+        # long inventory: quotes shifted down, bid sizes halved (level 0: 1 lot, dropped), asks grown
+        self.assertEqual([(o.side, o.price, o.quantity) for o in orders],
+                         [('BUY', '69982.5', '0.02'), ('SELL', '70003.6', '0.04'), ('SELL', '70010.6', '0.07')])
+
+    def test_03_client_ids_and_min_size(self):
+        # builders created in the same millisecond never share a client id
+        builders = [LadderBuilder.from_instruments([_info('BTC-USDT', '0.1', '0.01', min_size='0.015')], levels=2,
+                                                   spread=0.001, step=0.001, sizes=[0.01, 0.02])
+                    for _ in range(2)]
+        orders = [order for builder in builders for order in builder.build([100000.0])['BTC-USDT']]
+        self.assertEqual(len({o.client_id for o in orders}), len(orders))
+        self.assertTrue(all(o.client_id.isdigit() for o in orders))
+        # min size 0.015 is 2 lots of 0.01: the 0.01 level is not quoted
+        self.assertEqual(builders[0].min_lots.tolist(), [[2]])
+        self.assertEqual([o.quantity for o in orders[:len(orders) // 2]], ['0.02', '0.02'])
+
+    def test_04_benchmark(self):
+        symbols, levels = 50, 100
+        builder = LadderBuilder([f'S{idx}' for idx in range(symbols)], ['0.01'] * symbols, ['0.001'] * symbols,
+                                levels=levels, spread=0.001, step=0.0002, sizes=size_curve(levels, 0.01, 1.02))
+        mids = np.linspace(10, 1000, symbols)
+        skews = np.linspace(-0.5, 0.5, symbols)
+        # the 1 ms budget is compute() only
+        best = min(self._timed(builder.compute, mids, skews) for _ in range(20))
+        self.assertLess(best, 0.001)
+        # orders() of one symbol, 200 NewOrder built in python
+        ladder = builder.compute(mids, skews)
+        best = min(self._timed(builder.orders, ladder, 'S0') for _ in range(20))
+        self.assertLess(best, 0.005)
+
+    @staticmethod
+    def _timed(func, *args) -> float:
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(LadderTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+import logging
+import tempfile
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy.utils import log_util
+
+class LogUtilTest(unittest.TestCase):
+    def setUp(self):
+        self.proj_dir = tempfile.mkdtemp()
+
+    def _read(self, log_file):
+        with open(os.path.join(self.proj_dir, 'log', log_file)) as f:
+            return f.read()
+
+    def test_01_async_logger(self):
+        logger = log_util.create_logger(self.proj_dir, "async.log", "async_test", 1,
+                                        level='INFO', async_mode=True)
+        self.assertIsInstance(logger.handlers[-1], logging.handlers.QueueHandler)
+        logger.debug("dropped by level gate")
+        logger.info("order placed %s", 42)
+        log_util.stop_listeners()
+        content = self._read("async.log")
+        self.assertIn("order placed 42", content)
+        self.assertNotIn("dropped by level gate", content)
+
+    def test_02_rate_limit(self):
+        logger = log_util.create_logger(self.proj_dir, "limited.log", "limited_test", 1,
+                                        rate_limit=log_util.RateLimitFilter(interval=60, burst=2))
+        for i in range(10):
+            logger.error("request failed: %s", i)
+        logger.error("another error")
+        for handler in logger.handlers:
+            handler.flush()
+        content = self._read("limited.log")
+        self.assertEqual(content.count("request failed"), 2)
+        self.assertIn("another error", content)
+
+    def test_03_sampled(self):
+        limiter = log_util.RateLimitFilter(interval=60, burst=1, sample=4)
+        passed = [limiter.filter(logging.makeLogRecord({"msg": "tick %s", "levelno": logging.ERROR}))
+                  for _ in range(9)]
+        self.assertEqual(passed, [True, False, False, False, True, False, False, False, True])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(LogUtilTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+import urllib.request
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy.utils import metrics_util
+from octopuspy.exchange.base_restapi import BaseClient, ClientParams, NewOrder
+
+class MockClient(BaseClient):
+    """ exchange clients are BaseClient subclasses without __slots__ """
+
+class MetricsUtilTest(unittest.TestCase):
+    def test_01_exposition(self):
+        registry = metrics_util.MetricsRegistry()
+        counter = registry.counter("test_total", "test counter", ("venue",))
+        hist = registry.histogram("test_seconds", "test histogram", ("venue",), buckets=(0.1, 1.0))
+        counter.inc("okx")
+        counter.inc("okx", value=2)
+        hist.observe("okx", value=0.05)
+        hist.observe("okx", value=5)
+        text = registry.expose()
+        self.assertIn('test_total{venue="okx"} 3', text)
+        self.assertIn('test_seconds_bucket{venue="okx",le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{venue="okx",le="+Inf"} 2', text)
+        self.assertIn('test_seconds_count{venue="okx"} 2', text)
+        with self.assertRaises(ValueError):
+            registry.counter("test_total", "duplicated")
+
+    def test_02_instrument_client(self):
+        client = MockClient(ClientParams("", "", "", ""), mock=True)
+        metrics_util.instrument_client(client, "mock")
+        orders = [NewOrder("BTCUSDT", f"c{i}", "BUY", "LIMIT", "1", "1", "SPOT", "GTX", "") for i in range(3)]
+        client.batch_make_orders(orders, "BTCUSDT")
+        client.open_orders("BTCUSDT")
+        self.assertEqual(metrics_util.ORDERS.get("mock", "BTCUSDT", "placed"), 2)
+        self.assertEqual(metrics_util.ORDERS.get("mock", "BTCUSDT", "rejected"), 1)
+        self.assertEqual(metrics_util.OPEN_ORDERS.get("mock", "BTCUSDT"), 2)
+        self.assertEqual(metrics_util.REQUEST_LATENCY.get("mock", "open_orders")[0], 1)
+
+    def test_03_empty_result_is_ok(self):
+        client = MockClient(ClientParams("", "", "", ""), mock=True)
+        client.open_orders = lambda symbol: []
+        client.cancel_order = lambda order_id, symbol: None
+        metrics_util.instrument_client(client, "empty")
+        self.assertEqual(client.open_orders("BTCUSDT"), [])
+        client.cancel_order("1", "BTCUSDT")
+        self.assertEqual(metrics_util.REQUESTS.get("empty", "open_orders", "ok"), 1)
+        self.assertEqual(metrics_util.REQUESTS.get("empty", "open_orders", "error"), 0)
+        self.assertEqual(metrics_util.REQUESTS.get("empty", "cancel_order", "error"), 1)
+        self.assertEqual(metrics_util.OPEN_ORDERS.get("empty", "BTCUSDT"), 0)
+
+    def test_04_rate_limit_headers(self):
+        import requests
+        import httpx
+        client = MockClient(ClientParams("", "", "", ""), mock=True)
+        client.session = requests.Session()
+        client.sdk = httpx.Client()
+        metrics_util.instrument_client(client, "limits", limits={"x-mbx-used-weight-1m": 2400})
+        # instrumenting twice adds no second hook
+        metrics_util.instrument_client(client, "limits")
+        self.assertEqual(len(client.session.hooks["response"]), 1)
+        response = requests.Response()
+        response.headers.update({"X-MBX-USED-WEIGHT-1M": "400", "X-MBX-ORDER-COUNT-10S": "3"})
+        for hook in client.session.hooks["response"]:
+            hook(response)
+        self.assertEqual(metrics_util.RATE_LIMIT_USED.get("limits", "used-weight-1m"), 400)
+        self.assertEqual(metrics_util.RATE_LIMIT_REMAINING.get("limits", "used-weight-1m"), 2000)
+        self.assertEqual(metrics_util.RATE_LIMIT_USED.get("limits", "order-count-10s"), 3)
+        for hook in client.sdk.event_hooks["response"]:
+            hook(httpx.Response(200, headers={"X-RateLimit-Remaining": "17"}))
+        self.assertEqual(metrics_util.RATE_LIMIT_REMAINING.get("limits", "default"), 17)
+        client.sdk.close()
+
+    def test_05_http_server(self):
+        server = metrics_util.start_http_server(0, "127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=2) as res:
+                self.assertEqual(res.status, 200)
+                self.assertIn(b"octopuspy_requests_total", res.read())
+        finally:
+            server.shutdown()
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(MetricsUtilTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
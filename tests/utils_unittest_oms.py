@@ -0,0 +1,115 @@
+import unittest
+import os
+import sys
+import time
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, ORDER_STATE_CONSTANTS
+from octopuspy.trading.oms import OrderManager, PENDING
+from tests.exchange_fakes import new_order
+
+
+class AckClient(BaseClient):
+    """ acks every order except client id 'bad', cancels every id
+    """
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''))
+
+    def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
+        return [OrderID(order_id=f'9{order.client_id}', client_id=order.client_id)
+                for order in orders if order.client_id != 'bad']
+
+    def batch_cancel(self, order_ids: list[str], symbol: str) -> list[OrderID]:
+        return [OrderID(order_id=order_id, client_id='') for order_id in order_ids]
+
+class OrderManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.oms = OrderManager()
+        self.client = AckClient()
+
+    def test_01_place_and_index(self):
+        self.oms.submit([new_order('1', 'BUY', '99.9')], 'BTCUSDT')
+        self.assertEqual(self.oms.get('1').state, PENDING)
+        self.oms.place(self.client, [new_order('2', 'BUY', '99.90'), new_order('bad', 'BUY', '99.9'), new_order('3', 'SELL', '100.1')],
+                       'BTCUSDT')
+        self.assertEqual(self.oms.by_order_id('92').client_id, '2')
+        self.assertEqual(self.oms.get('bad').state, ORDER_STATE_CONSTANTS.REJECTED)
+        self.assertEqual(sorted(order.client_id for order in self.oms.at_price('BTCUSDT', 'buy', '99.9')), ['1', '2'])
+        self.assertEqual(self.oms.prices('BTCUSDT', 'SELL'), [100.1])
+        self.assertEqual(len(self.oms.live_orders('BTCUSDT')), 3)
+
+    def test_02_fills_and_cancel(self):
+        self.oms.place(self.client, [new_order('1', 'BUY', '99.9', '2'), new_order('2', 'BUY', '99.8')], 'BTCUSDT')
+        order = self.oms.update(order_id='91', filled='0.5')
+        self.assertEqual((order.state, order.remaining), (ORDER_STATE_CONSTANTS.PARTIALLY_FILLED, 1.5))
+        # late NEW and smaller fill of a reordered stream are ignored
+        self.oms.update(order_id='91', state=ORDER_STATE_CONSTANTS.NEW, filled='0.2')
+        self.assertEqual((order.state, order.filled), (ORDER_STATE_CONSTANTS.PARTIALLY_FILLED, 0.5))
+        self.oms.update(client_id='1', filled='2')
+        self.assertEqual(order.state, ORDER_STATE_CONSTANTS.FILLED)
+        self.assertEqual(self.oms.at_price('BTCUSDT', 'BUY', '99.9'), [])
+        self.oms.cancel(self.client, ['92'], 'BTCUSDT')
+        self.assertEqual(self.oms.get('2').state, ORDER_STATE_CONSTANTS.CANCELED)
+        self.assertEqual(self.oms.live_orders(), [])
+        self.assertEqual(self.oms.purge(max_age=-1), 2)
+        self.assertIsNone(self.oms.by_order_id('91'))
+
+    def test_03_status_and_amend(self):
+        self.oms.apply_status([OrderStatus(order_id='77', client_id='', side='SELL', price='101', state=0, origQty='3')],
+                              'BTCUSDT')
+        self.assertEqual(self.oms.at_price('BTCUSDT', 'SELL', '101')[0].order_id, '77')
+        self.oms.update(order_id='77', price='100.5')
+        self.assertEqual(self.oms.at_price('BTCUSDT', 'SELL', '101'), [])
+        self.assertEqual(len(self.oms.at_price('BTCUSDT', 'SELL', 100.5)), 1)
+        self.assertIsNone(self.oms.update(order_id='unknown', state=ORDER_STATE_CONSTANTS.FILLED))
+
+    def test_04_concurrent_reads(self):
+        # readers see whole levels while another thread places and cancels at the same prices
+        errors, stop = [], threading.Event()
+
+        def write():
+            idx = 0
+            while not stop.is_set():
+                ids = [f'{idx}-{level}' for level in range(20)]
+                self.oms.place(self.client, [new_order(client_id, 'BUY', str(100 - int(client_id.split('-')[1]) % 3))
+                                             for client_id in ids], 'BTCUSDT')
+                self.oms.cancel(self.client, [f'9{client_id}' for client_id in ids], 'BTCUSDT')
+                idx += 1
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            reads, until = 0, time.monotonic() + 0.2
+            while time.monotonic() < until:
+                try:
+                    for price in self.oms.prices('BTCUSDT', 'BUY'):
+                        for order in self.oms.at_price('BTCUSDT', 'BUY', price):
+                            self.assertEqual(order.price, price)
+                            reads += 1
+                except Exception as e:
+                    errors.append(e)
+        finally:
+            stop.set()
+            writer.join()
+        self.assertEqual(errors, [])
+        self.assertGreater(reads, 0)
+
+    def test_05_contract_sizes(self):
+        # OKX SWAP: 0.03 BTC submitted, reported as 3 contracts of 0.01 BTC
+        self.oms.place(self.client, [new_order('1', 'BUY', '99.9', '0.03')], 'BTC-USDT-SWAP')
+        self.oms.update(order_id='91', filled='0.01')
+        self.oms.apply_status([OrderStatus(order_id='91', client_id='1', side='BUY', price='99.9',
+                                           state=ORDER_STATE_CONSTANTS.PARTIALLY_FILLED, origQty='3')],
+                              'BTC-USDT-SWAP', ct_val=0.01)
+        order = self.oms.get('1')
+        self.assertAlmostEqual(order.quantity, 0.03)
+        self.assertAlmostEqual(order.remaining, 0.02)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(OrderManagerTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
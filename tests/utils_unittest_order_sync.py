@@ -0,0 +1,167 @@
+import unittest
+import os
+import sys
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, OrderStatus, ORDER_STATE_CONSTANTS
+from octopuspy.exchange.okx import spot_restapi
+from octopuspy.exchange.okx.spot_restapi import OkxSpotClient
+from octopuspy.trading.order_sync import OpenOrderSync
+from octopuspy.trading.oms import OrderManager, CLOSED
+from tests.exchange_fakes import FakeOkxTrade, okx_order, quiet_logger, status
+
+LOGGER = quiet_logger('order_sync_test')
+
+class SnapshotClient(BaseClient):
+    """ client without change queries, open_orders returns self.orders,
+        order_status the orders of self.closed
+    """
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''), LOGGER)
+        self.orders = []
+        self.closed = {}
+        self.calls = 0
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        self.calls += 1
+        return list(self.orders)
+
+    def order_status(self, order_id: str, symbol: str = '') -> list[OrderStatus]:
+        return [self.closed[order_id]] if order_id in self.closed else []
+
+class OrderSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.okx = OkxSpotClient(ClientParams('', 'key', 'secret', 'pass'), LOGGER)
+        self.trade = self.okx.trade_api = FakeOkxTrade()
+
+    def test_01_okx_full_then_incremental(self):
+        for ord_id in (10, 11, 12):
+            self.trade.pending[str(ord_id)] = okx_order(ord_id)
+        sync = OpenOrderSync(self.okx, 'BTC-USDT', full_interval=60, logger=LOGGER)
+        res = sync.sync()
+        self.assertTrue(res.full)
+        self.assertEqual(sorted(item.order_id for item in res.added), ['10', '11', '12'])
+        self.assertEqual((sync.cursor["ord_id"], sync.cursor["oldest"]), ('12', '10'))
+
+        # 13 and 14 placed, 11 (created before the cursor) cancelled now; 9 closed long ago, 5 is older
+        # than every open order: the history is not read beyond it
+        self.trade.pending['13'] = okx_order(13)
+        self.trade.pending['14'] = okx_order(14)
+        self.trade.history = [okx_order(11, "canceled"), okx_order(9, "filled", age=600)] + \
+                             [okx_order(ord_id, "canceled", age=600) for ord_id in range(5, -200, -1)]
+        del self.trade.pending['11']
+        self.trade.calls.clear()
+        res = sync.sync()
+        self.assertFalse(res.full)
+        self.assertEqual(sorted(item.order_id for item in res.added), ['13', '14'])
+        self.assertEqual([(item.order_id, item.state) for item in res.removed],
+                         [('11', ORDER_STATE_CONSTANTS.CANCELED)])
+        self.assertEqual(sorted(sync.orders), ['10', '12', '13', '14'])
+        self.assertEqual(self.trade.calls, [("pending", '', '12'), ("history", '')])
+        self.assertEqual((sync.cursor["ord_id"], sync.cursor["oldest"]), ('14', '10'))
+
+    def test_02_okx_many_new_orders(self):
+        self.trade.pending['1'] = okx_order(1)
+        sync = OpenOrderSync(self.okx, 'BTC-USDT', logger=LOGGER)
+        sync.sync()
+        for ord_id in range(2, 252):
+            self.trade.pending[str(ord_id)] = okx_order(ord_id)
+        self.trade.calls.clear()
+        res = sync.sync()
+        self.assertEqual(len(res.added), 250)
+        self.assertEqual([call[2] for call in self.trade.calls if call[0] == "pending"], ['1', '101', '201'])
+        self.assertEqual(len(sync.orders), 251)
+
+    def test_03_okx_error_keeps_state(self):
+        self.trade.pending['5'] = okx_order(5)
+        sync = OpenOrderSync(self.okx, 'BTC-USDT', logger=LOGGER)
+        sync.sync()
+        cursor = sync.cursor
+        self.trade.fail_after = 0
+        res = sync.sync()
+        self.assertEqual((res.added, res.removed), ([], []))
+        self.assertEqual(sync.cursor, cursor)
+        self.assertEqual(list(sync.orders), ['5'])
+
+    def test_04_long_history_full_snapshot(self):
+        self.trade.pending['1000'] = okx_order(1000)
+        sync = OpenOrderSync(self.okx, 'BTC-USDT', logger=LOGGER)
+        sync.sync()
+        self.trade.history = [okx_order(ord_id, "canceled") for ord_id in range(1001, 2001)]
+        self.trade.calls.clear()
+        res = sync.sync()
+        self.assertTrue(res.full)
+        self.assertEqual(len([call for call in self.trade.calls if call[0] == "history"]),
+                         spot_restapi.SYNC_HISTORY_PAGES)
+        self.assertEqual(list(sync.orders), ['1000'])
+
+    def test_05_failed_full_snapshot_keeps_state(self):
+        for ord_id in range(1, 151):
+            self.trade.pending[str(ord_id)] = okx_order(ord_id)
+        sync = OpenOrderSync(self.okx, 'BTC-USDT', full_interval=0, logger=LOGGER)
+        sync.sync()
+        # the second page fails: the orders of that page must not be removed
+        calls = len(self.trade.calls)
+        get_order_list = self.trade.get_order_list
+        def fail_second_page(**kwargs):
+            if len(self.trade.calls) > calls:
+                self.trade.fail_after = 0
+            return get_order_list(**kwargs)
+        self.trade.get_order_list = fail_second_page
+        res = sync.sync()
+        self.assertEqual(res.removed, [])
+        self.assertEqual(len(sync.orders), 150)
+
+    def test_06_periodic_full(self):
+        self.trade.pending['5'] = okx_order(5)
+        sync = OpenOrderSync(self.okx, 'BTC-USDT', full_interval=0, logger=LOGGER)
+        sync.sync()
+        # drift: 5 closed and missing from the history window
+        del self.trade.pending['5']
+        res = sync.sync()
+        self.assertTrue(res.full)
+        self.assertEqual([(item.order_id, item.state) for item in res.removed], [('5', CLOSED)])
+        self.assertEqual(sync.orders, {})
+
+    def test_07_snapshot_client(self):
+        client = SnapshotClient()
+        client.orders = [status('1'), status('2')]
+        sync = OpenOrderSync(client, 'BTCUSDT', logger=LOGGER)
+        sync.sync()
+        client.orders = [status('2', ORDER_STATE_CONSTANTS.PARTIALLY_FILLED), status('3')]
+        client.closed['1'] = status('1', ORDER_STATE_CONSTANTS.FILLED)
+        res = sync.sync()
+        self.assertTrue(res.full)
+        self.assertEqual([item.order_id for item in res.added], ['3'])
+        self.assertEqual([item.order_id for item in res.changed], ['2'])
+        # how the missing order ended: one more open_orders and its order_status
+        self.assertEqual([(item.order_id, item.state) for item in res.removed], [('1', ORDER_STATE_CONSTANTS.FILLED)])
+        self.assertEqual(sorted(sync.orders), ['2', '3'])
+        self.assertEqual(client.calls, 3)
+
+    def test_08_removed_orders_end_in_oms(self):
+        client = SnapshotClient()
+        client.orders = [status('1'), status('2'), status('3')]
+        oms = OrderManager()
+        sync = OpenOrderSync(client, 'BTCUSDT', full_interval=0, logger=LOGGER)
+        oms.apply_status(sync.sync().added, 'BTCUSDT')
+        self.assertEqual(len(oms.live_orders('BTCUSDT')), 3)
+        # 1 cancelled and found by order_status, 2 unknown to the exchange
+        client.orders = [status('3')]
+        client.closed['1'] = status('1', ORDER_STATE_CONSTANTS.CANCELED)
+        res = sync.sync()
+        oms.apply_status(res.added + res.changed + res.removed, 'BTCUSDT')
+        self.assertEqual([order.order_id for order in oms.live_orders('BTCUSDT')], ['3'])
+        self.assertEqual(oms.by_order_id('1').state, ORDER_STATE_CONSTANTS.CANCELED)
+        self.assertEqual(oms.by_order_id('2').state, CLOSED)
+        # the outcome of a CLOSED order may still be learned later
+        oms.apply_status([status('2', ORDER_STATE_CONSTANTS.FILLED)], 'BTCUSDT')
+        self.assertEqual(oms.by_order_id('2').state, ORDER_STATE_CONSTANTS.FILLED)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(OrderSyncTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import logging
+import numpy as np
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import NewOrder
+from octopuspy.exchange.instrument import InstrumentInfo
+from octopuspy.exchange.quantizer import Quantizer, quantizer_for, wire_orders
+
+SWAP = InstrumentInfo(symbol='BTC-USDT-SWAP', exchange_id='', biz_type='SWAP', tick_size='0.1', step_size='0.01',
+                      min_size='0.01', max_size='100', ct_val='0.01')
+
+def _order(side: str, price, quantity) -> NewOrder:
+    return NewOrder(symbol='BTC-USDT-SWAP', client_id='c1', side=side, type='LIMIT', quantity=quantity,
+                    price=price, biz_type='FUTURE', tif='GTX', position_side='')
+
+class QuantizerTest(unittest.TestCase):
+    def test_01_exact_strings(self):
+        quantizer = Quantizer("0.01", "0.001")
+        self.assertEqual(quantizer.price(0.1 + 0.2), "0.30")      # no float noise
+        self.assertEqual(quantizer.price("100.005", "BUY"), "100.00")
+        self.assertEqual(quantizer.price("100.001", "SELL"), "100.01")
+        self.assertEqual(quantizer.qty(0.0029999), "0.002")
+        self.assertEqual(quantizer.price("0.07"), "0.07")
+        self.assertEqual(Quantizer("0.00000001", "1").price(1e-08), "0.00000001")
+        self.assertEqual(Quantizer("5", "1").price(12, "BUY"), "10")
+
+    def test_02_contracts(self):
+        quantizer = quantizer_for(SWAP)
+        self.assertIs(quantizer_for(SWAP), quantizer)
+        # 0.3 BTC / ctVal 0.01 = 30 contracts
+        self.assertEqual(quantizer.qty(0.3), "30.00")
+        # 5 BTC is 500 contracts, above the max size of 100: not capped, it does not fit
+        self.assertEqual(quantizer.qty_lots(5), 50000)
+        self.assertFalse(quantizer.fits(50000))
+        self.assertTrue(quantizer.fits(10000))
+
+    def test_03_ladder(self):
+        orders = [_order('BUY', 69999.96, 0.3), _order('SELL', '70000.01', 0.00001), _order('SELL', 70000.01, 0.02)]
+        wired = wire_orders(SWAP, orders)
+        self.assertEqual([(price, quantity) for _, price, quantity in wired],
+                         [('69999.9', '30.00'), ('70000.1', '2.00')])   # below min size dropped
+        self.assertEqual(quantizer_for(SWAP).quantize_orders(orders[:1])[0].price, '69999.9')
+        # unknown instrument keeps the values
+        self.assertEqual(wire_orders(None, orders[:1])[0][1:], (69999.96, 0.3))
+
+    def test_04_size_limits_logged(self):
+        logger = logging.getLogger('quantizer_test')
+        logger.propagate = False
+        orders = [_order('BUY', 69999.96, 0.3), _order('BUY', 69999.9, 5), _order('SELL', 70000.1, 0.00001)]
+        with self.assertLogs(logger, level='ERROR') as logs:
+            wired = wire_orders(SWAP, orders, logger)
+        # the 5 BTC order is not resized to the max size, it is dropped like the one below the min size
+        self.assertEqual([quantity for _, _, quantity in wired], ['30.00'])
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('quantity 5 outside the size limits (1-10000 lots of 0.0001)', logs.output[0])
+
+    def test_05_numpy_values(self):
+        quantizer = Quantizer("0.01", "0.001")
+        self.assertEqual(quantizer.price(np.float64(0.1) + np.float64(0.2)), "0.30")
+        self.assertEqual(quantizer.price(np.float32(100.5), "BUY"), "100.50")
+        self.assertEqual(quantizer.qty(np.float64(0.0029999)), "0.002")
+        self.assertEqual(quantizer.qty(np.int64(3)), "3.000")
+        # ladder prices and sizes straight from NumPy arrays
+        prices, sizes = np.array([69999.96, 70000.01]), np.array([0.3, 0.02])
+        orders = [_order('BUY', prices[0], sizes[0]), _order('SELL', prices[1], sizes[1])]
+        self.assertEqual([(price, quantity) for _, price, quantity in wire_orders(SWAP, orders)],
+                         [('69999.9', '30.00'), ('70000.1', '2.00')])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(QuantizerTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
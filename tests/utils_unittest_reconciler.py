@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, NewOrder, OrderID, OrderStatus, ORDER_STATE_CONSTANTS
+from octopuspy.exchange.instrument import InstrumentInfo, InstrumentRegistry
+from octopuspy.trading.reconciler import QuoteReconciler
+from tests.exchange_fakes import new_order, quiet_logger, status
+
+
+LOGGER = quiet_logger('reconciler_test')
+
+class RecordClient(BaseClient):
+    """ records the requests instead of sending them
+    """
+    def __init__(self, current: list):
+        super().__init__(ClientParams('', '', '', ''))
+        self.current = current
+        self.cancelled = []
+        self.placed = []
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        return self.current
+
+    def batch_cancel(self, order_ids: list[str], symbol: str) -> list[OrderID]:
+        self.cancelled.extend(order_ids)
+        return [OrderID(order_id=order_id, client_id='') for order_id in order_ids]
+
+    def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
+        self.placed.extend(orders)
+        return [OrderID(order_id='', client_id=order.client_id) for order in orders]
+
+class QuoteReconcilerTest(unittest.TestCase):
+    def setUp(self):
+        self.desired = [new_order('BUY99.9', 'BUY', '99.9', '1'), new_order('BUY99.8', 'BUY', '99.8', '1'), new_order('SELL100.1', 'SELL', '100.1', '1')]
+
+    def test_01_minimal_changes(self):
+        current = [status('1', side='BUY', price='99.9', qty='1'),       # kept
+                   status('2', side='BUY', price='99.5', qty='1'),       # too far: cancel, 99.8 placed
+                   status('3', side='SELL', price='100.12', qty='1.05'),  # within tolerance: kept
+                   status('4', ORDER_STATE_CONSTANTS.FILLED, 'SELL', '100.3', '1')]
+        client = RecordClient(current)
+        plan = QuoteReconciler(price_tol=0.05, size_tol=0.1).sync(client, self.desired, 'BTCUSDT')
+        self.assertEqual([order.order_id for order in plan.keeps], ['1', '3'])
+        self.assertEqual(client.cancelled, ['2'])
+        self.assertEqual([(order.side, order.price) for order in client.placed], [('BUY', '99.8')])
+
+    def test_02_size_change_and_amend(self):
+        current = [status('1', side='BUY', price='99.9', qty='3'), status('2', side='SELL', price='100.1', qty='1')]
+        plan = QuoteReconciler(price_tol=0.05, size_tol=0.1, amend=True).diff(self.desired, current)
+        self.assertEqual([order.order_id for order in plan.keeps], ['2'])
+        self.assertEqual([(order.order_id, new.price) for order, new in plan.amends], [('1', '99.9')])
+        self.assertEqual([order.price for order in plan.places], ['99.8'])
+        self.assertEqual(plan.cancels, [])
+
+    def test_03_nothing_to_do(self):
+        client = RecordClient([status('1', side='BUY', price='99.9', qty='1'), status('2', side='BUY', price='99.8', qty='1'),
+                               status('3', side='SELL', price='100.1', qty='1')])
+        QuoteReconciler().sync(client, self.desired, 'BTCUSDT')
+        self.assertEqual((client.cancelled, client.placed), ([], []))
+
+    def test_04_open_orders_failed(self):
+        # open_orders error: nothing is placed again
+        client = RecordClient(None)
+        plan = QuoteReconciler(logger=LOGGER).sync(client, self.desired, 'BTCUSDT')
+        self.assertEqual((client.cancelled, client.placed), ([], []))
+        self.assertEqual(plan.places, [])
+
+    def test_05_okx_swap_contracts(self):
+        # OKX SWAP sizes are contracts of 0.01 BTC: 100 contracts open are the 1 BTC desired
+        info = InstrumentInfo(symbol='BTC-USDT-SWAP', exchange_id='', biz_type='SWAP', tick_size='0.1',
+                              step_size='1', min_size='1', max_size='', ct_val='0.01')
+        client = RecordClient([status('1', side='BUY', price='99.9', qty='100'), status('2', side='BUY', price='99.8', qty='100'),
+                               status('3', side='SELL', price='100.1', qty='1')])
+        client.instruments = InstrumentRegistry(lambda: [info])
+        plan = QuoteReconciler(size_tol=0.1, logger=LOGGER).sync(client, self.desired, 'BTC-USDT-SWAP')
+        self.assertEqual([order.order_id for order in plan.keeps], ['1', '2'])
+        # 1 contract is 0.01 BTC, not the 1 BTC desired
+        self.assertEqual(client.cancelled, ['3'])
+        self.assertEqual(QuoteReconciler.ct_val(RecordClient([]), 'BTCUSDT'), 1.0)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(QuoteReconcilerTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,271 @@
+import unittest
+import os
+import sys
+import asyncio
+import logging
+from collections import deque
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy.exchange.base_restapi import AskBid
+from octopuspy.marketdata.redis_bus import (MarketDataPublisher, MarketDataSubscriber, ASKBID, DEPTH,
+                                            PUBSUB, STREAM)
+
+LOGGER = logging.getLogger('redis_bus_test')
+LOGGER.addHandler(logging.NullHandler())
+LOGGER.propagate = False
+
+class FakePubSub:
+    """ redis-py PubSub of FakeRedis: confirmations and messages in one queue
+    """
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = deque()
+        self.channels = []
+
+    def subscribe(self, *channels):
+        for channel in channels:
+            self.channels.append(channel)
+            self.redis.subscribers.setdefault(channel, []).append(self)
+            self.queue.append({'type': 'subscribe', 'channel': channel.encode(), 'data': len(self.channels)})
+        if self.redis.on_subscribe:
+            self.redis.on_subscribe()
+
+    def get_message(self, timeout=0.0):
+        return self.queue.popleft() if self.queue else None
+
+    def listen(self):
+        # ends when nothing is left instead of blocking
+        while self.queue:
+            yield self.queue.popleft()
+
+    def close(self):
+        for channel in self.channels:
+            self.redis.subscribers[channel].remove(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+class FakeRedis:
+    """ the commands of the market data bus, in memory
+    """
+    def __init__(self):
+        self.values = {}
+        self.streams = {}
+        self.subscribers = {}
+        self.on_mget = None
+        self.on_subscribe = None
+        self.on_xread = None
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        if self.on_mget:
+            self.on_mget()
+        return [self.values.get(key) for key in keys]
+
+    def publish(self, channel, payload):
+        for pubsub in self.subscribers.get(channel, []):
+            pubsub.queue.append({'type': 'message', 'channel': channel.encode(), 'data': payload})
+
+    def pubsub(self, **kwargs):
+        return FakePubSub(self)
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        entries = self.streams.setdefault(stream, [])
+        entry_id = f"{len(entries) + 1}-0".encode()
+        entries.append((entry_id, {key.encode(): value for key, value in fields.items()}))
+        return entry_id
+
+    def xrevrange(self, stream, count=None):
+        return list(reversed(self.streams.get(stream, [])))[:count]
+
+    def xread(self, streams, block=None):
+        res = []
+        for stream, last in streams.items():
+            last = int((last.decode() if isinstance(last, bytes) else last).split('-')[0]) if last != '$' else None
+            entries = [entry for entry in self.streams.get(stream, [])
+                       if last is not None and int(entry[0].decode().split('-')[0]) > last]
+            if entries:
+                res.append((stream.encode(), entries))
+        if self.on_xread:
+            self.on_xread()
+        return res
+
+class AsyncFakePipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self):
+        return FakePipeline.execute(self)
+
+class AsyncFakeRedis:
+    """ asyncio face of FakeRedis
+    """
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+
+    def pipeline(self, transaction=False):
+        return AsyncFakePipeline(self.redis)
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+def _askbid(bp: str) -> AskBid:
+    return AskBid(ap=str(float(bp) + 1), aq='1', bp=bp, bq='1')
+
+class RedisBusTest(unittest.TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+    def test_01_pubsub_round_trip(self):
+        publisher = MarketDataPublisher(PUBSUB, conn=self.redis, logger=LOGGER)
+        subscriber = MarketDataSubscriber(['BTCUSDT'], kinds=(ASKBID,), from_latest=False, conn=self.redis)
+        publisher.publish_askbid('BTCUSDT', _askbid('99'))
+        def publish():
+            publisher.publish_askbid('BTCUSDT', _askbid('100'))
+            publisher.publish_askbid('ETHUSDT', _askbid('10'))
+            publisher.publish_askbid('BTCUSDT', _askbid('101'))
+        self.redis.on_subscribe = publish
+        res = list(subscriber.listen())
+        # only what was published after the subscription, of the subscribed symbols, in order
+        self.assertEqual([(md.kind, md.symbol, md.data.bp) for md in res],
+                         [(ASKBID, 'BTCUSDT', '100'), (ASKBID, 'BTCUSDT', '101')])
+        self.assertEqual(self.redis.subscribers['md:askbid:BTCUSDT'], [])
+
+    def test_02_latest_snapshot(self):
+        publisher = MarketDataPublisher(PUBSUB, conn=self.redis, logger=LOGGER)
+        subscriber = MarketDataSubscriber(['BTCUSDT', 'ETHUSDT'], kinds=(ASKBID,), conn=self.redis)
+        self.assertIsNone(subscriber.latest(ASKBID, 'BTCUSDT'))
+        publisher.publish_askbid('BTCUSDT', _askbid('100'))
+        publisher.publish_askbid('BTCUSDT', _askbid('101'))
+        md = subscriber.latest(ASKBID, 'BTCUSDT')
+        self.assertEqual((md.kind, md.symbol, md.data), (ASKBID, 'BTCUSDT', _askbid('101')))
+        # late joiner: the latest value of each symbol, only those published
+        self.assertEqual([item.data for item in subscriber.listen()], [_askbid('101')])
+
+    def test_03_subscribe_race(self):
+        publisher = MarketDataPublisher(PUBSUB, conn=self.redis, logger=LOGGER)
+        publisher.publish_askbid('BTCUSDT', _askbid('100'))
+        subscriber = MarketDataSubscriber(['BTCUSDT'], kinds=(ASKBID,), conn=self.redis)
+        # published after the subscription and before the latest value is read: received twice,
+        # by the channel and in the latest value, yielded once
+        self.redis.on_mget = lambda: publisher.publish_askbid('BTCUSDT', _askbid('101'))
+        listen = subscriber.listen()
+        first = next(listen)
+        self.redis.on_mget = None
+        # published after the latest value was read: received by the channel
+        publisher.publish_askbid('BTCUSDT', _askbid('102'))
+        res = [first] + list(listen)
+        self.assertEqual([md.data.bp for md in res], ['101', '102'])
+
+    def test_04_stream_from_latest(self):
+        publisher = MarketDataPublisher(STREAM, conn=self.redis, logger=LOGGER)
+        publisher.publish_askbid('BTCUSDT', _askbid('100'))
+        publisher.publish_askbid('BTCUSDT', _askbid('101'))
+        subscriber = MarketDataSubscriber(['BTCUSDT'], kinds=(ASKBID,), mode=STREAM, conn=self.redis)
+        listen = subscriber.listen()
+        self.assertEqual(next(listen).data.bp, '101')
+        # published before the first XREAD, still read
+        publisher.publish_askbid('BTCUSDT', _askbid('102'))
+        self.assertEqual(next(listen).data.bp, '102')
+
+    def test_05_depth_snapshot_channel(self):
+        publisher = MarketDataPublisher(PUBSUB, conn=self.redis, logger=LOGGER)
+        subscriber = MarketDataSubscriber(['BTCUSDT'], kinds=(ASKBID, DEPTH), conn=self.redis)
+        callback = publisher.ws_depth_callback('BTCUSDT')
+        asyncio.run(callback({'data': [{'asks': [['101', '2'], ['102', '1']], 'bids': [['100', '3']]}]}))
+        depth = subscriber.latest(DEPTH, 'BTCUSDT').data
+        self.assertEqual(depth, {'asks': [['101', '2'], ['102', '1']], 'bids': [['100', '3']]})
+        self.assertEqual(subscriber.latest(ASKBID, 'BTCUSDT').data, AskBid(ap='101', aq='2', bp='100', bq='3'))
+
+    def test_06_depth_diffs(self):
+        publisher = MarketDataPublisher(PUBSUB, conn=self.redis, logger=LOGGER)
+        subscriber = MarketDataSubscriber(['BTCUSDT'], kinds=(ASKBID, DEPTH), conn=self.redis)
+        # without a snapshot a diff is never published as the book
+        asyncio.run(publisher.ws_depth_callback('BTCUSDT')(
+            {'e': 'depthUpdate', 'U': 1, 'u': 1, 'a': [['105', '1']], 'b': []}))
+        self.assertIsNone(subscriber.latest(DEPTH, 'BTCUSDT'))
+
+        snapshots = []
+        def snapshot():
+            snapshots.append(1)
+            return {'lastUpdateId': 10, 'asks': [['101', '2'], ['102', '1']], 'bids': [['100', '3'], ['99', '1']]}
+        callback = publisher.ws_depth_callback('BTCUSDT', snapshot)
+        # already in the snapshot
+        asyncio.run(callback({'e': 'depthUpdate', 'U': 9, 'u': 10, 'a': [['101', '0']], 'b': []}))
+        self.assertEqual(subscriber.latest(ASKBID, 'BTCUSDT').data.ap, '101')
+        # 101 gone, 100 size changes, 100.5 new best bid
+        asyncio.run(callback({'e': 'depthUpdate', 'U': 11, 'u': 12, 'a': [['101', '0']],
+                              'b': [['100', '5'], ['100.5', '1']]}))
+        depth = subscriber.latest(DEPTH, 'BTCUSDT').data
+        self.assertEqual(depth, {'asks': [['102', '1']], 'bids': [['100.5', '1'], ['100', '5'], ['99', '1']]})
+        self.assertEqual(subscriber.latest(ASKBID, 'BTCUSDT').data, AskBid(ap='102', aq='1', bp='100.5', bq='1'))
+        self.assertEqual(len(snapshots), 1)
+        # gap in the update ids: a new snapshot
+        asyncio.run(callback({'e': 'depthUpdate', 'U': 11, 'u': 11, 'a': [], 'b': []}))
+        asyncio.run(callback({'e': 'depthUpdate', 'U': 20, 'u': 21, 'a': [['103', '1']], 'b': []}))
+        self.assertEqual(len(snapshots), 2)
+
+    def _publish_between_reads(self, publisher):
+        """ publish once right after the first XREAD, before the next one
+        """
+        def publish():
+            self.redis.on_xread = None
+            publisher.publish_askbid('BTCUSDT', _askbid('101'))
+            publisher.publish_askbid('ETHUSDT', _askbid('10'))
+        self.redis.on_xread = publish
+
+    def test_07_stream_new_entries_between_reads(self):
+        publisher = MarketDataPublisher(STREAM, conn=self.redis, logger=LOGGER)
+        publisher.publish_askbid('BTCUSDT', _askbid('100'))
+        subscriber = MarketDataSubscriber(['BTCUSDT', 'ETHUSDT'], kinds=(ASKBID,), mode=STREAM,
+                                          from_latest=False, conn=self.redis)
+        self._publish_between_reads(publisher)
+        listen = subscriber.listen()
+        # entries added after the first read are read by the next one, of a new stream as well
+        self.assertEqual([next(listen).data.bp, next(listen).data.bp], ['101', '10'])
+        self.assertEqual(subscriber._stream_ids, {'md:stream:askbid:BTCUSDT': b'2-0', 'md:stream:askbid:ETHUSDT': b'1-0'})
+
+    def test_08_async_stream(self):
+        publisher = MarketDataPublisher(STREAM, conn=self.redis, logger=LOGGER)
+        publisher.publish_askbid('BTCUSDT', _askbid('100'))
+        subscriber = MarketDataSubscriber(['BTCUSDT', 'ETHUSDT'], kinds=(ASKBID,), mode=STREAM,
+                                          aconn=AsyncFakeRedis(self.redis))
+        self._publish_between_reads(publisher)
+
+        async def run():
+            listen = subscriber.alisten()
+            res = [await listen.__anext__() for _ in range(3)]
+            await listen.aclose()
+            return res
+        self.assertEqual([md.data.bp for md in asyncio.run(run())], ['100', '101', '10'])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(RedisBusTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+import time
+import logging
+import threading
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, OrderStatus, Ticker, ORDER_STATE_CONSTANTS
+from octopuspy.exchange.scheduler import (
+    RequestScheduler, RequestShed, schedule_client, get_scheduler, KILL, PLACE, PUBLIC_READ
+)
+from octopuspy.trading.reconciler import QuoteReconciler
+
+LOGGER = logging.getLogger('scheduler_test')
+LOGGER.addHandler(logging.NullHandler())
+LOGGER.propagate = False
+
+class ReadClient(BaseClient):
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''), LOGGER)
+
+    def ticker(self, symbol: str) -> list[Ticker]:
+        return [Ticker(s=symbol, p='1', q='1')]
+
+    def open_orders(self, symbol: str) -> list[OrderStatus]:
+        return [OrderStatus(order_id='1', client_id='', side='BUY', price='1', state=ORDER_STATE_CONSTANTS.NEW,
+                            origQty='1')]
+
+    def batch_cancel(self, order_ids: list[str], symbol: str) -> list:
+        return order_ids
+
+class RequestSchedulerTest(unittest.TestCase):
+    def test_01_reserve_and_shed(self):
+        scheduler = RequestScheduler(rate=10, burst=2, reserve=1, max_wait=(None, None, 1.0, 0.05, 0.05))
+        self.assertTrue(scheduler.acquire(PUBLIC_READ))
+        # the last token is reserved, a read would wait 0.1s > 0.05s
+        self.assertFalse(scheduler.acquire(PUBLIC_READ))
+        self.assertTrue(scheduler.acquire(KILL))
+        stats = scheduler.stats()
+        self.assertEqual((stats['granted']['kill'], stats['shed']['public_read']), (1, 1))
+
+    def test_02_priority_order(self):
+        scheduler = RequestScheduler(rate=20, burst=1, max_wait=(None,) * 5)
+        scheduler.acquire(PLACE)
+        granted = []
+        def request(priority):
+            scheduler.acquire(priority)
+            granted.append(priority)
+        threads = [threading.Thread(target=request, args=(priority,)) for priority in (PUBLIC_READ, PUBLIC_READ)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+        threads.append(threading.Thread(target=request, args=(KILL,)))
+        threads[-1].start()
+        for thread in threads:
+            thread.join(timeout=2)
+        self.assertEqual(granted, [KILL, PUBLIC_READ, PUBLIC_READ])
+
+    def test_03_scheduled_client(self):
+        # reads can never get a token, cancels always do
+        scheduler = RequestScheduler(rate=100, burst=5, reserve=5)
+        client = schedule_client(ReadClient(), scheduler)
+        # a shed read raises, it must not look like "no open orders"
+        self.assertRaises(RequestShed, client.ticker, 'BTCUSDT')
+        self.assertRaises(RequestShed, client.open_orders, 'BTCUSDT')
+        self.assertRaises(RequestShed, QuoteReconciler().sync, client, [], 'BTCUSDT')
+        # open_orders inside cancel_all is sent with the priority of the cancel
+        self.assertTrue(client.cancel_all('BTCUSDT'))
+        # cancel_all, open_orders and batch_cancel
+        self.assertEqual(scheduler.stats()['granted']['kill'], 3)
+        self.assertIs(schedule_client(client, scheduler).ticker, client.ticker)
+
+    def test_04_shared(self):
+        self.assertIs(get_scheduler(('test', 'key'), 10), get_scheduler(('test', 'key'), 20))
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(RequestSchedulerTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)
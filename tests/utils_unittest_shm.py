@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import multiprocessing
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy.exchange.base_restapi import AskBid
+from octopuspy.marketdata.shm_book import SharedTopOfBook, TickRing, TOB_SEQ
+
+def _reader(name: str, symbol: str, rounds: int, queue):
+    """ child process: every read must be a consistent slot (ap == bp + 1, aq == bq)
+    """
+    book = SharedTopOfBook(name)
+    torn = 0
+    for _ in range(rounds):
+        data = book.read(symbol)
+        if data and (data[0] != data[2] + 1 or data[1] != data[3]):
+            torn += 1
+    book.close()
+    queue.put(torn)
+
+class SharedTopOfBookTest(unittest.TestCase):
+    def setUp(self):
+        self.name = f"octo_tob_test_{os.getpid()}"
+        self.book = SharedTopOfBook(self.name, ["BTCUSDT", "ETHUSDT"], create=True)
+
+    def tearDown(self):
+        self.book.close()
+        self.book.unlink()
+
+    def test_01_read_write(self):
+        reader = SharedTopOfBook(self.name)
+        self.assertEqual(reader.symbols, ["BTCUSDT", "ETHUSDT"])
+        self.assertIsNone(reader.get("ETHUSDT"))
+        self.book.update_askbid("BTCUSDT", AskBid(ap="101.5", aq="2", bp="101", bq="3"))
+        self.assertEqual(reader.get("BTCUSDT"), AskBid(ap=101.5, aq=2.0, bp=101.0, bq=3.0))
+        self.assertIsNone(reader.get("ETHUSDT"))
+        reader.close()
+
+    def test_02_concurrent_reader(self):
+        queue = multiprocessing.Queue()
+        proc = multiprocessing.Process(target=_reader, args=(self.name, "BTCUSDT", 20000, queue))
+        proc.start()
+        for idx in range(20000):
+            self.book.update("BTCUSDT", idx + 1.0, idx, idx, idx, ts=idx + 1)
+        proc.join()
+        self.assertEqual(queue.get(), 0)
+
+    def test_03_writer_died_mid_update(self):
+        self.book.update("BTCUSDT", 2.0, 1.0, 1.0, 1.0)
+        # seq left odd: the writer stopped between the two seq stores
+        offset = self.book.offsets["BTCUSDT"]
+        TOB_SEQ.pack_into(self.book.buf, offset, TOB_SEQ.unpack_from(self.book.buf, offset)[0] + 1)
+        reader = SharedTopOfBook(self.name)
+        try:
+            with self.assertRaises(TimeoutError):
+                reader.read("BTCUSDT", timeout=0.05)
+            self.assertIsNone(reader.get("ETHUSDT"))
+        finally:
+            reader.close()
+
+class TickRingTest(unittest.TestCase):
+    def test_01_cursor_and_overrun(self):
+        name = f"octo_ring_test_{os.getpid()}"
+        ring = TickRing(name, capacity=4, create=True)
+        reader = TickRing(name)
+        try:
+            ring.append("BTCUSDT", "B", 100.0, 1.0, ts=1)
+            ticks, cursor = reader.read_from(0)
+            self.assertEqual([(t.symbol, t.side, t.price, t.qty, t.ts) for t in ticks],
+                             [("BTCUSDT", "B", 100.0, 1.0, 1)])
+            for idx in range(6):
+                ring.append("ETHUSDT", "S", 10.0 + idx, 1.0, ts=idx + 2)
+            # lapped reader resumes at the oldest tick still kept
+            ticks, cursor = reader.read_from(cursor)
+            self.assertEqual([t.price for t in ticks], [12.0, 13.0, 14.0, 15.0])
+            self.assertEqual(cursor, 7)
+            self.assertEqual(reader.read_from(cursor), ([], 7))
+        finally:
+            reader.close()
+            ring.close()
+            ring.unlink()
+
+    def test_02_symbol_width(self):
+        name = f"octo_ring_test_{os.getpid()}"
+        ring = TickRing(name, capacity=4, create=True)
+        try:
+            ring.append("1000SHIBUSDTPERP", "B", 1.0, 1.0)
+            with self.assertRaises(ValueError):
+                ring.append("1000SHIBUSDT-PERP", "B", 1.0, 1.0)
+            ticks, cursor = ring.read_from(0)
+            self.assertEqual(([t.symbol for t in ticks], cursor), (["1000SHIBUSDTPERP"], 1))
+        finally:
+            ring.close()
+            ring.unlink()
+
+if __name__ == "__main__":
+    for case in (SharedTopOfBookTest, TickRingTest):
+        suite = unittest.TestLoader().loadTestsFromTestCase(case)
+        runner = unittest.TextTestRunner(verbosity=1)
+        runner.run(suite)
@@ -0,0 +1,182 @@
+import unittest
+import os
+import sys
+import time
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+from octopuspy import BaseClient, ClientParams, AskBid, NewOrder, OrderID, OrderStatus, ORDER_STATE_CONSTANTS
+from octopuspy.trading.oms import OrderManager, CLOSED
+from octopuspy.exchange.scheduler import RequestScheduler
+from octopuspy.trading.status_poller import StatusPoller
+from tests.exchange_fakes import new_order, quiet_logger
+
+LOGGER = quiet_logger('status_poller_test')
+
+class StatusClient(BaseClient):
+    """ touch 100 / 100.1, every order NEW unless set in self.states;
+        batch: ids per orders_status request, 0 for one snapshot of all (the BaseClient fallback)
+    """
+    def __init__(self):
+        super().__init__(ClientParams('', '', '', ''), LOGGER)
+        self.states = {}
+        self.prices = {}
+        self.polled = []
+        self.books = 0
+        self.batch = 0
+        self.gone = set()       # ids left out of orders_status, as on clients which only query open orders
+        self.fail = False
+
+    def batch_make_orders(self, orders: list[NewOrder], symbol: str = '') -> list[OrderID]:
+        self.prices.update({f'9{order.client_id}': order.price for order in orders})
+        return [OrderID(order_id=f'9{order.client_id}', client_id=order.client_id) for order in orders]
+
+    def top_askbid(self, symbol: str) -> list[AskBid]:
+        self.books += 1
+        return [AskBid(ap='100.1', aq='1', bp='100', bq='1')]
+
+    def orders_status_requests(self, count: int, closed: int = 0) -> int:
+        if self.batch:
+            return -(-count // self.batch)
+        return super().orders_status_requests(count, closed)
+
+    def orders_status(self, order_ids: list[str], symbol: str = '') -> dict:
+        self.polled.append(list(order_ids))
+        if self.fail:
+            return None
+        return {order_id: OrderStatus(order_id=order_id, client_id='', side='BUY', price=self.prices[order_id], origQty='1',
+                                      state=self.states.get(order_id, ORDER_STATE_CONSTANTS.NEW))
+                for order_id in order_ids if order_id not in self.gone}
+
+class StatusPollerTest(unittest.TestCase):
+    def setUp(self):
+        self.client = StatusClient()
+        self.oms = OrderManager()
+
+    def _place(self, orders: list[NewOrder], age: float = 60.0):
+        self.oms.place(self.client, orders, 'BTCUSDT')
+        for order in orders:
+            self.oms.get(order.client_id).created = time.time() - age
+
+    def _rewind(self, poller: StatusPoller, seconds: float):
+        for order_id in poller._polled:
+            poller._polled[order_id] -= seconds
+
+    def test_01_near_orders_first(self):
+        self._place([new_order('1', 'BUY', '100'), new_order('2', 'BUY', '99'), new_order('3', 'SELL', '100.2')])
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', budget=10, logger=LOGGER)
+        near, deep = self.oms.get('1'), self.oms.get('2')
+        book = self.client.top_askbid('BTCUSDT')[0]
+        self.assertAlmostEqual(poller.interval(near, book, 0), 0.75, places=3)
+        self.assertAlmostEqual(poller.interval(deep, book, 0), 8.25, places=3)
+        # never polled: all are due
+        poller.poll()
+        self.assertEqual(sorted(self.client.polled[-1]), ['91', '92', '93'])
+        self.assertEqual(poller.poll(), [])
+        self._rewind(poller, 1.0)
+        poller.poll()
+        self.assertEqual(self.client.polled[-1], ['91'])
+
+    def test_02_budget_per_request(self):
+        self._place([new_order(str(idx), 'BUY', '100') for idx in range(10)])
+        self.client.batch = 2
+        scheduler = RequestScheduler(rate=0.001, burst=3)
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', scheduler=scheduler, budget=3, logger=LOGGER)
+        poller.poll()
+        # one token for top_askbid, two requests of two orders
+        self.assertEqual(self.client.books, 1)
+        self.assertEqual(len(self.client.polled[-1]), 4)
+        # 10 orders every 0.75s, two per request, need 6.7 requests per second
+        self.assertAlmostEqual(poller.stretch, 10 / 0.75 / 2 / 3, places=3)
+        # no token left: neither the touch nor a poll
+        self._rewind(poller, 100.0)
+        self.assertEqual(poller.poll(), [])
+        self.assertEqual((self.client.books, len(self.client.polled)), (1, 1))
+
+    def test_03_fill_speeds_up(self):
+        self._place([new_order('1', 'BUY', '99.5'), new_order('2', 'BUY', '99')])
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', budget=10, logger=LOGGER)
+        book = AskBid(ap='100.1', aq='1', bp='100', bq='1')
+        poller.poll(book)
+        deep_before = poller.interval(self.oms.get('2'), book, time.monotonic())
+        self.client.states['91'] = ORDER_STATE_CONSTANTS.PARTIALLY_FILLED
+        self._rewind(poller, 100.0)
+        statuses = poller.poll(book)
+        self.assertEqual(self.client.books, 0)
+        self.assertEqual(len(statuses), 2)
+        self.assertEqual(self.oms.get('1').state, ORDER_STATE_CONSTANTS.PARTIALLY_FILLED)
+        now = time.monotonic()
+        self.assertEqual(poller.interval(self.oms.get('1'), book, now), poller.min_interval)
+        self.assertAlmostEqual(poller.interval(self.oms.get('2'), book, now), deep_before / 2, places=3)
+
+    def test_04_fill_from_stream(self):
+        self._place([new_order('1', 'BUY', '99')])
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', budget=10, logger=LOGGER)
+        poller.poll()
+        self.oms.update(order_id='91', filled='0.5')
+        poller.poll()
+        self.assertEqual(poller.interval(self.oms.get('1'), None, time.monotonic()), poller.min_interval)
+
+    def test_05_final_orders_dropped(self):
+        self._place([new_order('1', 'BUY', '100'), new_order('2', 'BUY', '100')])
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', budget=10, logger=LOGGER)
+        self.client.states['92'] = ORDER_STATE_CONSTANTS.CANCELED
+        poller.poll()
+        self.assertEqual(self.oms.get('2').state, ORDER_STATE_CONSTANTS.CANCELED)
+        self._rewind(poller, 100.0)
+        poller.poll()
+        self.assertEqual(self.client.polled[-1], ['91'])
+        self.assertEqual(list(poller._polled), ['91'])
+
+    def test_06_closed_orders_charged(self):
+        self._place([new_order('1', 'BUY', '100'), new_order('2', 'BUY', '100')])
+        scheduler = RequestScheduler(rate=0.001, burst=10)
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', scheduler=scheduler, budget=10, logger=LOGGER)
+        self.client.states['92'] = ORDER_STATE_CONSTANTS.CANCELED
+        poller.poll()
+        # top_askbid, open_orders and order_status of the cancelled order
+        self.assertAlmostEqual(scheduler.stats()['tokens'], 7, places=1)
+
+    def test_07_shared_budget(self):
+        self._place([new_order(str(idx), 'BUY', '100') for idx in range(4)])
+        scheduler = RequestScheduler(rate=0.001, burst=3)
+        self.client.batch = 1
+        pollers = [StatusPoller(self.client, self.oms, 'BTCUSDT', scheduler=scheduler, budget=10, logger=LOGGER)
+                   for _ in range(2)]
+        for poller in pollers:
+            poller.poll()
+        # one touch and two orders in all
+        self.assertEqual(self.client.books + sum(len(ids) for ids in self.client.polled), 3)
+
+    def test_08_start_default_settings(self):
+        self._place([new_order(str(idx), 'BUY', '100') for idx in range(5)])
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', logger=LOGGER)
+        poller.start()
+        time.sleep(2.0)
+        poller.stop()
+        self.assertGreaterEqual(len(self.client.polled), 2)
+        # about 2 requests per second: top_askbid and orders_status
+        self.assertLessEqual(self.client.books + len(self.client.polled), 4 + 2 * 2.0 + 1)
+
+    def test_09_left_out_orders_closed(self):
+        self._place([new_order('1', 'BUY', '100'), new_order('2', 'BUY', '100')])
+        poller = StatusPoller(self.client, self.oms, 'BTCUSDT', budget=10, logger=LOGGER)
+        self.client.gone.add('92')
+        # a failed query ends nothing
+        self.client.fail = True
+        poller.poll()
+        self.assertEqual(len(self.oms.live_orders('BTCUSDT')), 2)
+        self.client.fail = False
+        self._rewind(poller, 100.0)
+        poller.poll()
+        self.assertEqual(self.oms.get('2').state, CLOSED)
+        self._rewind(poller, 100.0)
+        poller.poll()
+        self.assertEqual(self.client.polled[-1], ['91'])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(StatusPollerTest)
+    runner = unittest.TextTestRunner(verbosity=1)
+    runner.run(suite)